@@ -1,3 +1,4 @@
+import itertools
 from collections import deque
 from collections.abc import Iterable, Mapping, MutableMapping
 from typing import Any, Optional, TypeVar
@@ -5,12 +6,30 @@ from typing import Any, Optional, TypeVar
 from .subtypes import Subtypes
 from .types import Type, Omega, Constructor, Product, Arrow, Intersection
 from .enumeration import (
+    EnumerationProgress,
+    InterpretationCache,
     interpret_term,
+    interpret_terms,
     enumerate_terms,
     enumerate_terms_iter,
+    enumerate_terms_by_cost,
     enumerate_terms_of_size,
+    count_terms,
+    Tree,
+    TreeTable,
 )
-from .fcl import FiniteCombinatoryLogic
+from .fcl import (
+    CombinatorClass,
+    FiniteCombinatoryLogic,
+    InhabitationStatistics,
+    InhabitedFirst,
+    expand_grammar,
+    expand_term,
+    fewest_paths_first,
+    smallest_type_first,
+)
+from .kbest import best_costs, enumerate_k_best
+from .parallel import enumerate_terms_parallel
 
 __all__ = [
     "Subtypes",
@@ -22,9 +41,24 @@ __all__ = [
     "Intersection",
     "enumerate_terms",
     "enumerate_terms_iter",
+    "enumerate_terms_by_cost",
     "enumerate_terms_of_size",
+    "count_terms",
+    "enumerate_terms_parallel",
+    "enumerate_k_best",
+    "best_costs",
     "interpret_term",
+    "interpret_terms",
+    "InterpretationCache",
+    "EnumerationProgress",
     "FiniteCombinatoryLogic",
+    "InhabitationStatistics",
+    "InhabitedFirst",
+    "smallest_type_first",
+    "fewest_paths_first",
+    "CombinatorClass",
+    "expand_grammar",
+    "expand_term",
     "inhabit_and_interpret",
 ]
 
@@ -36,18 +70,26 @@ def inhabit_and_interpret(
     query: list[Type] | Type,
     max_count: Optional[int] = None,
     subtypes: Optional[Subtypes] = None,
+    cache: Optional[InterpretationCache] = None,
 ) -> Iterable[Any]:
     fcl = FiniteCombinatoryLogic(repository, Subtypes(dict()) if subtypes is None else subtypes)
 
     if not isinstance(query, list):
         query = [query]
 
+    # combinators with equal types are expanded only when interpreting terms
     grammar: MutableMapping[
         Type,
-        deque[tuple[C, list[Type]]],
-    ] = fcl.inhabit(*query)
+        deque[tuple[C | CombinatorClass[C], list[Type]]],
+    ] = fcl.inhabit_compact(*query)
 
+    # expanded terms are shared, so that interpretations of subterms are cached efficiently
+    table: TreeTable[C] = TreeTable()
     for q in query:
-        enumerated_terms = enumerate_terms(start=q, grammar=grammar, max_count=max_count)
-        for term in enumerated_terms:
-            yield interpret_term(term)
+        enumerated_terms: Iterable[Tree[C]] = (
+            expanded_term
+            for term in enumerate_terms(start=q, grammar=grammar, max_count=None)
+            for expanded_term in expand_term(term, table)
+        )
+        for term in itertools.islice(enumerated_terms, max_count):
+            yield interpret_term(term, cache, fcl.call_plans)
@@ -7,20 +7,135 @@
 
 from functools import partial
 import itertools
-from inspect import Parameter, signature, _ParameterKind, _empty
-from collections import deque
-from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
-from typing import Any, Optional, TypeAlias, TypeVar
+import math
+import sys
+import time
+from inspect import signature, _ParameterKind, _empty
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, as_completed, wait
+from collections.abc import (
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Sequence,
+)
+from dataclasses import dataclass
+from typing import Any, Generic, Optional, TypeAlias, TypeVar
 from heapq import merge
 
 
-from .sortedenum import sorted_product
+from .grammar import (
+    finite_non_terminals,
+    productive_non_terminals,
+    reachable_grammar,
+    strongly_connected_components,
+)
+from .sortedenum import SortedProductStream
 
 S = TypeVar("S")  # non-terminals
 T = TypeVar("T", bound=Hashable)
 
 Tree: TypeAlias = tuple[T, tuple["Tree[T]", ...]]
 
+# finite languages with at most this many derivations are computed up front during enumeration
+MATERIALIZATION_LIMIT = 10_000
+
+
+class SharedTree(tuple[T, tuple["SharedTree[T]", ...]]):
+    """A tree node, which is shared by all trees containing it (see `TreeTable`).
+
+    A shared tree is equal to the plain tree `(combinator, args)`. Its size and hash are computed
+    once on construction from the (cached) sizes and hashes of its arguments.
+
+    Tuple subclasses cannot have (non-empty) slots, so size and hash are stored as hidden third and
+    fourth elements of the tuple instead of in a `__dict__` per node. Iterating, unpacking and
+    `len` only see `(combinator, args)`.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, combinator: T, args: tuple["SharedTree[T]", ...]) -> "SharedTree[T]":
+        size = 1
+        for arg in args:
+            size += arg.size
+        node = (combinator, args, size, hash((combinator, args)))
+        return super().__new__(cls, node)  # type: ignore[arg-type]
+
+    @property
+    def size(self) -> int:
+        """The number of nodes of the tree."""
+
+        return tuple.__getitem__(self, 2)  # type: ignore[return-value]
+
+    def __hash__(self) -> int:
+        return tuple.__getitem__(self, 3)  # type: ignore[return-value]
+
+    def __len__(self) -> int:
+        return 2
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter((self[0], self[1]))
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, SharedTree):
+            return hash(self) == hash(other) and self[0] == other[0] and self[1] == other[1]
+        if isinstance(other, tuple):
+            return len(other) == 2 and self[0] == other[0] and self[1] == other[1]
+        return NotImplemented
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __repr__(self) -> str:
+        return repr((self[0], self[1]))
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (self.__class__, (self[0], self[1]))
+
+
+class TreeTable(Generic[T]):
+    """Hash-consing table for trees.
+
+    Every distinct tree made by the table is represented by exactly one `SharedTree`, hence
+    memory scales with the number of distinct subtrees and equal trees are identical.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: dict[SharedTree[T], SharedTree[T]] = dict()
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def make(self, combinator: T, args: Iterable[SharedTree[T]]) -> SharedTree[T]:
+        """The shared tree `(combinator, args)` for already shared arguments."""
+
+        node = SharedTree(combinator, tuple(args))
+        return self.nodes.setdefault(node, node)
+
+    def share(self, tree: Tree[T]) -> SharedTree[T]:
+        """The shared tree equal to a given (plain) tree."""
+
+        terms: deque[Tree[T]] = deque((tree,))
+        combinators: deque[tuple[T, int]] = deque()
+        # decompose terms
+        while terms:
+            t = terms.pop()
+            combinators.append((t[0], len(t[1])))
+            terms.extend(reversed(t[1]))
+        results: deque[SharedTree[T]] = deque()
+
+        # rebuild terms bottom-up
+        while combinators:
+            (c, n) = combinators.pop()
+            results.append(self.make(c, [results.pop() for _ in range(n)]))
+        return results.pop()
+
 
 def tree_size(tree: Tree[T]) -> int:
     """The number of nodes in a tree."""
@@ -28,8 +143,12 @@ def tree_size(tree: Tree[T]) -> int:
     result = 0
     trees: deque[Tree[T]] = deque((tree,))
     while trees:
-        result += 1
-        trees.extendleft(trees.pop()[1])
+        t = trees.pop()
+        if isinstance(t, SharedTree):
+            result += t.size
+        else:
+            result += 1
+            trees.extendleft(t[1])
     return result
 
 
@@ -45,78 +164,388 @@ def bounded_union(old_elements: set[S], new_elements: Iterable[S], max_count: in
     return result
 
 
-def takewhile_inclusive(pred: Callable[[T], bool], it: Iterable[T]) -> Iterable[T]:
-    """Like takewhile, but also returns the first element not satisfying `pred`"""
-    for elem in it:
-        yield elem
-        if not pred(elem):
-            return
+@dataclass(frozen=True)
+class EnumerationProgress(Generic[S]):
+    """Progress of an enumeration, reported after each generation.
+
+    A generation derives all terms of the next smallest cost (for `enumerate_terms`, the next
+    term size)."""
+
+    # number of the generation (starting with 0) and the cost of its terms
+    generation: int
+    cost: int
+    # time (in seconds) spent in the generation and since the start of the enumeration, including
+    # the time spent by the consumer of enumerated terms
+    time: float
+    total_time: float
+    # number of terms of the start symbol enumerated up to (and including) the generation, and
+    # the total number of its terms
+    # (if known, i.e. once it is known that its language is finite)
+    enumerated: int
+    total: Optional[int]
+    # for each reachable non-terminal: number of derived terms
+    terms: dict[S, int]
+    # number of non-terminals, whose terms are complete
+    frozen: int
+    # number of argument combinations waiting in product streams
+    pending: int
+    # number of distinct (sub)terms, i.e. nodes in the `TreeTable`
+    nodes: int
+    # estimated memory (in bytes) of the containers holding derived terms, pending combinations,
+    # and nodes (excluding the nodes themselves, see SharedTree)
+    memory: int
 
 
 def enumerate_terms(
     start: S,
     grammar: Mapping[S, Sequence[tuple[T, list[S]]]],
     max_count: Optional[int] = 100,
-) -> Iterable[Tree[T]]:
-    return itertools.islice(enumerate_terms_iter(start, grammar), max_count)
+    table: Optional[TreeTable[T]] = None,
+    progress: Optional[Callable[[EnumerationProgress[S]], None]] = None,
+) -> Iterable[SharedTree[T]]:
+    return itertools.islice(enumerate_terms_iter(start, grammar, table, progress), max_count)
 
 
 def enumerate_terms_iter(
-    start: S, grammar: Mapping[S, Iterable[tuple[T, list[S]]]]
-) -> Iterable[Tree[T]]:
+    start: S,
+    grammar: Mapping[S, Iterable[tuple[T, list[S]]]],
+    table: Optional[TreeTable[T]] = None,
+    progress: Optional[Callable[[EnumerationProgress[S]], None]] = None,
+) -> Iterable[SharedTree[T]]:
     """
     Enumerate terms as an iterator
+
+    Terms are hash-consed by `table`, i.e. each distinct subterm exists once and is shared by
+    all terms containing it. A table can be shared by multiple enumerations.
+
+    If given, `progress` is called with an `EnumerationProgress` after each generation.
     """
     if start not in grammar:
-        return []
+        return
+
+    if table is None:
+        table = TreeTable()
+
+    # the cost of a term is its size
+    yield from _enumerate_by_cost(
+        start,
+        grammar,
+        cost=lambda c: 1,
+        term_cost=tree_size,
+        combine=lambda c: partial(table.make, c),
+        table=table,
+        progress=progress,
+    )
 
-    old_terms: dict[S, list[Tree[T]]] = {n: [] for n in grammar.keys()}
-    already_checked: dict[S, set[int]] = {n: set() for n in grammar.keys()}
 
-    terms_size: int = -1
+def _combinator_cost(cost: Optional[Mapping[T, int] | Callable[[T], int]]) -> Callable[[T], int]:
+    """Costs of combinators given as a mapping (combinators not in the mapping cost 1) or a
+    function. Without costs, every combinator costs 1."""
+
+    if cost is None:
+        return lambda c: 1
+    elif isinstance(cost, Mapping):
+        return lambda c: cost.get(c, 1)
+    else:
+        return cost
 
-    generation = 0
-
-    repeat = True
-    while repeat or terms_size < sum(len(ts) for ts in old_terms.values()):
-        repeat = False
-        terms_size = sum(len(ts) for ts in old_terms.values())
-        generation = generation + 1
-
-        for n, exprs in grammar.items():
-            out_iter, avoid_iter = itertools.tee(
-                takewhile_inclusive(
-                    lambda tree: tree_size(tree) <= generation,
-                    merge(
-                        *(
-                            filter(
-                                lambda new_term: hash(new_term) not in already_checked[n],
-                                sorted_product(
-                                    *(old_terms[m] for m in ms),
-                                    key=tree_size,
-                                    combine=partial(lambda c, args: (c, tuple(args)), c),
-                                ),
-                            )
-                            for c, ms in sorted(exprs, key=lambda expr: len(expr[1]))
-                        ),
-                        key=tree_size,
+
+def enumerate_terms_by_cost(
+    start: S,
+    grammar: Mapping[S, Iterable[tuple[T, list[S]]]],
+    cost: Mapping[T, int] | Callable[[T], int],
+    max_count: Optional[int] = 100,
+    table: Optional[TreeTable[T]] = None,
+    progress: Optional[Callable[[EnumerationProgress[S]], None]] = None,
+) -> Iterable[SharedTree[T]]:
+    """Enumerate at most max_count terms derivable from the start symbol ordered by total cost.
+
+    The total cost of a term is the sum of the costs of all its combinators. Costs are given by a
+    mapping (combinators not in the mapping cost 1) or a function, and must be non-negative.
+    Terms with equal total cost are enumerated in no particular order.
+
+    Note: If there are cycles of combinators with cost 0, there may be infinitely many terms with
+    the same total cost, and terms of higher cost are never reached.
+    """
+
+    if start not in grammar:
+        return
+
+    if table is None:
+        table = TreeTable()
+
+    combinator_cost = _combinator_cost(cost)
+    # total cost of each enumerated term
+    costs: dict[SharedTree[T], int] = dict()
+
+    def combine(c: T) -> Callable[[Iterable[SharedTree[T]]], SharedTree[T]]:
+        c_cost = combinator_cost(c)
+        if c_cost < 0:
+            raise ValueError(f"Combinator {c} has negative cost {c_cost}")
+
+        def combine_args(args: Iterable[SharedTree[T]]) -> SharedTree[T]:
+            term = table.make(c, args)
+            costs[term] = c_cost + sum(costs[arg] for arg in term[1])
+            return term
+
+        return combine_args
+
+    yield from itertools.islice(
+        _enumerate_by_cost(
+            start,
+            grammar,
+            cost=combinator_cost,
+            term_cost=costs.__getitem__,
+            combine=combine,
+            table=table,
+            progress=progress,
+        ),
+        max_count,
+    )
+
+
+def _enumerate_by_cost(
+    start: S,
+    grammar: Mapping[S, Iterable[tuple[T, list[S]]]],
+    cost: Callable[[T], int],
+    term_cost: Callable[[SharedTree[T]], int],
+    combine: Callable[[T], Callable[[Iterable[SharedTree[T]]], SharedTree[T]]],
+    table: TreeTable[T],
+    progress: Optional[Callable[[EnumerationProgress[S]], None]] = None,
+) -> Iterator[SharedTree[T]]:
+    """Enumerate terms derivable from the start symbol in ascending order of their cost.
+
+    `term_cost` has to be additive, i.e. the cost of a term is the cost of its combinator plus
+    the costs of its arguments. `combine` makes terms using `table`.
+
+    Only non-terminals reachable from the start symbol are considered. Once a strongly connected
+    component of non-terminals cannot derive further terms, and neither can any component it
+    depends on, its terms are complete and the component is frozen, i.e. no longer visited.
+    Enumeration stops as soon as the component of the start symbol is frozen.
+
+    Terms of (not too large) finite languages are computed up front, see `finite_terms`. If the
+    language of the start symbol is among them, they are returned right away (as a single
+    generation, which is reported before its terms are returned)."""
+
+    start_time = time.perf_counter()
+    grammar = reachable_grammar(grammar, start)
+    finite = finite_terms(grammar, combine, MATERIALIZATION_LIMIT)
+    if start in finite:
+        terms = sorted(finite[start], key=term_cost)
+        if progress is not None:
+            total_time = time.perf_counter() - start_time
+            progress(
+                EnumerationProgress(
+                    generation=0,
+                    cost=term_cost(terms[-1]),
+                    time=total_time,
+                    total_time=total_time,
+                    enumerated=len(terms),
+                    total=len(terms),
+                    terms={n: len(ts) for n, ts in finite.items()},
+                    frozen=len(finite),
+                    pending=0,
+                    nodes=len(table),
+                    memory=sum(sys.getsizeof(ts) for ts in finite.values())
+                    + sys.getsizeof(table.nodes),
+                )
+            )
+        yield from terms
+        return
+
+    old_terms: dict[S, list[SharedTree[T]]] = {
+        n: sorted(finite[n], key=term_cost) if n in finite else [] for n in grammar.keys()
+    }
+    already_checked: dict[S, set[SharedTree[T]]] = {n: set() for n in grammar.keys()}
+
+    # For each non-terminal and rule, the cost of the combinator and a product stream over the
+    # (growing) lists of terms of the argument non-terminals. The key of argument combinations is
+    # the cost of the resulting term minus the cost of the combinator.
+    streams: dict[S, list[tuple[int, SortedProductStream[SharedTree[T], SharedTree[T]]]]] = {
+        n: [
+            (
+                cost(c),
+                SortedProductStream(*(old_terms[m] for m in ms), key=term_cost, combine=combine(c)),
+            )
+            for c, ms in sorted(exprs, key=lambda expr: len(expr[1]))
+        ]
+        if n not in finite
+        else []
+        for n, exprs in grammar.items()
+    }
+    # with rules of cost 0, new terms may be combined to further terms of the same cost
+    has_free_rules = any(c_cost == 0 for ss in streams.values() for c_cost, _ in ss)
+
+    # components (in topological order) and their dependencies
+    components = strongly_connected_components(grammar)
+    component_of = {n: i for i, component in enumerate(components) for n in component}
+    dependencies = [
+        {component_of[m] for n in component for _, ms in grammar[n] for m in ms} - {i}
+        for i, component in enumerate(components)
+    ]
+    frozen: set[int] = {component_of[n] for n in finite}
+    # non-terminals of components, which are not frozen
+    active = [n for n in grammar.keys() if n not in finite]
+
+    enumerated = 0
+    generation_start_time = start_time
+    for generation in itertools.count():
+        # the smallest cost of any term, which can be derived next
+        next_costs = [
+            c_cost + next_key
+            for n in active
+            for c_cost, stream in streams[n]
+            if (next_key := stream.next_key()) is not None
+        ]
+        if not next_costs:
+            return
+        bound = min(next_costs)
+
+        has_new_terms = True
+        while has_new_terms:
+            has_new_terms = False
+            for n in active:
+                for term in merge(
+                    *(stream.take_until(bound - c_cost) for c_cost, stream in streams[n]),
+                    key=term_cost,
+                ):
+                    if term not in already_checked[n]:
+                        already_checked[n].add(term)
+                        old_terms[n].append(term)
+                        has_new_terms = has_free_rules
+                        if n == start:
+                            enumerated += 1
+                            yield term
+
+        # freeze components, which cannot derive further terms
+        for i, component in enumerate(components):
+            if (
+                i not in frozen
+                and dependencies[i] <= frozen
+                and all(stream.next_key() is None for n in component for _, stream in streams[n])
+            ):
+                frozen.add(i)
+        active = [n for n in active if component_of[n] not in frozen]
+
+        if progress is not None:
+            current_time = time.perf_counter()
+            pending_streams = [stream for ss in streams.values() for _, stream in ss]
+            progress(
+                EnumerationProgress(
+                    generation=generation,
+                    cost=bound,
+                    time=current_time - generation_start_time,
+                    total_time=current_time - start_time,
+                    enumerated=enumerated,
+                    total=enumerated if component_of[start] in frozen else None,
+                    terms={n: len(ts) for n, ts in old_terms.items()},
+                    frozen=len(grammar) - len(active),
+                    pending=sum(
+                        len(stream.frontier) + sum(map(len, stream.blocked))
+                        for stream in pending_streams
                     ),
-                ),
+                    nodes=len(table),
+                    memory=sys.getsizeof(table.nodes)
+                    + sum(
+                        sys.getsizeof(old_terms[n]) + sys.getsizeof(already_checked[n])
+                        for n in grammar
+                    )
+                    + sum(
+                        sys.getsizeof(stream.frontier) + sum(map(sys.getsizeof, stream.blocked))
+                        for stream in pending_streams
+                    ),
+                )
             )
+            generation_start_time = time.perf_counter()
+        if component_of[start] in frozen:
+            return
 
-            if n == start:
-                for i in out_iter:
-                    if tree_size(i) <= generation:
-                        yield i
-                    else:
-                        repeat = True
 
-            for i in avoid_iter:
-                if tree_size(i) <= generation:
-                    already_checked[n].add(hash(i))
-                    old_terms[n].append(i)
-                else:
-                    repeat = True
+def finite_terms(
+    grammar: Mapping[S, Iterable[tuple[T, list[S]]]],
+    combine: Callable[[T], Callable[[Iterable[SharedTree[T]]], SharedTree[T]]],
+    limit: Optional[int] = None,
+) -> dict[S, list[SharedTree[T]]]:
+    """All terms of non-terminals with finite languages, computed bottom-up in topological order.
+
+    Non-terminals with possibly more than `limit` terms (estimated by the number of derivations)
+    are omitted, and so are all non-terminals depending on them."""
+
+    result: dict[S, list[SharedTree[T]]] = {}
+    # for each finite non-terminal: number of derivations, i.e. upper bound of number of terms
+    derivations: dict[S, int] = {}
+    for n in finite_non_terminals(grammar):
+        # arguments of productive rules are finite non-terminals
+        rules = [(c, ms) for c, ms in grammar[n] if all(m in derivations for m in ms)]
+        derivations[n] = sum(math.prod(derivations[m] for m in ms) for _, ms in rules)
+        # arguments have at most as many derivations as n
+        if limit is None or derivations[n] <= limit:
+            terms: dict[SharedTree[T], None] = {}
+            for c, ms in rules:
+                combine_args = combine(c)
+                for args in itertools.product(*(result[m] for m in ms)):
+                    terms[combine_args(args)] = None
+            result[n] = list(terms)
+    return result
+
+
+def count_terms(start: S, grammar: Mapping[S, Iterable[tuple[T, list[S]]]]) -> Optional[int]:
+    """The number of distinct terms derivable from the start symbol, or None if it is infinite.
+
+    Terms are counted bottom-up by their derivations. Only rules with equal combinators and
+    arities of the same non-terminal may derive equal terms. Just for these, the terms of the
+    argument non-terminals are computed to count distinct terms."""
+
+    grammar = reachable_grammar(grammar, start)
+    finite = finite_non_terminals(grammar)
+    if start not in finite:
+        return None if start in productive_non_terminals(grammar) else 0
+
+    # for each finite non-terminal: its productive (and distinct) rules
+    rules: dict[S, list[tuple[T, list[S]]]] = {}
+    for n in finite:
+        rules[n] = [
+            (c, list(ms))
+            for c, ms in dict.fromkeys((c, tuple(ms)) for c, ms in grammar[n])
+            if all(m in rules for m in ms)
+        ]
+
+    table: TreeTable[T] = TreeTable()
+    # terms of non-terminals, computed on demand
+    terms: dict[S, list[SharedTree[T]]] = {}
+
+    def compute_terms(non_terminals: Iterable[S]) -> None:
+        required = reachable_grammar(rules, *non_terminals)
+        for n in finite:
+            if n in required and n not in terms:
+                terms[n] = list(
+                    dict.fromkeys(
+                        table.make(c, args)
+                        for c, ms in rules[n]
+                        for args in itertools.product(*(terms[m] for m in ms))
+                    )
+                )
+
+    counts: dict[S, int] = {}
+    for n in finite:
+        # rules with equal combinator and arity
+        ambiguous: dict[tuple[T, int], list[list[S]]] = {}
+        for c, ms in rules[n]:
+            ambiguous.setdefault((c, len(ms)), []).append(ms)
+        counts[n] = 0
+        for arguments in ambiguous.values():
+            if len(arguments) == 1:
+                counts[n] += math.prod(counts[m] for m in arguments[0])
+            else:
+                compute_terms(m for ms in arguments for m in ms)
+                counts[n] += len(
+                    {
+                        args
+                        for ms in arguments
+                        for args in itertools.product(*(terms[m] for m in ms))
+                    }
+                )
+    return counts[start]
 
 
 def enumerate_terms_old(
@@ -162,164 +591,356 @@ def enumerate_terms_old(
                 yield term
 
 
-def group_by_tree_size(terms: Iterable[Tree[T]]) -> dict[int, set[Tree[T]]]:
-    """Groups terms by tree_size as a dictionary mapping size to sets of terms."""
+def compositions(total: int, parts: int) -> Iterator[tuple[int, ...]]:
+    """All tuples of `parts` positive integers summing up to `total`."""
 
-    result: dict[int, set[Tree[T]]] = dict()
-    for term in terms:
-        size = tree_size(term)
-        ts = result.get(size, set())
-        ts.add(term)
-        result[size] = ts
-    return result
-
-
-def grouped_bounded_union(
-    grouped_old_terms: dict[int, set[Tree[T]]],
-    grouped_new_terms: dict[int, set[Tree[T]]],
-    max_count: int,
-    term_size: int,
-) -> set[Tree[T]]:
-    return set(
-        itertools.chain.from_iterable(
-            bounded_union(
-                grouped_old_terms.get(i, set()),
-                grouped_new_terms.get(i, set()),
-                max_count,
-            )
-            for i in range(term_size + 1)
-        )
-    )
+    if parts == 0:
+        if total == 0:
+            yield ()
+        return
+    # choose parts - 1 distinct cut points between 1 and total - 1
+    for cuts in itertools.combinations(range(1, total), parts - 1):
+        yield tuple(b - a for a, b in zip((0,) + cuts, cuts + (total,)))
 
 
 def enumerate_terms_of_size(
     start: S,
     grammar: Mapping[S, Iterable[tuple[T, list[S]]]],
     term_size: int,
-    max_count: int,
-) -> Iterable[Tree[T]]:
+    max_count: Optional[int] = 100,
+    table: Optional[TreeTable[T]] = None,
+) -> Iterable[SharedTree[T]]:
     """Given a start symbol, a tree grammar, and term size, enumerate at most max_count ground terms
-    of specified term size derivable from the start symbol."""
+    of specified term size derivable from the start symbol.
 
-    # accumulator for previously seen terms
-    result: set[Tree[T]] = set()
-    terms: dict[S, set[Tree[T]]] = {n: set() for n in grammar.keys()}
-    terms_size: int = -1
-    while terms_size < sum(len(ts) for ts in terms.values()):
-        terms_size = sum(len(ts) for ts in terms.values())
+    Terms of each size are computed once per non-terminal from argument terms whose sizes add up
+    to exactly `term_size - 1`. Terms derivable from the start symbol are generated lazily."""
 
-        new_terms: Callable[[Iterable[tuple[T, list[S]]]], set[Tree[T]]] = lambda exprs: {
-            (c, tuple(args))
-            for (c, ms) in exprs
-            for args in itertools.product(*(terms[m] for m in ms))
-        }
+    if start not in grammar or term_size < 1:
+        return
+    if table is None:
+        table = TreeTable()
+
+    rules = reachable_grammar(grammar, start)
+
+    # terms[size][n]: distinct terms of given size derivable from n
+    terms: list[dict[S, list[SharedTree[T]]]] = [{}]
+
+    def new_terms(exprs: Iterable[tuple[T, list[S]]], size: int) -> Iterator[SharedTree[T]]:
+        for c, ms in exprs:
+            for sizes in compositions(size - 1, len(ms)):
+                buckets = [terms[k].get(m, []) for m, k in zip(ms, sizes)]
+                if all(buckets):
+                    for args in itertools.product(*buckets):
+                        yield table.make(c, args)
+
+    # bottom-up, all terms of smaller size
+    for size in range(1, term_size):
+        terms.append(
+            {n: list(dict.fromkeys(new_terms(exprs, size))) for n, exprs in rules.items()}
+        )
 
-        terms = {
-            n: terms[n]
-            if len(terms[n]) >= max_count * (terms_size + 1)
-            else grouped_bounded_union(
-                group_by_tree_size(terms[n]),
-                group_by_tree_size(new_terms(exprs)),
-                max_count,
-                term_size,
+    result: set[SharedTree[T]] = set()
+    for term in new_terms(rules[start], term_size):
+        if max_count is not None and len(result) >= max_count:
+            return
+        if term not in result:
+            result.add(term)
+            yield term
+
+
+@dataclass(frozen=True)
+class CallPlan:
+    """How to call a combinator, computed once from its signature."""
+
+    is_callable: bool
+    # number of parameters without default values (excluding a var_args parameter)
+    simple_arity: int = 0
+    # number of parameters with default values
+    default_arity: int = 0
+    # does the combinator have a var_args parameter, which takes all available arguments?
+    pop_all: bool = False
+    # is the combinator called without arguments?
+    nullary: bool = False
+    # error message, if the combinator does not expose a signature
+    error: Optional[str] = None
+
+    @staticmethod
+    def of(c: Any) -> "CallPlan":
+        if not callable(c):
+            return CallPlan(is_callable=False)
+        try:
+            parameters_of_c = list(signature(c).parameters.values())
+        except ValueError:
+            return CallPlan(
+                is_callable=True,
+                error=(
+                    f"Combinator {c} does not expose a signature. "
+                    "If it's a built-in, you can simply wrap it in another function."
+                ),
             )
-            for (n, exprs) in grammar.items()
-        }
 
-        for term in terms[start]:
-            # yield term if not seen previously
-            if tree_size(term) == term_size and term not in result:
-                result.add(term)
-                yield term
+        simple_arity = len(list(filter(lambda x: x.default == _empty, parameters_of_c)))
+        default_arity = len(list(filter(lambda x: x.default != _empty, parameters_of_c)))
+
+        # if any parameter is marked as var_args, we need to use all available arguments
+        pop_all = any(map(lambda x: x.kind == _ParameterKind.VAR_POSITIONAL, parameters_of_c))
+
+        # If a var_args parameter is found, we need to subtract it from the normal parameters.
+        # Note: python does only allow one parameter in the form of *arg
+        if pop_all:
+            simple_arity -= 1
+
+        return CallPlan(
+            is_callable=True,
+            simple_arity=simple_arity,
+            default_arity=default_arity,
+            pop_all=pop_all,
+            nullary=len(parameters_of_c) == 0,
+        )
+
+
+def prepare_call_plans(combinators: Iterable[Hashable]) -> dict[Hashable, CallPlan]:
+    """Call plans for the given combinators, e.g. for all combinators of a repository."""
+
+    return {c: CallPlan.of(c) for c in combinators}
+
+
+class InterpretationCache:
+    """Least recently used cache for interpretations of (sub)terms.
+
+    Interpretations of terms containing an impure combinator are never cached. Cached
+    interpretations are shared between all terms containing the same subterm, so combinators
+    should not mutate their arguments.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 100_000, impure: Iterable[Hashable] = ()):
+        self.maxsize = maxsize
+        self.impure: set[Hashable] = set(impure)
+        self.interpretations: OrderedDict[Tree[Any], Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
 
+    def __len__(self) -> int:
+        return len(self.interpretations)
 
-def interpret_term(term: Tree[T]) -> Any:
-    """Recursively evaluate given term."""
+    def __contains__(self, term: object) -> bool:
+        return term in self.interpretations
+
+    def mark_impure(self, *combinators: Hashable) -> None:
+        """Never cache interpretations of terms containing any of the given combinators."""
+
+        self.impure.update(combinators)
+        self.clear()
+
+    def clear(self) -> None:
+        self.interpretations.clear()
+
+    def lookup(self, term: Tree[Any]) -> tuple[bool, Any]:
+        """Returns (True, interpretation) for cached terms, otherwise (False, None)."""
+
+        try:
+            interpretation = self.interpretations[term]
+        except KeyError:
+            self.misses += 1
+            return (False, None)
+        self.hits += 1
+        self.interpretations.move_to_end(term)
+        return (True, interpretation)
+
+    def store(self, term: Tree[Any], interpretation: Any) -> None:
+        self.interpretations[term] = interpretation
+        if self.maxsize is not None and len(self.interpretations) > self.maxsize:
+            self.interpretations.popitem(last=False)
+
+
+def interpret_term(
+    term: Tree[T],
+    cache: Optional[InterpretationCache] = None,
+    call_plans: Optional[MutableMapping[Hashable, CallPlan]] = None,
+) -> Any:
+    """Recursively evaluate given term.
+
+    If a cache is given, interpretations of pure subterms are looked up in and stored to it.
+    Call plans of combinators are looked up in and added to `call_plans` (see
+    `prepare_call_plans`)."""
+
+    if call_plans is None:
+        call_plans = dict()
 
     terms: deque[Tree[T]] = deque((term,))
-    combinators: deque[tuple[T, int]] = deque()
+    # decomposed terms and, if cached, their interpretation
+    combinators: deque[tuple[Tree[T], bool, Any]] = deque()
     # decompose terms
     while terms:
         t = terms.pop()
-        combinators.append((t[0], len(t[1])))
+        if cache is not None:
+            cached, interpretation = cache.lookup(t)
+            if cached:
+                combinators.append((t, True, interpretation))
+                continue
+        combinators.append((t, False, None))
         terms.extend(reversed(t[1]))
     results: deque[Any] = deque()
+    # for each result: is it free of impure combinators?
+    pure_results: deque[bool] = deque()
 
     # apply/call decomposed terms
     while combinators:
-        (c, n) = combinators.pop()
-        parameters_of_c: Iterable[Parameter] = []
-        current_combinator: partial[Any] | T | Callable[..., Any] = c
+        (t, cached, interpretation) = combinators.pop()
+        if cached:
+            results.append(interpretation)
+            pure_results.append(True)
+            continue
 
-        if callable(current_combinator):
-            try:
-                parameters_of_c = list(signature(current_combinator).parameters.values())
-            except ValueError:
-                raise RuntimeError(
-                    f"Combinator {c} does not expose a signature. "
-                    "If it's a built-in, you can simply wrap it in another function."
-                )
+        (c, n) = (t[0], len(t[1]))
+        arguments = deque((results.pop() for _ in range(n)))
+        try:
+            plan = call_plans[c]
+        except KeyError:
+            plan = call_plans[c] = CallPlan.of(c)
+        interpretation = _apply_combinator(c, plan, arguments)
+        results.append(interpretation)
+
+        if cache is not None:
+            pure = c not in cache.impure
+            for _ in range(n):
+                pure = pure_results.pop() and pure
+            if pure:
+                cache.store(t, interpretation)
+            pure_results.append(pure)
+    return results.pop()
 
-            if n == 0 and len(parameters_of_c) == 0:
-                current_combinator = current_combinator()
 
-        arguments = deque((results.pop() for _ in range(n)))
+def interpret_terms(
+    terms: Iterable[Tree[T]],
+    cache: Optional[InterpretationCache] = None,
+    call_plans: Optional[MutableMapping[Hashable, CallPlan]] = None,
+    executor: Optional[Executor] = None,
+    chunk_size: int = 100,
+    max_pending: int = 16,
+) -> Iterable[tuple[Tree[T], Any]]:
+    """Evaluate a batch of terms, yielding pairs (term, interpretation).
+
+    Each distinct pure subterm is evaluated once for the whole batch (using `cache`, which
+    defaults to an unbounded cache for the batch).
+
+    If an executor (e.g. a thread or process pool) is given, terms are split into chunks of
+    `chunk_size` terms, which are interpreted by the executor. Within a chunk, each distinct pure
+    subterm is evaluated once. Terms are read lazily, at most `max_pending` chunks are submitted
+    at a time, and results are yielded as they complete. Otherwise, results are yielded in the
+    order of `terms`.
+    """
 
-        while arguments:
-            if not callable(current_combinator):
-                raise RuntimeError(
-                    f"Combinator {c} is applied to {n} argument(s), "
-                    f"but can only be applied to {n - len(arguments)}"
-                )
+    if cache is None:
+        cache = InterpretationCache(maxsize=None)
+    if call_plans is None:
+        call_plans = dict()
 
-            use_partial = False
+    if executor is None:
+        for term in terms:
+            yield (term, interpret_term(term, cache, call_plans))
+        return
 
-            simple_arity = len(list(filter(lambda x: x.default == _empty, parameters_of_c)))
-            default_arity = len(list(filter(lambda x: x.default != _empty, parameters_of_c)))
+    impure = frozenset(cache.impure)
+    # submitted chunks of terms
+    pending: dict[Future[list[tuple[bool, Any]]], list[Tree[T]]] = dict()
 
-            # if any parameter is marked as var_args, we need to use all available arguments
-            pop_all = any(map(lambda x: x.kind == _ParameterKind.VAR_POSITIONAL, parameters_of_c))
+    def results(done: Iterable[Future[list[tuple[bool, Any]]]]) -> Iterator[tuple[Tree[T], Any]]:
+        for future in done:
+            for term, (pure, interpretation) in zip(pending.pop(future), future.result()):
+                if pure:
+                    cache.store(term, interpretation)
+                yield (term, interpretation)
 
-            # If a var_args parameter is found, we need to subtract it from the normal parameters.
-            # Note: python does only allow one parameter in the form of *arg
-            if pop_all:
-                simple_arity -= 1
+    chunk: list[Tree[T]] = []
+    for term in terms:
+        cached, interpretation = cache.lookup(term)
+        if cached:
+            yield (term, interpretation)
+            continue
+        chunk.append(term)
+        if len(chunk) >= chunk_size:
+            pending[executor.submit(_interpret_chunk, chunk, impure, call_plans)] = chunk
+            chunk = []
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            else:
+                done = {future for future in pending if future.done()}
+            yield from results(done)
+    if chunk:
+        pending[executor.submit(_interpret_chunk, chunk, impure, call_plans)] = chunk
+    yield from results(as_completed(list(pending)))
+
+
+def _interpret_chunk(
+    terms: list[Tree[T]],
+    impure: frozenset[Hashable],
+    call_plans: MutableMapping[Hashable, CallPlan],
+) -> list[tuple[bool, Any]]:
+    """Interpret terms (in a worker of `interpret_terms`), sharing interpretations of pure
+    subterms. Returns for each term, whether it is pure, and its interpretation."""
+
+    cache = InterpretationCache(maxsize=None, impure=impure)
+    result: list[tuple[bool, Any]] = []
+    for term in terms:
+        interpretation = interpret_term(term, cache, call_plans)
+        result.append((term in cache, interpretation))
+    return result
+
+
+def _apply_combinator(c: T, plan: CallPlan, arguments: deque[Any]) -> Any:
+    """Call (or partially apply) a combinator on the given arguments according to its plan."""
 
-            # If a combinator needs more arguments than available, we need to use partial
-            # application
-            if simple_arity > len(arguments):
-                use_partial = True
+    n = len(arguments)
+    current_combinator: partial[Any] | T | Callable[..., Any] = c
 
-            fixed_parameters: deque[Any] = deque(
-                arguments.popleft() for _ in range(min(simple_arity, len(arguments)))
+    if plan.error is not None:
+        raise RuntimeError(plan.error)
+
+    if plan.is_callable and n == 0 and plan.nullary:
+        current_combinator = c()  # type: ignore[operator]
+
+    while arguments:
+        if not callable(current_combinator):
+            raise RuntimeError(
+                f"Combinator {c} is applied to {n} argument(s), "
+                f"but can only be applied to {n - len(arguments)}"
             )
 
-            var_parameters: deque[Any] = deque()
-            if pop_all:
-                var_parameters.extend(arguments)
-                arguments = deque()
-
-            default_parameters: deque[Any] = deque()
-            for _ in range(default_arity):
-                try:
-                    default_parameters.append(arguments.popleft())
-                except IndexError:
-                    pass
-
-            if use_partial:
-                current_combinator = partial(
-                    current_combinator,
-                    *fixed_parameters,
-                    *var_parameters,
-                    *default_parameters,
-                )
-            else:
-                current_combinator = current_combinator(
-                    *fixed_parameters, *var_parameters, *default_parameters
-                )
+        # If a combinator needs more arguments than available, we need to use partial
+        # application
+        use_partial = plan.simple_arity > len(arguments)
 
-        results.append(current_combinator)
-    return results.pop()
+        fixed_parameters: deque[Any] = deque(
+            arguments.popleft() for _ in range(min(plan.simple_arity, len(arguments)))
+        )
+
+        var_parameters: deque[Any] = deque()
+        if plan.pop_all:
+            var_parameters.extend(arguments)
+            arguments = deque()
+
+        default_parameters: deque[Any] = deque()
+        for _ in range(plan.default_arity):
+            try:
+                default_parameters.append(arguments.popleft())
+            except IndexError:
+                pass
+
+        if use_partial:
+            current_combinator = partial(
+                current_combinator,
+                *fixed_parameters,
+                *var_parameters,
+                *default_parameters,
+            )
+        else:
+            current_combinator = current_combinator(
+                *fixed_parameters, *var_parameters, *default_parameters
+            )
+
+    return current_combinator
 
 
 def test() -> None:
@@ -1,12 +1,18 @@
 # Propositional Finite Combinatory Logic
 
-from collections import defaultdict, deque
-from collections.abc import Hashable, Iterable, Mapping, MutableMapping, Sequence
+import heapq
+import itertools
+import math
+import time
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Hashable, Iterable, Iterator, Mapping, MutableMapping, Sequence
+from dataclasses import dataclass, field
 from functools import reduce
-from typing import Callable, Generic, TypeAlias, TypeVar
+from typing import Any, Callable, Generic, Optional, TypeAlias, TypeVar
 
 from .combinatorics import maximal_elements, minimal_covers, partition
-from .subtypes import Subtypes
+from .enumeration import CallPlan, SharedTree, Tree, TreeTable, prepare_call_plans
+from .subtypes import BATCH_THRESHOLD, Subtypes
 from .types import Arrow, Intersection, Type
 
 T = TypeVar("T", bound=Hashable, covariant=True)
@@ -18,6 +24,9 @@ MultiArrow: TypeAlias = tuple[list[Type], Type]
 
 TreeGrammar: TypeAlias = MutableMapping[Type, deque[tuple[C, list[Type]]]]
 
+# priority of a target type in the worklist of inhabitation (smaller priorities first)
+Schedule: TypeAlias = Callable[[Type], Any]
+
 
 def show_grammar(grammar: TreeGrammar[C]) -> Iterable[str]:
     for clause, possibilities in grammar.items():
@@ -36,45 +45,332 @@ def mstr(m: MultiArrow) -> tuple[str, str]:
     return (str(list(map(str, m[0]))), str(m[1]))
 
 
+@dataclass(frozen=True)
+class CombinatorClass(Generic[C]):
+    """Combinators with equal types, which are interchangeable in every term.
+
+    Compact grammars (see `FiniteCombinatoryLogic.inhabit_compact`) contain a single rule per
+    class instead of one rule per combinator."""
+
+    combinators: tuple[C, ...]
+
+    def __str__(self) -> str:
+        return "{" + ", ".join(map(str, self.combinators)) + "}"
+
+
+def expand_grammar(grammar: TreeGrammar[C | CombinatorClass[C]]) -> TreeGrammar[C]:
+    """Replace rules of combinator classes by rules of their combinators."""
+
+    result: TreeGrammar[C] = defaultdict(deque)
+    for target, possibilities in grammar.items():
+        for combinator, args in possibilities:
+            if isinstance(combinator, CombinatorClass):
+                result[target].extend((c, args) for c in combinator.combinators)
+            else:
+                result[target].append((combinator, args))
+    return result
+
+
+def expand_term(
+    term: Tree[C | CombinatorClass[C]], table: Optional[TreeTable[C]] = None
+) -> Iterator[SharedTree[C]]:
+    """All terms obtained by replacing each combinator class by one of its combinators.
+
+    Expansions are generated lazily, the i-th expansion is decoded from i in the mixed radix
+    system given by the number of combinators of each node. Expanded terms are hash-consed by
+    `table`. Shared terms without combinator classes are returned as they are."""
+
+    if table is None:
+        table = TreeTable()
+
+    # decompose terms in pre-order, for each node: its combinators and positions of its arguments
+    nodes: list[tuple[tuple[C, ...], list[int]]] = []
+    terms: deque[tuple[Tree[C | CombinatorClass[C]], Optional[int]]] = deque(((term, None),))
+    while terms:
+        (t, parent) = terms.pop()
+        (c, args) = t
+        if parent is not None:
+            nodes[parent][1].append(len(nodes))
+        nodes.append((c.combinators if isinstance(c, CombinatorClass) else (c,), []))
+        terms.extend((arg, len(nodes) - 1) for arg in reversed(args))
+
+    # for each node: number of expansions, and if there is just one, the expanded node
+    counts: list[int] = [0] * len(nodes)
+    expanded: dict[int, SharedTree[C]] = {}
+    for i in reversed(range(len(nodes))):
+        (cs, children) = nodes[i]
+        counts[i] = len(cs) * math.prod(counts[j] for j in children)
+        if counts[i] == 1:
+            expanded[i] = table.make(cs[0], (expanded[j] for j in children))
+    if counts[0] == 1:
+        yield term if isinstance(term, SharedTree) else expanded[0]
+        return
+
+    # nodes with several expansions (in pre-order)
+    variable = [i for i in range(len(nodes)) if counts[i] > 1]
+    indices: list[int] = [0] * len(nodes)
+    for index in range(counts[0]):
+        # decode digits top-down
+        indices[0] = index
+        for i in variable:
+            (cs, children) = nodes[i]
+            (rest, indices[i]) = divmod(indices[i], len(cs))
+            for j in children:
+                (rest, indices[j]) = divmod(rest, counts[j])
+        # build expanded terms bottom-up
+        for i in reversed(variable):
+            (cs, children) = nodes[i]
+            expanded[i] = table.make(cs[indices[i]], (expanded[j] for j in children))
+        yield expanded[0]
+
+
+def grammar_size(grammar: TreeGrammar[C]) -> tuple[int, int]:
+    """Number of non-terminals and number of rules of a grammar."""
+
+    return (len(grammar), sum(len(rules) for rules in grammar.values()))
+
+
+def smallest_type_first(ty: Type) -> int:
+    """Schedule targets by their size."""
+
+    return ty.size
+
+
+def fewest_paths_first(ty: Type) -> int:
+    """Schedule targets by their number of (organized) paths, i.e. elements to be covered."""
+
+    return len(ty.organized)
+
+
+class InhabitedFirst:
+    """Schedule targets known to be inhabited from previous runs first, then by a given schedule.
+
+    Inhabited targets are recorded from grammars (see `record`)."""
+
+    def __init__(self, schedule: Schedule = smallest_type_first):
+        self.schedule = schedule
+        self.inhabited: set[Type] = set()
+
+    def record(self, grammar: TreeGrammar[Any]) -> None:
+        self.inhabited.update(grammar.keys())
+
+    def __call__(self, ty: Type) -> tuple[bool, Any]:
+        return (ty not in self.inhabited, self.schedule(ty))
+
+
+class _Worklist:
+    """Targets to be explored.
+
+    Without schedule, targets are explored first-in first-out (or last-in first-out if `lifo`),
+    otherwise by increasing priority (first-in first-out among equal priorities)."""
+
+    def __init__(self, targets: Iterable[Type], schedule: Optional[Schedule], lifo: bool = False):
+        self.schedule = schedule
+        self.lifo = lifo
+        self.targets: deque[Type] = deque(targets if schedule is None else ())
+        self.queue: list[tuple[Any, int, Type]] = []
+        self.counter = itertools.count()
+        if schedule is not None:
+            self.extend(targets)
+
+    def __bool__(self) -> bool:
+        return bool(self.targets) or bool(self.queue)
+
+    def extend(self, targets: Iterable[Type]) -> None:
+        if self.schedule is not None:
+            for target in targets:
+                heapq.heappush(self.queue, (self.schedule(target), next(self.counter), target))
+        elif self.lifo:
+            self.targets.extend(targets)
+        else:
+            self.targets.extendleft(targets)
+
+    def pop(self) -> Type:
+        if self.schedule is not None:
+            return heapq.heappop(self.queue)[2]
+        return self.targets.pop()
+
+
+@dataclass
+class InhabitationStatistics:
+    """Statistics collected by `FiniteCombinatoryLogic.inhabit`, if given.
+
+    Statistics of multiple calls to `inhabit` are accumulated, except for grammar sizes, which
+    describe the grammar of the last call."""
+
+    # number of explored (distinct) targets
+    targets: int = 0
+    # for each combinator (class): number of calls of _subqueries (one per arity)
+    subqueries: dict[Any, int] = field(default_factory=dict)
+    # number of subtype checks
+    subtype_checks: int = 0
+    # number of subqueries skipped, because one of their arguments is known to be empty
+    empty_subqueries: int = 0
+    # number of calls of _subqueries answered by (hits) and missing in (misses) the subquery cache
+    subquery_cache_hits: int = 0
+    subquery_cache_misses: int = 0
+    # for each number of minimal covers: how many calls of _subqueries resulted in it
+    cover_counts: dict[int, int] = field(default_factory=dict)
+    # for each size (number of multi-arrows) of a minimal cover: how many covers have it
+    cover_sizes: dict[int, int] = field(default_factory=dict)
+    # time (in seconds) spent in inhabit and in _prune
+    time: float = 0.0
+    prune_time: float = 0.0
+    # number of non-terminals and rules before and after _prune
+    grammar_size_before: tuple[int, int] = (0, 0)
+    grammar_size_after: tuple[int, int] = (0, 0)
+
+    @property
+    def subquery_cache_hit_rate(self) -> float:
+        lookups = self.subquery_cache_hits + self.subquery_cache_misses
+        return self.subquery_cache_hits / lookups if lookups > 0 else 0.0
+
+    def __str__(self) -> str:
+        subqueries = sum(self.subqueries.values())
+        covers = sum(self.cover_sizes.values())
+        return (
+            f"targets: {self.targets}, subqueries: {subqueries}, "
+            f"subquery cache hit rate: {self.subquery_cache_hit_rate:.2f}, "
+            f"subtype checks: {self.subtype_checks}, covers: {covers}, "
+            f"time: {self.time:.3f}s (prune: {self.prune_time:.3f}s), "
+            f"grammar (non-terminals, rules): {self.grammar_size_before} "
+            f"-> {self.grammar_size_after}"
+        )
+
+
+class FunctionTypes:
+    """Presents a type as a sequence of 0-ary, 1-ary, ..., n-ary function types.
+
+    Function types of each arity are computed on demand (when iterating) and cached. Multi-arrows
+    with equal arguments are merged into one multi-arrow, whose target is the intersection of
+    their targets."""
+
+    def __init__(self, ty: Type):
+        self.arities: list[list[MultiArrow]] = [[([], ty)]]
+        # are all arities computed?
+        self.complete = False
+
+    @staticmethod
+    def _unary_function_types(ty: Type) -> Iterable[tuple[Type, Type]]:
+        tys: deque[Type] = deque((ty,))
+        while tys:
+            match tys.pop():
+                case Arrow(src, tgt) if not tgt.is_omega:
+                    yield (src, tgt)
+                case Intersection(sigma, tau):
+                    tys.extend((sigma, tau))
+
+    def _next_arity(self) -> list[MultiArrow]:
+        targets: dict[tuple[Type, ...], list[Type]] = {}
+        for args, tgt in self.arities[-1]:
+            for new_arg, new_tgt in FunctionTypes._unary_function_types(tgt):
+                targets.setdefault((*args, new_arg), []).append(new_tgt)
+        return [
+            (list(args), Type.intersect(list(dict.fromkeys(tgts))))
+            for args, tgts in targets.items()
+        ]
+
+    def __iter__(self) -> Iterator[list[MultiArrow]]:
+        arity = 0
+        while True:
+            if arity < len(self.arities):
+                yield self.arities[arity]
+                arity += 1
+            elif self.complete:
+                return
+            else:
+                next_arity = self._next_arity()
+                if next_arity:
+                    self.arities.append(next_arity)
+                else:
+                    self.complete = True
+
+
 class FiniteCombinatoryLogic(Generic[C]):
-    def __init__(self, repository: Mapping[C, Type], subtypes: Subtypes):
-        self.repository: Mapping[C, list[list[MultiArrow]]] = {
-            c: list(FiniteCombinatoryLogic._function_types(ty))
-            for c, ty in repository.items()
+    def __init__(
+        self,
+        repository: Mapping[C, Type],
+        subtypes: Subtypes,
+        subquery_cache_size: Optional[int] = 100_000,
+    ):
+        # combinators with equal types are grouped, subqueries are computed once per class
+        classes: dict[Type, list[C]] = {}
+        for c, ty in repository.items():
+            classes.setdefault(ty, []).append(c)
+        # for each class: its representation in grammars (a single combinator is represented by
+        # itself) and its function types, which are shared by all combinators of the class
+        self.combinator_classes: list[tuple[C | CombinatorClass[C], FunctionTypes]] = [
+            (
+                combinators[0] if len(combinators) == 1 else CombinatorClass(tuple(combinators)),
+                FunctionTypes(ty),
+            )
+            for ty, combinators in classes.items()
+        ]
+        self.repository: Mapping[C, FunctionTypes] = {
+            c: function_types
+            for representation, function_types in self.combinator_classes
+            for c in (
+                representation.combinators
+                if isinstance(representation, CombinatorClass)
+                else (representation,)
+            )
         }
         self.subtypes = subtypes
-
-    @staticmethod
-    def _function_types(ty: Type) -> Iterable[list[MultiArrow]]:
-        """Presents a type as a list of 0-ary, 1-ary, ..., n-ary function types."""
-
-        def unary_function_types(ty: Type) -> Iterable[tuple[Type, Type]]:
-            tys: deque[Type] = deque((ty,))
-            while tys:
-                match tys.pop():
-                    case Arrow(src, tgt) if not tgt.is_omega:
-                        yield (src, tgt)
-                    case Intersection(sigma, tau):
-                        tys.extend((sigma, tau))
-
-        current: list[MultiArrow] = [([], ty)]
-        while len(current) != 0:
-            yield current
-            current = [
-                (args + [new_arg], new_tgt)
-                for (args, tgt) in current
-                for (new_arg, new_tgt) in unary_function_types(tgt)
-            ]
+        # number of changes of subtypes, which are taken into account by the caches below
+        self.subtypes_changes = len(subtypes.changes)
+        # types known to be empty (not inhabited), shared by all calls of inhabit
+        self.empty_types: set[Type] = set()
+        # least recently used cache of subqueries for (multi-arrows, paths of a target), where
+        # multi-arrows (of a combinator class and arity) are identified by id, since they are
+        # kept by their FunctionTypes
+        self.subquery_cache_size = subquery_cache_size
+        # for each target: its minimal paths (paths implied by other paths are removed)
+        self.target_paths: dict[Type, list[Type]] = {}
+        self.subquery_cache: OrderedDict[
+            tuple[int, frozenset[Type]], Sequence[list[Type]]
+        ] = OrderedDict()
+        # call plans for interpretation of terms (see interpret_term)
+        self.call_plans: dict[Hashable, CallPlan] = prepare_call_plans(repository.keys())
 
     def _subqueries(
-        self, nary_types: list[MultiArrow], paths: list[Type]
+        self,
+        nary_types: list[MultiArrow],
+        paths: list[Type],
+        statistics: Optional[InhabitationStatistics] = None,
     ) -> Sequence[list[Type]]:
-        # does the target of a multi-arrow contain a given type?
-        target_contains: Callable[
-            [MultiArrow, Type], bool
-        ] = lambda m, t: self.subtypes.check_subtype(m[1], t)
+        check_subtype: Callable[[Type, Type], bool] = self.subtypes.check_subtype
+        if statistics is not None:
+            counted_statistics = statistics
+
+            def check_subtype(subtype: Type, supertype: Type) -> bool:
+                counted_statistics.subtype_checks += 1
+                return self.subtypes.check_subtype(subtype, supertype)
+
+        # does the target of a multi-arrow contain a given path?
+        if len(paths) < BATCH_THRESHOLD:
+            # checked on demand, covering stops at the first path, which cannot be covered
+            target_contains: Callable[[int, int], bool] = lambda m, t: check_subtype(
+                nary_types[m][1], paths[t]
+            )
+        else:
+            # all pairs are checked at once, sharing decompositions of targets
+            contained = self.subtypes.subtype_matrix([m[1] for m in nary_types], paths)
+            if statistics is not None:
+                statistics.subtype_checks += len(nary_types) * len(paths)
+            target_contains = lambda m, t: contained[m][t]
         # cover target using targets of multi-arrows in nary_types
-        covers = minimal_covers(nary_types, paths, target_contains)
+        covers = [
+            [nary_types[m] for m in cover]
+            for cover in minimal_covers(
+                list(range(len(nary_types))), list(range(len(paths))), target_contains
+            )
+        ]
+        if statistics is not None:
+            statistics.cover_counts[len(covers)] = (
+                statistics.cover_counts.get(len(covers), 0) + 1
+            )
+            for cover in covers:
+                statistics.cover_sizes[len(cover)] = statistics.cover_sizes.get(len(cover), 0) + 1
         if len(covers) == 0:
             return []
         # intersect corresponding arguments of multi-arrows in each cover
@@ -86,17 +382,300 @@ class FiniteCombinatoryLogic(Generic[C]):
             list(reduce(intersect_args, (m[0] for m in ms))) for ms in covers
         )
         # consider only maximal argument vectors
-        compare_args = lambda args1, args2: all(
-            map(self.subtypes.check_subtype, args1, args2)
-        )
+        compare_args = lambda args1, args2: all(map(check_subtype, args1, args2))
         return maximal_elements(intersected_args, compare_args)
 
-    def inhabit(self, *targets: Type) -> TreeGrammar[C]:
-        type_targets = deque(targets)
+    def _cached_subqueries(
+        self,
+        nary_types: list[MultiArrow],
+        paths: list[Type],
+        path_set: frozenset[Type],
+        statistics: Optional[InhabitationStatistics] = None,
+    ) -> Sequence[list[Type]]:
+        """Subqueries (see `_subqueries`) looked up in and stored to the subquery cache.
+
+        Subqueries do not depend on the order of paths, hence targets with equal sets of paths
+        share their subqueries."""
+
+        key = (id(nary_types), path_set)
+        try:
+            subqueries = self.subquery_cache[key]
+        except KeyError:
+            if statistics is not None:
+                statistics.subquery_cache_misses += 1
+            subqueries = self._subqueries(nary_types, paths, statistics)
+            self.subquery_cache[key] = subqueries
+            if (
+                self.subquery_cache_size is not None
+                and len(self.subquery_cache) > self.subquery_cache_size
+            ):
+                self.subquery_cache.popitem(last=False)
+            return subqueries
+        if statistics is not None:
+            statistics.subquery_cache_hits += 1
+        self.subquery_cache.move_to_end(key)
+        return subqueries
+
+    def _is_empty(
+        self,
+        ty: Type,
+        nonempty: set[Type],
+        statistics: Optional[InhabitationStatistics] = None,
+    ) -> bool:
+        """Is `ty` known to be empty, i.e. a subtype of a type known to be empty?
+
+        Types, which are not known to be empty, are added to `nonempty` to avoid repeated checks
+        (as long as `empty_types` does not change)."""
+
+        if ty in self.empty_types:
+            return True
+        if ty in nonempty or ty.is_omega:
+            return False
+        for empty_type in self.empty_types:
+            if statistics is not None:
+                statistics.subtype_checks += 1
+            if self.subtypes.check_subtype(ty, empty_type):
+                self.empty_types.add(ty)
+                return True
+        nonempty.add(ty)
+        return False
+
+    def _update_caches(self) -> None:
+        """Invalidate cached results, which may depend on changes of subtypes.
+
+        A cached result may change only if it involves a subtype and a supertype of a change. If
+        subtypes were added, types known to be empty may be inhabited now. Removing subtypes does
+        not make empty types inhabited."""
+
+        changes = self.subtypes.changes[self.subtypes_changes :]
+        if not changes:
+            return
+        self.subtypes_changes = len(self.subtypes.changes)
+
+        def affected(names: set[str]) -> bool:
+            return any(
+                not names.isdisjoint(subtypes) and not names.isdisjoint(supertypes)
+                for subtypes, supertypes, _ in changes
+            )
+
+        if any(added for _, _, added in changes):
+            self.empty_types.clear()
+        self.target_paths = {
+            target: paths
+            for target, paths in self.target_paths.items()
+            if not affected(target.constructor_names())
+        }
+        # names in multi-arrows (by id, see subquery_cache)
+        arrow_names: dict[int, set[str]] = {
+            id(nary_types): set().union(
+                *(ty.constructor_names() for args, tgt in nary_types for ty in (*args, tgt))
+            )
+            for _, function_types in self.combinator_classes
+            for nary_types in function_types.arities
+        }
+        for key in [
+            key
+            for key in self.subquery_cache
+            if affected(arrow_names[key[0]].union(*(path.constructor_names() for path in key[1])))
+        ]:
+            del self.subquery_cache[key]
+
+    def _paths(self, target: Type) -> list[Type]:
+        """Minimal organized paths of a target.
+
+        A path, which is a supertype of another path, is covered by every set covering the other
+        path, hence it does not change minimal covers and is removed."""
+
+        try:
+            return self.target_paths[target]
+        except KeyError:
+            paths = list(self.subtypes.minimize(target.organized))
+            self.target_paths[target] = paths
+            return paths
+
+    def _rules(
+        self,
+        target: Type,
+        nonempty: set[Type],
+        statistics: Optional[InhabitationStatistics] = None,
+    ) -> Iterator[tuple[C | CombinatorClass[C], list[Type]]]:
+        """Combinators (classes) and arguments of grammar rules for a target.
+
+        Rules are computed lazily for each combinator class and arity, rules with arguments known
+        to be empty are skipped."""
+
+        paths = self._paths(target)
+        path_set = frozenset(paths)
+        if statistics is not None:
+            statistics.targets += 1
+
+        # try each combinator class and arity
+        for combinator, combinator_type in self.combinator_classes:
+            for nary_types in combinator_type:
+                if statistics is not None:
+                    statistics.subqueries[combinator] = (
+                        statistics.subqueries.get(combinator, 0) + 1
+                    )
+                for subquery in self._cached_subqueries(nary_types, paths, path_set, statistics):
+                    if any(self._is_empty(arg, nonempty, statistics) for arg in subquery):
+                        if statistics is not None:
+                            statistics.empty_subqueries += 1
+                        continue
+                    # cached subqueries are copied, since they are shared by grammars
+                    yield (combinator, list(subquery))
+
+    def inhabit(
+        self,
+        *targets: Type,
+        statistics: Optional[InhabitationStatistics] = None,
+        schedule: Optional[Schedule] = None,
+    ) -> TreeGrammar[C]:
+        """Compute a tree grammar of all terms inhabiting the targets.
+
+        If `statistics` is given, it is updated with statistics of the computation. If `schedule`
+        is given, targets are explored in the order of their priorities (e.g.
+        `smallest_type_first`), otherwise breadth-first."""
+
+        return self._inhabit(targets, statistics, compact=False, schedule=schedule)
+
+    def inhabit_compact(
+        self,
+        *targets: Type,
+        statistics: Optional[InhabitationStatistics] = None,
+        schedule: Optional[Schedule] = None,
+    ) -> TreeGrammar[C | CombinatorClass[C]]:
+        """Like `inhabit`, but combinators with equal types are represented by a single
+        `CombinatorClass` in the grammar.
+
+        Enumerated terms can be expanded to terms of combinators by `expand_term`."""
+
+        return self._inhabit(targets, statistics, compact=True, schedule=schedule)
+
+    def is_inhabited(
+        self,
+        target: Type,
+        statistics: Optional[InhabitationStatistics] = None,
+        schedule: Optional[Schedule] = None,
+    ) -> bool:
+        """Decide whether some term inhabits the target.
+
+        Unlike `inhabit`, no grammar is computed and the search stops as soon as the target is
+        known to be inhabited. Without `schedule`, targets are explored depth-first."""
+
+        return self._ground(target, statistics, schedule) is not None
+
+    def inhabitant(
+        self,
+        target: Type,
+        statistics: Optional[InhabitationStatistics] = None,
+        schedule: Optional[Schedule] = None,
+    ) -> Optional[Tree[C]]:
+        """Some term inhabiting the target (or None, if there is none), see `is_inhabited`."""
+
+        ground = self._ground(target, statistics, schedule)
+        if ground is None:
+            return None
+        # build the term bottom-up, arguments of each rule became ground before its target
+        table: TreeTable[C] = TreeTable()
+        terms: dict[Type, SharedTree[C]] = {}
+        targets: list[Type] = [target]
+        while targets:
+            (combinator, args) = ground[targets[-1]]
+            missing = [arg for arg in args if arg not in terms]
+            if missing:
+                targets.extend(missing)
+                continue
+            if isinstance(combinator, CombinatorClass):
+                combinator = combinator.combinators[0]
+            terms[targets.pop()] = table.make(combinator, (terms[arg] for arg in args))
+        return terms[target]
+
+    def _ground(
+        self,
+        target: Type,
+        statistics: Optional[InhabitationStatistics],
+        schedule: Optional[Schedule],
+    ) -> Optional[dict[Type, tuple[C | CombinatorClass[C], list[Type]]]]:
+        """Explore targets until `target` is known to be ground (inhabited).
+
+        Groundness is propagated eagerly (as for Horn clauses): each rule counts its arguments,
+        which are not known to be ground. Returns for each ground target a rule making it ground,
+        or None if the target is empty."""
+
+        start_time = time.perf_counter() if statistics is not None else 0.0
+        self._update_caches()
+        type_targets = _Worklist((target,), schedule, lifo=True)
+        seen: set[Type] = set()
+        nonempty: set[Type] = set()
+        # for each ground type: rule making it ground
+        ground: dict[Type, tuple[C | CombinatorClass[C], list[Type]]] = {}
+        # rules (target, combinator, arguments), and for each rule: number of arguments not known
+        # to be ground
+        rules: list[tuple[Type, C | CombinatorClass[C], list[Type]]] = []
+        missing: list[int] = []
+        # for each type: rules waiting for it to become ground
+        waiting: dict[Type, list[int]] = defaultdict(list)
+
+        while type_targets and target not in ground:
+            current_target = type_targets.pop()
+            if current_target in seen:
+                continue
+            seen.add(current_target)
+            # If the target is omega, then the result is junk
+            if current_target.is_omega or self._is_empty(current_target, nonempty, statistics):
+                continue
+
+            rule_count = len(rules)
+            for combinator, subquery in self._rules(current_target, nonempty, statistics):
+                args = set(subquery).difference(ground)
+                if args:
+                    rules.append((current_target, combinator, subquery))
+                    missing.append(len(args))
+                    for arg in args:
+                        waiting[arg].append(len(rules) - 1)
+                    type_targets.extend(subquery)
+                    continue
+
+                # propagate groundness
+                ground[current_target] = (combinator, subquery)
+                new_ground: list[Type] = [current_target]
+                while new_ground:
+                    for i in waiting.pop(new_ground.pop(), ()):
+                        missing[i] -= 1
+                        (rule_target, rule_combinator, rule_args) = rules[i]
+                        if missing[i] == 0 and rule_target not in ground:
+                            ground[rule_target] = (rule_combinator, rule_args)
+                            new_ground.append(rule_target)
+                # the remaining rules of a ground target are not needed
+                break
+            if len(rules) == rule_count and current_target not in ground:
+                # no combinator is applicable
+                self.empty_types.add(current_target)
+                nonempty.clear()
+
+        if target not in ground:
+            # all seen targets, which are not ground, are explored completely, hence they are empty
+            self.empty_types.update(ty for ty in seen if ty not in ground and not ty.is_omega)
+        if statistics is not None:
+            statistics.time += time.perf_counter() - start_time
+        return ground if target in ground else None
+
+    def _inhabit(
+        self,
+        targets: Iterable[Type],
+        statistics: Optional[InhabitationStatistics],
+        compact: bool,
+        schedule: Optional[Schedule] = None,
+    ) -> TreeGrammar[Any]:
+        start_time = time.perf_counter() if statistics is not None else 0.0
+        self._update_caches()
+        type_targets = _Worklist(targets, schedule)
 
         # dictionary of type |-> sequence of combinatory expressions
-        memo: TreeGrammar[C] = defaultdict(deque)
+        memo: TreeGrammar[Any] = defaultdict(deque)
         seen: set[Type] = set()
+        # types checked not to be subtypes of types in self.empty_types
+        nonempty: set[Type] = set()
 
         while type_targets:
             current_target = type_targets.pop()
@@ -105,26 +684,36 @@ class FiniteCombinatoryLogic(Generic[C]):
             if current_target not in seen:
                 seen.add(current_target)
                 # If the target is omega, then the result is junk
-                if current_target.is_omega:
+                if current_target.is_omega or self._is_empty(current_target, nonempty, statistics):
                     continue
 
-                paths: list[Type] = list(current_target.organized)
-
-                # try each combinator and arity
-                for combinator, combinator_type in self.repository.items():
-                    for nary_types in combinator_type:
-                        arguments: list[list[Type]] = list(
-                            self._subqueries(nary_types, paths)
-                        )
-                        if len(arguments) == 0:
-                            continue
+                for combinator, subquery in self._rules(current_target, nonempty, statistics):
+                    if compact or not isinstance(combinator, CombinatorClass):
+                        memo[current_target].append((combinator, subquery))
+                    else:
+                        memo[current_target].extend((c, subquery) for c in combinator.combinators)
+                    type_targets.extend(subquery)
 
-                        for subquery in arguments:
-                            memo[current_target].append((combinator, subquery))
-                            type_targets.extendleft(subquery)
+                if current_target not in memo:
+                    # no combinator is applicable
+                    self.empty_types.add(current_target)
+                    nonempty.clear()
 
         # prune not inhabited types
-        FiniteCombinatoryLogic._prune(memo)
+        if statistics is None:
+            FiniteCombinatoryLogic._prune(memo)
+        else:
+            statistics.grammar_size_before = grammar_size(memo)
+            prune_start_time = time.perf_counter()
+            FiniteCombinatoryLogic._prune(memo)
+            statistics.prune_time += time.perf_counter() - prune_start_time
+            statistics.grammar_size_after = grammar_size(memo)
+        # all seen targets are explored completely, hence pruned targets are empty
+        self.empty_types.update(
+            target for target in seen if target not in memo and not target.is_omega
+        )
+        if statistics is not None:
+            statistics.time += time.perf_counter() - start_time
 
         return memo
 
@@ -0,0 +1,137 @@
+# Analysis of tree grammars
+#
+# Literature
+# [1] Tarjan, Robert. "Depth-first search and linear graph algorithms."
+#     SIAM Journal on Computing 1.2 (1972): 146-160.
+
+from collections.abc import Iterable, Mapping
+from typing import TypeVar
+
+S = TypeVar("S")  # non-terminals
+T = TypeVar("T")  # combinators
+
+
+def reachable_grammar(
+    grammar: Mapping[S, Iterable[tuple[T, list[S]]]], *starts: S
+) -> dict[S, list[tuple[T, list[S]]]]:
+    """The sub-grammar of non-terminals reachable from any of the start symbols.
+
+    Non-terminals without rules in `grammar` are omitted."""
+
+    result: dict[S, list[tuple[T, list[S]]]] = {}
+    non_terminals: list[S] = list(starts)
+    while non_terminals:
+        n = non_terminals.pop()
+        if n not in result and n in grammar:
+            result[n] = list(grammar[n])
+            non_terminals.extend(m for _, ms in result[n] for m in ms)
+    return result
+
+
+def strongly_connected_components(
+    grammar: Mapping[S, Iterable[tuple[T, list[S]]]],
+) -> list[list[S]]:
+    """Strongly connected components of the dependency graph of non-terminals [1].
+
+    A non-terminal depends on the argument non-terminals of its rules. Components are listed in
+    topological order of their dependencies, i.e. each component is preceded by all components it
+    depends on."""
+
+    successors: dict[S, list[S]] = {
+        n: list(dict.fromkeys(m for _, ms in exprs for m in ms if m in grammar))
+        for n, exprs in grammar.items()
+    }
+    index: dict[S, int] = {}
+    low_link: dict[S, int] = {}
+    stack: list[S] = []
+    on_stack: set[S] = set()
+    result: list[list[S]] = []
+
+    for root in successors:
+        if root in index:
+            continue
+        # iterative depth-first search, frames are (non-terminal, position of next successor)
+        index[root] = low_link[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        frames: list[tuple[S, int]] = [(root, 0)]
+        while frames:
+            n, i = frames.pop()
+            if i < len(successors[n]):
+                frames.append((n, i + 1))
+                m = successors[n][i]
+                if m not in index:
+                    index[m] = low_link[m] = len(index)
+                    stack.append(m)
+                    on_stack.add(m)
+                    frames.append((m, 0))
+                elif m in on_stack:
+                    low_link[n] = min(low_link[n], index[m])
+                continue
+            # all successors of n are visited
+            if frames:
+                parent = frames[-1][0]
+                low_link[parent] = min(low_link[parent], low_link[n])
+            if low_link[n] == index[n]:
+                component: list[S] = []
+                while True:
+                    m = stack.pop()
+                    on_stack.remove(m)
+                    component.append(m)
+                    if m == n:
+                        break
+                result.append(component)
+    return result
+
+
+def productive_non_terminals(grammar: Mapping[S, Iterable[tuple[T, list[S]]]]) -> set[S]:
+    """Non-terminals, from which at least one term is derivable."""
+
+    rules: list[tuple[S, list[S]]] = [(n, ms) for n, exprs in grammar.items() for _, ms in exprs]
+    # for each non-terminal: occurrences as argument of a rule
+    uses: dict[S, list[int]] = {}
+    # for each rule: number of distinct arguments not known to be productive
+    remaining: list[int] = []
+    new_productive: list[S] = []
+    for i, (n, ms) in enumerate(rules):
+        remaining.append(len(set(ms)))
+        for m in set(ms):
+            uses.setdefault(m, []).append(i)
+        if not ms:
+            new_productive.append(n)
+
+    result: set[S] = set()
+    while new_productive:
+        n = new_productive.pop()
+        if n in result:
+            continue
+        result.add(n)
+        for i in uses.get(n, []):
+            remaining[i] -= 1
+            if remaining[i] == 0:
+                new_productive.append(rules[i][0])
+    return result
+
+
+def finite_non_terminals(grammar: Mapping[S, Iterable[tuple[T, list[S]]]]) -> list[S]:
+    """Productive non-terminals, from which only finitely many terms are derivable.
+
+    A productive non-terminal has an infinite language iff it reaches a cycle of productive rules.
+    The result is in topological order, i.e. each non-terminal is preceded by its arguments."""
+
+    productive = productive_non_terminals(grammar)
+    productive_grammar: dict[S, list[tuple[T, list[S]]]] = {
+        n: [(c, ms) for c, ms in grammar[n] if all(m in productive for m in ms)]
+        for n in grammar
+        if n in productive
+    }
+    result: list[S] = []
+    finite: set[S] = set()
+    for component in strongly_connected_components(productive_grammar):
+        if len(component) > 1:
+            continue
+        (n,) = component
+        if all(m in finite for _, ms in productive_grammar[n] for m in ms):
+            finite.add(n)
+            result.append(n)
+    return result
@@ -0,0 +1,238 @@
+# Literature
+# [1] Knuth, Donald E. "A generalization of Dijkstra's algorithm."
+#     Information Processing Letters 6.1 (1977): 1-5.
+# [2] Huang, Liang, and David Chiang. "Better k-best parsing."
+#     Proceedings of the Ninth International Workshop on Parsing Technology (2005): 53-64.
+
+# The minimum cost of each non-terminal is computed by Knuth's generalization of Dijkstra's
+# algorithm [1]. Based on these, the k best derivations are extracted lazily [2, Algorithm 3].
+
+import heapq
+import itertools
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping, Sequence
+from typing import Generic, Optional, TypeVar
+
+from .enumeration import SharedTree, TreeTable, _combinator_cost
+from .grammar import reachable_grammar
+
+S = TypeVar("S")  # non-terminals
+T = TypeVar("T", bound=Hashable)
+
+# (cost, rule index, indices of argument derivations)
+Derivation = tuple[int, int, tuple[int, ...]]
+
+
+def best_costs(
+    grammar: Mapping[S, Iterable[tuple[T, list[S]]]],
+    cost: Optional[Mapping[T, int] | Callable[[T], int]] = None,
+) -> dict[S, int]:
+    """Compute the minimum cost of a term derivable from each non-terminal.
+
+    The cost of a term is the sum of the costs of its combinators (by default its size).
+    Non-terminals without derivable terms are not contained in the result."""
+
+    combinator_cost = _combinator_cost(cost)
+    rules: list[tuple[S, int, list[S]]] = [
+        (n, combinator_cost(c), args) for n, exprs in grammar.items() for c, args in exprs
+    ]
+    # for each non-terminal: occurrences as argument of a rule
+    uses: dict[S, list[int]] = {}
+    # for each rule: number of arguments without known minimum cost
+    remaining: list[int] = []
+    candidates: list[tuple[int, int, S]] = []
+    for i, (n, c_cost, args) in enumerate(rules):
+        remaining.append(len(args))
+        for m in args:
+            uses.setdefault(m, []).append(i)
+        if not args:
+            candidates.append((c_cost, i, n))
+    heapq.heapify(candidates)
+
+    result: dict[S, int] = {}
+    while candidates:
+        n_cost, _, n = heapq.heappop(candidates)
+        if n in result:
+            continue
+        result[n] = n_cost
+        for i in uses.get(n, []):
+            remaining[i] -= 1
+            if remaining[i] == 0:
+                rule_n, c_cost, args = rules[i]
+                if rule_n not in result:
+                    heapq.heappush(
+                        candidates, (c_cost + sum(result[m] for m in args), i, rule_n)
+                    )
+    return result
+
+
+class _KBest(Generic[S, T]):
+    """Lazily extracted best derivations of each non-terminal [2, Algorithm 3]."""
+
+    def __init__(
+        self,
+        grammar: Mapping[S, Iterable[tuple[T, list[S]]]],
+        combinator_cost: Callable[[T], int],
+        table: TreeTable[T],
+    ):
+        self.rules: dict[S, list[tuple[T, int, list[S]]]] = {
+            n: [(c, combinator_cost(c), args) for c, args in exprs]
+            for n, exprs in grammar.items()
+        }
+        for rules in self.rules.values():
+            for c, c_cost, _ in rules:
+                if c_cost <= 0:
+                    raise ValueError(f"Combinator {c} has non-positive cost {c_cost}")
+        self.best = best_costs(
+            {n: [(c, args) for c, _, args in rules] for n, rules in self.rules.items()},
+            combinator_cost,
+        )
+        self.table = table
+        # for each non-terminal: derivations of distinct terms in ascending order of cost
+        self.derivations: dict[S, list[Derivation]] = {}
+        # for each non-terminal: candidates for the next derivation, and all candidates so far
+        self.candidates: dict[S, list[Derivation]] = {}
+        self.seen: dict[S, set[tuple[int, tuple[int, ...]]]] = {}
+        # for each non-terminal: the last derivation taken from the candidates (whose successors
+        # are pushed before taking the next one)
+        self.last: dict[S, Derivation] = {}
+        # for each non-terminal: derivations, which have no further successors
+        self.exhausted: set[S] = set()
+        # for each non-terminal: terms of the derivations (by index)
+        self.terms: dict[S, list[SharedTree[T]]] = {}
+        self.term_set: dict[S, set[SharedTree[T]]] = {}
+
+    def _initialize(self, n: S) -> None:
+        candidates: list[Derivation] = []
+        for i, (_, c_cost, args) in enumerate(self.rules[n]):
+            if all(m in self.best for m in args):
+                candidates.append(
+                    (c_cost + sum(self.best[m] for m in args), i, (0,) * len(args))
+                )
+        heapq.heapify(candidates)
+        self.derivations[n] = []
+        self.candidates[n] = candidates
+        self.seen[n] = {(i, indices) for _, i, indices in candidates}
+        self.terms[n] = []
+        self.term_set[n] = set()
+
+    def _known(self, n: S, k: int) -> Optional[Derivation]:
+        derivations = self.derivations.get(n, [])
+        return derivations[k] if k < len(derivations) else None
+
+    def _is_determined(self, n: S, k: int) -> bool:
+        """Is it known, whether the k-th derivation of a non-terminal exists (and which it is)?"""
+
+        return n not in self.best or n in self.exhausted or k < len(self.derivations.get(n, []))
+
+    def kth(self, n: S, k: int) -> Optional[Derivation]:
+        """The k-th best derivation (starting with 0) of a non-terminal, if it exists."""
+
+        # requested derivations, each waiting for the derivation requested after it (instead of
+        # recursion over argument derivations)
+        requests: list[tuple[S, int]] = [(n, k)]
+        while requests:
+            missing = self._extend(*requests[-1])
+            if missing is None:
+                requests.pop()
+            else:
+                requests.append(missing)
+        return self._known(n, k)
+
+    def _extend(self, n: S, k: int) -> Optional[tuple[S, int]]:
+        """Extract derivations of a non-terminal up to the k-th derivation.
+
+        Returns a (non-terminal, index) pair of an argument derivation, which has to be
+        determined first, or None if done."""
+
+        if self._is_determined(n, k):
+            return None
+        if n not in self.derivations:
+            self._initialize(n)
+        derivations = self.derivations[n]
+        candidates = self.candidates[n]
+        while len(derivations) <= k:
+            if n in self.last:
+                missing = self._push_successors(n, self.last.pop(n))
+                if missing is not None:
+                    return missing
+            if not candidates:
+                self.exhausted.add(n)
+                return None
+            _, i, indices = candidates[0]
+            _, _, args = self.rules[n][i]
+            for m, index in zip(args, indices):
+                if not self._is_determined(m, index):
+                    return (m, index)
+            self.last[n] = heapq.heappop(candidates)
+            # equal terms have equal costs, hence only the first derivation of a term is kept
+            c, _, _ = self.rules[n][i]
+            term = self.table.make(c, [self.terms[m][index] for m, index in zip(args, indices)])
+            if term not in self.term_set[n]:
+                self.term_set[n].add(term)
+                self.terms[n].append(term)
+                derivations.append(self.last[n])
+        return None
+
+    def _push_successors(self, n: S, derivation: Derivation) -> Optional[tuple[S, int]]:
+        """Push candidates succeeding a derivation, unless an argument derivation has to be
+        determined first (which is returned)."""
+
+        d_cost, i, indices = derivation
+        _, _, args = self.rules[n][i]
+        for j, m in enumerate(args):
+            successor = indices[:j] + (indices[j] + 1,) + indices[j + 1 :]
+            if (i, successor) in self.seen[n]:
+                continue
+            # with positive costs, the argument derivations of derivation are cheaper than
+            # derivation itself, hence there is no cyclic dependency
+            if not self._is_determined(m, successor[j]):
+                self.last[n] = derivation
+                return (m, successor[j])
+            next_arg = self._known(m, successor[j])
+            if next_arg is not None:
+                current_arg = self._known(m, indices[j])
+                assert current_arg is not None
+                self.seen[n].add((i, successor))
+                heapq.heappush(
+                    self.candidates[n], (d_cost - current_arg[0] + next_arg[0], i, successor)
+                )
+        return None
+
+    def term(self, n: S, k: int) -> SharedTree[T]:
+        """The term of the k-th best derivation of a non-terminal (which has to exist)."""
+
+        self.kth(n, k)
+        return self.terms[n][k]
+
+
+def enumerate_k_best(
+    start: S,
+    grammar: Mapping[S, Sequence[tuple[T, list[S]]]],
+    k: Optional[int] = 1,
+    cost: Optional[Mapping[T, int] | Callable[[T], int]] = None,
+    table: Optional[TreeTable[T]] = None,
+) -> Iterator[SharedTree[T]]:
+    """Lazily enumerate the `k` cheapest distinct terms derivable from the start symbol.
+
+    The cost of a term is the sum of the costs of its combinators (given as a mapping, where
+    combinators not in the mapping cost 1, or as a function). By default, the cost of a term is
+    its size. Costs must be positive.
+
+    In contrast to `enumerate_terms`, only derivations necessary for the next best term are
+    explored, which is much faster for small `k` and grammars with many non-terminals.
+    """
+
+    if start not in grammar:
+        return
+
+    kbest: _KBest[S, T] = _KBest(
+        reachable_grammar(grammar, start),
+        _combinator_cost(cost),
+        TreeTable() if table is None else table,
+    )
+    for i in itertools.count():
+        if k is not None and i >= k:
+            return
+        if kbest.kth(start, i) is None:
+            return
+        yield kbest.term(start, i)
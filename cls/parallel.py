@@ -0,0 +1,286 @@
+# Parallel enumeration of terms
+#
+# Terms are enumerated by size. For each size, the derivations of terms of the start symbol, i.e.
+# its rules together with the sizes of their arguments, are partitioned into shards, and each
+# shard is enumerated by a separate process. Derivations with the same combinator and argument
+# sizes are placed in the same shard, hence shards never produce equal terms.
+#
+# Terms of smaller sizes, which are needed as arguments, are computed by each process.
+
+import itertools
+import math
+import multiprocessing
+import os
+from collections.abc import (
+    Callable,
+    Generator,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from multiprocessing.context import BaseContext
+from multiprocessing.queues import Queue
+from typing import Any, Optional, TypeVar
+
+from .enumeration import SharedTree, TreeTable, compositions, interpret_term
+from .grammar import finite_non_terminals, productive_non_terminals, reachable_grammar
+
+S = TypeVar("S")  # non-terminals
+T = TypeVar("T", bound=Hashable)
+
+# a rule together with the sizes of its arguments
+Derivation = tuple[T, list[S], tuple[int, ...]]
+
+
+def shard_rules(
+    rules: Iterable[tuple[T, list[S]]],
+    size: int,
+    shards: int,
+    count: Callable[[S, int], int],
+) -> list[list[Derivation[T, S]]]:
+    """Partition the derivations of terms of the given size into `shards` (possibly empty) shards.
+
+    `count(n, k)` is the number of terms of size k derivable from n. Derivations with the same
+    combinator and argument sizes are kept together. Groups are assigned greedily to the shard
+    with the fewest terms (estimated by their derivations), starting with the largest group."""
+
+    groups: dict[tuple[T, tuple[int, ...]], list[Derivation[T, S]]] = {}
+    weights: dict[tuple[T, tuple[int, ...]], int] = {}
+    for c, ms in rules:
+        for sizes in compositions(size - 1, len(ms)):
+            weight = math.prod(count(m, k) for m, k in zip(ms, sizes))
+            if weight > 0:
+                groups.setdefault((c, sizes), []).append((c, ms, sizes))
+                weights[(c, sizes)] = weights.get((c, sizes), 0) + weight
+
+    result: list[list[Derivation[T, S]]] = [[] for _ in range(shards)]
+    loads = [0] * shards
+    for key in sorted(groups, key=weights.__getitem__, reverse=True):
+        i = min(range(shards), key=loads.__getitem__)
+        result[i].extend(groups[key])
+        loads[i] += weights[key]
+    return result
+
+
+def _max_size(start: S, grammar: Mapping[S, Iterable[tuple[T, list[S]]]]) -> Optional[int]:
+    """The size of the largest term derivable from the start symbol, or None if its language is
+    infinite."""
+
+    sizes: dict[S, int] = {}
+    for n in finite_non_terminals(grammar):
+        sizes[n] = max(
+            1 + sum(sizes[m] for m in ms) for _, ms in grammar[n] if all(m in sizes for m in ms)
+        )
+    return sizes.get(start)
+
+
+def _shard_terms(
+    shard: int,
+    shards: int,
+    start: S,
+    grammar: Mapping[S, Sequence[tuple[T, list[S]]]],
+    max_size: Optional[int],
+) -> Iterator[Optional[SharedTree[T]]]:
+    """Terms of a shard in ascending order of their size, each size is followed by `None`."""
+
+    table: TreeTable[T] = TreeTable()
+    # terms[size][n]: distinct terms of given size derivable from n
+    terms: list[dict[S, list[SharedTree[T]]]] = [{}]
+    # terms of the start symbol are only needed, if it occurs as argument
+    recursive = any(start in ms for exprs in grammar.values() for _, ms in exprs)
+
+    def count(n: S, size: int) -> int:
+        return len(terms[size].get(n, []))
+
+    def new_terms(derivations: Iterable[Derivation[T, S]]) -> list[SharedTree[T]]:
+        return list(
+            dict.fromkeys(
+                table.make(c, args)
+                for c, ms, sizes in derivations
+                for args in itertools.product(*(terms[k].get(m, []) for m, k in zip(ms, sizes)))
+            )
+        )
+
+    for size in itertools.count(1) if max_size is None else range(1, max_size + 1):
+        derivations = shard_rules(grammar[start], size, shards, count)
+        own_terms = new_terms(derivations[shard])
+        yield from own_terms
+        yield None
+        terms.append(
+            {
+                n: new_terms(
+                    (c, ms, sizes) for c, ms in exprs for sizes in compositions(size - 1, len(ms))
+                )
+                for n, exprs in grammar.items()
+                if n != start
+            }
+        )
+        if recursive:
+            terms[size][start] = [
+                term
+                for i, ds in enumerate(derivations)
+                for term in (own_terms if i == shard else new_terms(ds))
+            ]
+
+
+def _enumerate_shard(
+    shard: int,
+    shards: int,
+    start: S,
+    grammar: Mapping[S, Sequence[tuple[T, list[S]]]],
+    max_size: Optional[int],
+    max_count: Optional[int],
+    interpret: bool,
+    chunk_size: int,
+    queue: "Queue[Any]",
+) -> None:
+    """Worker: enumerate a shard and put chunks of results into the queue.
+
+    Each chunk contains results of a single size. The end of a size is signaled by `None`, the
+    end of the shard by `False`, and failures by the raised exception."""
+
+    try:
+        chunk: list[Any] = []
+        count = 0
+        for term in _shard_terms(shard, shards, start, grammar, max_size):
+            if term is not None:
+                chunk.append(interpret_term(term) if interpret else term)
+                count += 1
+            if chunk and (term is None or len(chunk) == chunk_size or count == max_count):
+                queue.put(chunk)
+                chunk = []
+            if term is None:
+                queue.put(None)
+            if count == max_count:
+                break
+    except Exception as e:
+        queue.put(e)
+    else:
+        queue.put(False)
+
+
+def _size_results(queue: "Queue[Any]") -> Generator[Any, None, bool]:
+    """Results of a single shard up to the end of the current size. Returns whether the shard
+    has ended."""
+
+    while True:
+        chunk = queue.get()
+        if chunk is None:
+            return False
+        elif chunk is False:
+            return True
+        elif isinstance(chunk, BaseException):
+            raise chunk
+        yield from chunk
+
+
+def _ordered_results(queues: list["Queue[Any]"]) -> Iterator[Any]:
+    """Results of all shards ordered by size, each shard using its own queue."""
+
+    running = list(queues)
+    while running:
+        finished = []
+        for queue in running:
+            finished.append((yield from _size_results(queue)))
+        running = [queue for queue, done in zip(running, finished) if not done]
+
+
+def enumerate_terms_parallel(
+    start: S,
+    grammar: Mapping[S, Sequence[tuple[T, list[S]]]],
+    max_count: Optional[int] = 100,
+    processes: Optional[int] = None,
+    interpret: bool = False,
+    ordered: bool = True,
+    chunk_size: int = 1000,
+    max_pending_chunks: int = 4,
+    context: Optional[BaseContext] = None,
+) -> Iterable[Any]:
+    """Enumerate terms derivable from the start symbol using a pool of processes.
+
+    For each term size, the derivations of `start` (rules together with argument sizes) are split
+    into `processes` shards, see `shard_rules`. Each worker enumerates its shard (and interprets
+    the terms, if `interpret` is set) and streams results back in chunks of `chunk_size`. At most
+    `max_pending_chunks` chunks per worker are buffered.
+
+    Only the terms of `start` are split. Each worker computes all terms of smaller sizes of the
+    other non-terminals (and of `start`, if it occurs as argument), which limits the speedup if
+    these dominate the work.
+
+    If `ordered` is set, results are merged such that they are ordered by term size (as in
+    `enumerate_terms`), otherwise results are yielded as soon as they arrive.
+
+    Note: grammar and combinators (or, if `interpret` is set, interpretations) are transferred
+    between processes, hence they need to be picklable for start methods other than "fork".
+    """
+
+    if start not in grammar:
+        return
+
+    # only the productive and reachable part of the grammar is transferred to workers
+    grammar = reachable_grammar(grammar, start)
+    productive = productive_non_terminals(grammar)
+    if start not in productive:
+        return
+    grammar = {
+        n: [(c, ms) for c, ms in exprs if all(m in productive for m in ms)]
+        for n, exprs in grammar.items()
+        if n in productive
+    }
+    max_size = _max_size(start, grammar)
+    shards = processes or os.cpu_count() or 1
+    ctx: BaseContext = multiprocessing.get_context() if context is None else context
+
+    # in ordered mode, each shard uses its own queue, otherwise all shards share one queue
+    queues: list["Queue[Any]"] = (
+        [ctx.Queue(max_pending_chunks) for _ in range(shards)]
+        if ordered
+        else [ctx.Queue(max_pending_chunks * shards)] * shards
+    )
+    workers = [
+        ctx.Process(  # type: ignore[attr-defined]
+            target=_enumerate_shard,
+            args=(
+                shard,
+                shards,
+                start,
+                grammar,
+                max_size,
+                max_count,
+                interpret,
+                chunk_size,
+                queues[shard],
+            ),
+            daemon=True,
+        )
+        for shard in range(shards)
+    ]
+    for worker in workers:
+        worker.start()
+
+    results = _ordered_results(queues) if ordered else _unordered_results(queues[0], shards)
+    try:
+        yield from itertools.islice(results, max_count)
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+
+
+def _unordered_results(queue: "Queue[Any]", shards: int) -> Iterator[Any]:
+    """Results of all shards sharing a single queue in the order they arrive."""
+
+    running = shards
+    while running > 0:
+        chunk = queue.get()
+        if chunk is False:
+            running -= 1
+        elif chunk is None:
+            continue
+        elif isinstance(chunk, BaseException):
+            raise chunk
+        else:
+            yield from chunk
@@ -1,34 +1,17 @@
 from __future__ import annotations
-from collections.abc import Callable, Iterable, Sequence
-from typing import TypeVar
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Generic, Optional, TypeVar
 from itertools import groupby
 import itertools
 import heapq
-from timeit import default_timer
 
 T = TypeVar("T")
-
-
-def nexts(input: tuple[int, ...], length: int) -> Iterable[tuple[int, ...]]:
-    """
-    For a given tuple (a_1, a_2,...,a_n), compute the set:
-
-      { (a_1 + 1, a_2,..., a_n)
-      , (a_1, a_2 + 1,..., a_n)
-      , ...
-      , (a_1, a_2,..., a_n + 1) }
-    """
-    output = []
-    for d in range(length):
-        index_list = list(input)
-        index_list[d] += 1
-        output.append(tuple(index_list))
-    return output
+R = TypeVar("R")
 
 
 def sorted_product(
-    *lists: Sequence[T], key: Callable[[T], int], combine: Callable[[Iterable[T]], T]
-) -> Iterable[T]:
+    *lists: Sequence[T], key: Callable[[T], int], combine: Callable[[Iterable[T]], R]
+) -> Iterable[R]:
     """
     Lazily transforms the product of a set of sorted lists into a sorted output list.
 
@@ -46,39 +29,39 @@ def sorted_product(
             key(a_1) + key(a_2) + ... + key(a_n) = key(combine(a_1, a_2, ... , a_n))
 
 
-    The main idea is using a combination of BFS, heapsort and bucketsort, to efficiently traverse
-    indices of the input lists.
+    The main idea is using a combination of best-first search, heapsort and bucketsort, to
+    efficiently traverse indices of the input lists.
 
     First we group the entries of the input lists by their value (according to the key). Since (2)
     holds, each entry in such a group can be treated the same.
 
     An index into the grouped lists, is a tuple of length `len(lists)`.  We can interpret the
-    indices as a graph with, where the vertices are the indices, and there exists an edge A -> B,
-    if B is increased by 1 at exactly one. We now apply a BFS to enumerate all indices.
-
-    We start with (0,..,0) as the index of the guaranteed smallest combination of values. The next
-    smallest value corresponds to the index of one of (0,...,0) successors. We mark these as
-    visited, add the indices to a bucket marked with their respective values and store these values
-    in a min-heap of possible smallest values.
-
-    In each iteration, we extract the smallest value in this min-heap, add for each index in the
-    corresponding bucket, we yield all combinations of the corresponding grouped lists and add
-    the (unvisited) successors of those indices their corresponding bucket, mark them as visited
-    and add their values to the heap.
+    indices as a graph, where the vertices are the indices, and there exists an edge A -> B,
+    if B is increased by 1 at exactly one position. To visit each index exactly once, we only
+    follow canonical edges: each index stores the position it was last increased at (its pivot),
+    and only positions at or after the pivot are increased further. This way, every index is
+    reached by increasing positions in ascending order, which is unique, and no set of visited
+    indices is needed.
+
+    We start with (0,..,0) as the index of the guaranteed smallest combination of values. In each
+    iteration, we extract the smallest value from a min-heap of possible smallest values, yield
+    all combinations of the grouped lists for each index in the bucket of this value, and add the
+    canonical successors of those indices to the buckets of their values. The value of a successor
+    is computed incrementally from the value of its predecessor.
 
     Since we grouped the input lists by value and the input lists are in ascending order, we know
-    that each succeeding tuple of indices needs to yield a value grater than the current value.
-    Since we always extract the lowest value, and enumerate all possible indices with the BFS
-    approach, we get all possible combinations in ascending order.
+    that each succeeding tuple of indices needs to yield a value greater than the current value.
+    Since we always extract the lowest value, and every index is reachable, we get all possible
+    combinations in ascending order.
 
     Args:
       *lists (Sequence[T]): Sorted input lists
       key (Callable[[T], int]): Key-Function to sort
-      combine (Callable[[T, ...], T]): Function, that specifies how to combine the values from the
+      combine (Callable[[T, ...], R]): Function, that specifies how to combine the values from the
                                        input list to get a output value
 
     Yields:
-      T: Combined values from the product of *lists in sorted order.
+      R: Combined values from the product of *lists in sorted order.
 
     Examples:
       This takes the lists [1,2,3], [4,5,6] and [7,8] and adds all possible combinations.
@@ -95,120 +78,187 @@ def sorted_product(
 
     number_of_lists = len(lists)
 
-    # First group the elements of the input list by size. The size is stored alongside the elements
-    # for performance reasons.
-    grouped_lists: list[list[tuple[int, tuple[T, ...]]]] = [
-        [(val, tuple(group)) for val, group in groupby(lst, key=key)] for lst in lists
-    ]
+    # First group the elements of the input list by size.
+    grouped_lists: list[list[tuple[T, ...]]] = []
+    # The value of each group
+    values: list[list[int]] = []
+    for lst in lists:
+        grouped_lists.append([])
+        values.append([])
+        for val, group in groupby(lst, key=key):
+            grouped_lists[-1].append(tuple(group))
+            values[-1].append(val)
+        # If any list does not have at least one entry, there are no combinations
+        if not values[-1]:
+            return
+    lengths = [len(vals) for vals in values]
 
-    # The buckets will contain the tuple of indices into `grouped_lists`.
+    # The buckets will contain pairs of a tuple of indices into `grouped_lists` and its pivot.
     # The key of the buckets are the combined sizes.
-    buckets: dict[int, list[tuple[int, ...]]] = {}
-
-    # During the search, the neighbors of already returned values are stored in a min-heap
-    possible_smallest_values = []
-
-    # Only visit each index once
-    visited = set()
+    buckets: dict[int, list[tuple[tuple[int, ...], int]]] = {}
 
-    # The first index is (0,0,...,0). If any list does not have at least one entry, we return []
-    initial_index = (0,) * number_of_lists
-    try:
-        smallest_value = sum(lst[0][0] for lst in grouped_lists)
-    except IndexError:
-        return []
+    # During the search, the values of discovered indices are stored in a min-heap
+    possible_smallest_values: list[int] = []
 
-    # initialize the buckets, visited list and min-heap
-    buckets[smallest_value] = [initial_index]
-    visited.add(initial_index)
+    # The first index is (0,0,...,0), its successors may increase any position
+    smallest_value = sum(vals[0] for vals in values)
+    buckets[smallest_value] = [((0,) * number_of_lists, 0)]
     possible_smallest_values.append(smallest_value)
 
     # This ends, when there is no more data
-    while True:
-        # Get smallest value from the potential values
-        try:
-            smallest_value = heapq.heappop(possible_smallest_values)
-        except IndexError:
-            return
-
-        # lookup all discovered indices corresponding to this value
-        for index in buckets[smallest_value]:
-            visited.remove(index)
-
+    while possible_smallest_values:
+        # Get smallest value from the potential values and all discovered indices for this value
+        smallest_value = heapq.heappop(possible_smallest_values)
+        for index, pivot in buckets.pop(smallest_value):
             # return the all the combined values in `grouped_lists` corresponding to the respective
             # index
             yield from map(
                 combine,
-                (itertools.product(*map(lambda group, idx: group[idx][1], grouped_lists, index))),
+                itertools.product(*map(lambda groups, idx: groups[idx], grouped_lists, index)),
             )
 
-            # Find all neighbors of the smallest indices
-            for next_index in nexts(index, number_of_lists):
-                # only visit each index once
-                if next_index not in visited:
-                    visited.add(next_index)
+            # Find all canonical successors of the index
+            for d in range(pivot, number_of_lists):
+                next_idx = index[d] + 1
+                # If a subindex exceeds the length of its respective input list, skip it
+                if next_idx < lengths[d]:
+                    value = smallest_value - values[d][next_idx - 1] + values[d][next_idx]
+                    successor = (index[:d] + (next_idx,) + index[d + 1 :], d)
+                    # Add the newly discovered index to its corresponding bucket
                     try:
-                        # Add value of the newly discovered index to their corresponding bucket
-                        value = sum(
-                            map(
-                                lambda group, idx: group[idx][0],
-                                grouped_lists,
-                                next_index,
-                            )
-                        )
-                        try:
-                            buckets[value].append(next_index)
-                        except KeyError:
-                            heapq.heappush(possible_smallest_values, value)
-                            buckets[value] = [next_index]
-
-                    # If a subindex exceeds the length of their respective input list, skip that
-                    # index
-                    except IndexError:
-                        continue
-
-        # clean up
-        del buckets[smallest_value]
-
-
-def pure_bench() -> None:
-    l1 = list(range(20))
-    l2 = list(range(0, 4000, 10))
-    l3 = [1] * 20 + [2] * 30
-    l4 = [1] * 30
-
-    lists = [l1, l2, l3, l4]  # , l3]
-    _ = list(sorted_product(*lists, key=lambda x: x, combine=sum))
-
-
-def main() -> None:
-    l1 = list(range(10))
-    l2 = list(range(0, 4000, 10))
-    l3 = [1] * 20 + [2] * 30
-    l4 = [1] * 30
-
-    lists = [l1, l2, l3, l4]  # , l3]
-
-    time1 = default_timer()
-    _ = sorted(map(sum, itertools.product(*lists)), key=lambda x: x)
-    tdelta1 = default_timer() - time1
-    print(f"sorted(product(*lists)): {tdelta1}")
-    time2 = default_timer()
-    x1 = list(sorted_product(*lists, key=lambda x: x, combine=sum))
-    tdelta2 = default_timer() - time2
-    print(f"sorted_product_buckets(*lists): {tdelta2}")
-    print(f"ratio: {tdelta2/tdelta1}")
-    y1 = x1
-    if y1 == sorted(y1):
-        print(f"sorted, ({len(y1)})")
-
-    # if len(x1) == len(s1):
-    #     for elem in s1:
-    #         if elem in x1:
-    #             continue
-    #         print(f"{elem} is not there :(")
-    #         return
-
-
-if __name__ == "__main__":
-    main()
+                        buckets[value].append(successor)
+                    except KeyError:
+                        heapq.heappush(possible_smallest_values, value)
+                        buckets[value] = [successor]
+
+
+class SortedProductStream(Generic[T, R]):
+    """
+    Lazily transforms the product of a set of growing sorted sources into a sorted output.
+
+    In contrast to `sorted_product`, sources are not materialized up front. A source is either an
+    append-only sequence (e.g. a list, which may grow between and during calls to `take_until`)
+    or an iterator, which is consumed on demand. Elements of each source are visited individually
+    (not grouped by key) and only canonical successors of indices are followed (see
+    `sorted_product`).
+
+    Indices, which refer to elements not (yet) present in their source, are blocked until the
+    source grows. Hence, combinations with newly arrived elements are produced by the existing
+    stream, without restarting the product.
+
+    We assume (1) and (2) from `sorted_product`, and additionally
+
+      (3) combinations involving elements, which arrive after `take_until(bound)` was called,
+          have a combined key not smaller than `bound`.
+
+    Examples:
+      >>> xs = [1, 2]
+      >>> stream = SortedProductStream(xs, [10, 20], key=lambda x: x, combine=sum)
+      >>> list(stream.take_until(12))
+      [11, 12]
+      >>> xs.append(3)
+      >>> list(stream.take_until(30))
+      [13, 21, 22, 23]
+    """
+
+    def __init__(
+        self,
+        *sources: Sequence[T] | Iterator[T],
+        key: Callable[[T], int],
+        combine: Callable[[Iterable[T]], R],
+    ):
+        self.key = key
+        self.combine = combine
+        self.number_of_sources = len(sources)
+        # elements of each source (iterators are buffered)
+        self.elements: list[Sequence[T]] = []
+        self.iterators: list[Optional[Iterator[T]]] = []
+        for source in sources:
+            if isinstance(source, Sequence):
+                self.elements.append(source)
+                self.iterators.append(None)
+            else:
+                self.elements.append([])
+                self.iterators.append(source)
+        # keys of already visited elements of each source
+        self.keys: list[list[int]] = [[] for _ in sources]
+        # min-heap of discovered indices (combined key, index, pivot)
+        self.frontier: list[tuple[int, tuple[int, ...], int]] = []
+        # for each source: discovered indices (combined key of predecessor, index), which refer to
+        # the next element not yet present in that source
+        self.blocked: list[list[tuple[int, tuple[int, ...]]]] = [[] for _ in sources]
+        # the first index (0, ..., 0) waits until all sources are non-empty
+        self.started = False
+
+    def _available(self, d: int, i: int) -> bool:
+        """Is the `i`-th element of source `d` present? Pulls from iterators as needed."""
+
+        elements = self.elements[d]
+        iterator = self.iterators[d]
+        if iterator is not None and len(elements) <= i:
+            assert isinstance(elements, list)
+            for element in itertools.islice(iterator, i + 1 - len(elements)):
+                elements.append(element)
+        if len(elements) <= i:
+            return False
+        keys = self.keys[d]
+        while len(keys) <= i:
+            keys.append(self.key(elements[len(keys)]))
+        return True
+
+    def _unblock(self) -> None:
+        """Move indices to the frontier, whose elements arrived."""
+
+        if not self.started:
+            if all(self._available(d, 0) for d in range(self.number_of_sources)):
+                self.started = True
+                value = sum(keys[0] for keys in self.keys)
+                heapq.heappush(self.frontier, (value, (0,) * self.number_of_sources, 0))
+            return
+
+        for d, blocked in enumerate(self.blocked):
+            # blocked indices are ordered by the position they wait for
+            unblocked = 0
+            keys = self.keys[d]
+            for previous_value, index in blocked:
+                i = index[d]
+                if not self._available(d, i):
+                    break
+                heapq.heappush(self.frontier, (previous_value - keys[i - 1] + keys[i], index, d))
+                unblocked += 1
+            del blocked[:unblocked]
+
+    @property
+    def pending(self) -> bool:
+        """Are there combinations, which can be produced without any source growing?"""
+
+        self._unblock()
+        return len(self.frontier) > 0
+
+    def next_key(self) -> Optional[int]:
+        """The combined key of the next combination, if it can be produced."""
+
+        self._unblock()
+        return self.frontier[0][0] if self.frontier else None
+
+    def take_until(self, bound: int) -> Iterator[R]:
+        """Yield all combinations with combined key at most `bound` in ascending order."""
+
+        self._unblock()
+        frontier = self.frontier
+        while frontier and frontier[0][0] <= bound:
+            value, index, pivot = heapq.heappop(frontier)
+            elements = self.elements
+            yield self.combine([elements[d][i] for d, i in enumerate(index)])
+
+            # Find all canonical successors of the index
+            for d in range(pivot, self.number_of_sources):
+                next_idx = index[d] + 1
+                successor = index[:d] + (next_idx,) + index[d + 1 :]
+                if self._available(d, next_idx):
+                    keys = self.keys[d]
+                    heapq.heappush(
+                        frontier, (value - keys[next_idx - 1] + keys[next_idx], successor, d)
+                    )
+                else:
+                    self.blocked[d].append((value, successor))
@@ -1,71 +1,243 @@
 from collections import deque
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Optional
 
 from .types import Arrow, Constructor, Intersection, Product, Type
 
 
+# minimal number of constructors a subtype is checked against, such that indexing its constructor
+# components pays off in check_subtype_many (indexing costs about as much as two checks)
+BATCH_THRESHOLD = 4
+
+
+@dataclass
+class _ArrowConstraint:
+    """Arrow constraint, whose relevant arrows are determined by checking their sources."""
+
+    # remaining constraints of the check
+    constraints: list[tuple[deque[Type], Type]]
+    source: Type
+    target: Type
+    # arrows whose sources are not checked yet
+    arrows: list[Arrow]
+    # targets of arrows with suitable sources
+    casted: deque[Type]
+
+
 class Subtypes:
     def __init__(self, environment: dict[str, set[str]]):
+        # direct supertypes, needed to update the closure when subtypes are removed
+        self.direct: dict[str, set[str]] = {
+            subtype: set(supertypes) for subtype, supertypes in environment.items()
+        }
         self.environment = self._transitive_closure(
             self._reflexive_closure(environment)
         )
+        # for each update of the environment: (subtypes, supertypes, added), such that only the
+        # relation of subtypes to supertypes has changed (see add_subtype and remove_subtype)
+        self.changes: list[tuple[frozenset[str], frozenset[str], bool]] = []
 
-    def _check_subtype_rec(self, subtypes: deque[Type], supertype: Type) -> bool:
-        if supertype.is_omega:
-            return True
-        match supertype:
-            case Constructor(name2, arg2):
-                casted_constr: deque[Type] = deque()
-                while subtypes:
-                    match subtypes.pop():
-                        case Constructor(name1, arg1):
-                            if name2 == name1 or name2 in self.environment.get(
-                                name1, {}
-                            ):
-                                casted_constr.append(arg1)
-                        case Intersection(l, r):
-                            subtypes.extend((l, r))
-                return len(casted_constr) != 0 and self._check_subtype_rec(
-                    casted_constr, arg2
-                )
-            case Arrow(src2, tgt2):
-                casted_arr: deque[Type] = deque()
-                while subtypes:
-                    match subtypes.pop():
-                        case Arrow(src1, tgt1):
-                            if self._check_subtype_rec(deque((src2,)), src1):
-                                casted_arr.append(tgt1)
-                        case Intersection(l, r):
-                            subtypes.extend((l, r))
-                return len(casted_arr) != 0 and self._check_subtype_rec(
-                    casted_arr, tgt2
-                )
-            case Product(l2, r2):
-                casted_l: deque[Type] = deque()
-                casted_r: deque[Type] = deque()
-                while subtypes:
-                    match subtypes.pop():
-                        case Product(l1, r1):
-                            casted_l.append(l1)
-                            casted_r.append(r1)
-                        case Intersection(l, r):
-                            subtypes.extend((l, r))
-                return (
-                    len(casted_l) != 0
-                    and len(casted_r) != 0
-                    and self._check_subtype_rec(casted_l, l2)
-                    and self._check_subtype_rec(casted_r, r2)
-                )
-            case Intersection(l, r):
-                return self._check_subtype_rec(
-                    subtypes.copy(), l
-                ) and self._check_subtype_rec(subtypes, r)
-            case _:
-                raise TypeError(f"Unsupported type in check_subtype: {supertype}")
+    def _subtypes_of(self, name: str) -> frozenset[str]:
+        return frozenset(
+            subtype for subtype, supertypes in self.environment.items() if name in supertypes
+        )
+
+    def add_subtype(self, subtype: str, supertype: str) -> None:
+        """Add subtype <= supertype to the environment.
+
+        The closure is updated incrementally: all subtypes of `subtype` get all supertypes of
+        `supertype`."""
+
+        self.direct.setdefault(subtype, set()).add(supertype)
+        for name in (subtype, supertype):
+            self.environment.setdefault(name, {name})
+        if supertype in self.environment[subtype]:
+            return
+        supertypes = frozenset(self.environment[supertype])
+        subtypes = self._subtypes_of(subtype)
+        for name in subtypes:
+            self.environment[name].update(supertypes)
+        self.changes.append((subtypes, supertypes, True))
+
+    def remove_subtype(self, subtype: str, supertype: str) -> None:
+        """Remove subtype <= supertype (which has to be given directly) from the environment.
+
+        Only the closure of subtypes of `subtype` is recomputed, since no other name reaches its
+        supertypes by `subtype <= supertype`."""
+
+        self.direct[subtype].remove(supertype)
+        supertypes = frozenset(self.environment[supertype])
+        subtypes = self._subtypes_of(subtype)
+        for name in subtypes:
+            reachable: set[str] = {name}
+            stack: list[str] = [name]
+            while stack:
+                for new_supertype in self.direct.get(stack.pop(), ()):
+                    if new_supertype not in reachable:
+                        reachable.add(new_supertype)
+                        stack.append(new_supertype)
+            self.environment[name] = reachable
+        self.changes.append((subtypes, supertypes, False))
+
+    def _check_subtype_rec(
+        self, constraints: list[tuple[deque[Type], Type]]
+    ) -> bool | _ArrowConstraint:
+        """Decides whether for all constraints the intersection of subtypes is a subtype of the
+        supertype.
+
+        Constraints are processed by a work list instead of recursion. If the arrows relevant for
+        an arrow constraint are not known yet, the constraint is returned (see check_subtype)."""
+
+        while constraints:
+            subtypes, supertype = constraints.pop()
+            if supertype.is_omega:
+                continue
+            match supertype:
+                case Constructor(name2, arg2):
+                    casted_constr: deque[Type] = deque()
+                    while subtypes:
+                        match subtypes.pop():
+                            case Constructor(name1, arg1):
+                                if name2 == name1 or name2 in self.environment.get(
+                                    name1, {}
+                                ):
+                                    casted_constr.append(arg1)
+                            case Intersection(l, r):
+                                subtypes.extend((l, r))
+                    if len(casted_constr) == 0:
+                        return False
+                    constraints.append((casted_constr, arg2))
+                case Arrow(src2, tgt2):
+                    arrows: list[Arrow] = []
+                    while subtypes:
+                        match subtypes.pop():
+                            case Arrow(_, _) as arrow:
+                                arrows.append(arrow)
+                            case Intersection(l, r):
+                                subtypes.extend((l, r))
+                    if len(arrows) == 0:
+                        return False
+                    return _ArrowConstraint(constraints, src2, tgt2, arrows, deque())
+                case Product(l2, r2):
+                    casted_l: deque[Type] = deque()
+                    casted_r: deque[Type] = deque()
+                    while subtypes:
+                        match subtypes.pop():
+                            case Product(l1, r1):
+                                casted_l.append(l1)
+                                casted_r.append(r1)
+                            case Intersection(l, r):
+                                subtypes.extend((l, r))
+                    if len(casted_l) == 0 or len(casted_r) == 0:
+                        return False
+                    constraints.extend(((casted_r, r2), (casted_l, l2)))
+                case Intersection(l, r):
+                    constraints.extend(((subtypes, r), (subtypes.copy(), l)))
+                case _:
+                    raise TypeError(f"Unsupported type in check_subtype: {supertype}")
+        return True
 
     def check_subtype(self, subtype: Type, supertype: Type) -> bool:
         """Decides whether subtype <= supertype."""
 
-        return self._check_subtype_rec(deque((subtype,)), supertype)
+        return self._check_subtype([(deque((subtype,)), supertype)])
+
+    def check_subtype_many(self, pairs: Iterable[tuple[Type, Type]]) -> list[bool]:
+        """Decides subtype <= supertype for each pair (subtype, supertype).
+
+        Each distinct pair is checked once. If a subtype is checked against many constructors,
+        its intersection components are decomposed once and constructor components are indexed
+        by the names of their supertypes, so that each constructor is looked up instead of matched
+        against all components."""
+
+        pairs = list(pairs)
+        # number of constructor supertypes of each subtype
+        counts: dict[Type, int] = {}
+        for subtype, supertype in pairs:
+            if isinstance(supertype, Constructor):
+                counts[subtype] = counts.get(subtype, 0) + 1
+        indices: dict[Type, dict[str, list[Type]]] = {}
+        results: dict[tuple[Type, Type], bool] = {}
+        answers: list[bool] = []
+        for pair in pairs:
+            result = results.get(pair)
+            if result is None:
+                (subtype, supertype) = pair
+                if isinstance(supertype, Constructor) and counts[subtype] >= BATCH_THRESHOLD:
+                    index = indices.get(subtype)
+                    if index is None:
+                        index = self._constructor_index(subtype)
+                        indices[subtype] = index
+                    casted = index.get(supertype.name)
+                    result = casted is not None and self._check_subtype(
+                        [(deque(casted), supertype.arg)]
+                    )
+                else:
+                    result = self._check_subtype([(deque((subtype,)), supertype)])
+                results[pair] = result
+            answers.append(result)
+        return answers
+
+    def subtype_matrix(
+        self, subtypes: Sequence[Type], supertypes: Sequence[Type]
+    ) -> list[list[bool]]:
+        """For each subtype and supertype: is subtype <= supertype (see `check_subtype_many`)."""
+
+        if len(supertypes) < BATCH_THRESHOLD:
+            # too few supertypes to share decompositions of subtypes
+            return [[self.check_subtype(a, b) for b in supertypes] for a in subtypes]
+        answers = self.check_subtype_many(
+            (subtype, supertype) for subtype in subtypes for supertype in supertypes
+        )
+        return [
+            answers[i * len(supertypes) : (i + 1) * len(supertypes)] for i in range(len(subtypes))
+        ]
+
+    def _constructor_index(self, subtype: Type) -> dict[str, list[Type]]:
+        """For each constructor name: arguments of constructor components of the subtype, whose
+        names are subtypes of the name."""
+
+        index: dict[str, list[Type]] = {}
+        tys: list[Type] = [subtype]
+        while tys:
+            match tys.pop():
+                case Constructor(name, arg):
+                    for supertype in self.environment.get(name, (name,)):
+                        index.setdefault(supertype, []).append(arg)
+                case Intersection(l, r):
+                    tys.extend((r, l))
+        return index
+
+    def _check_subtype(self, constraints: list[tuple[deque[Type], Type]]) -> bool:
+        # Arrow constraints waiting for the results of checking the sources of their arrows.
+        # The innermost constraint is checked next (instead of recursion on the sources).
+        pending: list[_ArrowConstraint] = []
+        result = self._check_subtype_rec(constraints)
+        while True:
+            if isinstance(result, _ArrowConstraint):
+                pending.append(result)
+            elif not pending:
+                return result
+            else:
+                constraint = pending[-1]
+                arrow = constraint.arrows.pop()
+                if result:
+                    constraint.casted.append(arrow.target)
+                if not constraint.arrows:
+                    # all sources are checked, continue with the remaining constraints
+                    pending.pop()
+                    if len(constraint.casted) == 0:
+                        result = False
+                    else:
+                        constraint.constraints.append((constraint.casted, constraint.target))
+                        result = self._check_subtype_rec(constraint.constraints)
+                    continue
+            # check the source of the next arrow of the innermost pending constraint
+            constraint = pending[-1]
+            result = self._check_subtype_rec(
+                [(deque((constraint.source,)), constraint.arrows[-1].source)]
+            )
 
     @staticmethod
     def _reflexive_closure(env: dict[str, set[str]]) -> dict[str, set[str]]:
@@ -99,9 +271,53 @@ class Subtypes:
 
         return result
 
-    def minimize(self, tys: set[Type]) -> set[Type]:
-        result: set[Type] = set()
-        for ty in tys:
-            if all(map(lambda ot: not self.check_subtype(ot, ty), result)):
-                result = {ty, *(ot for ot in result if not self.check_subtype(ty, ot))}
-        return result
+    @staticmethod
+    def _head(ty: Type) -> Optional[tuple[type, Optional[str]]]:
+        """Kind (and constructor name) of a type, or None for intersections and omega types."""
+
+        if ty.is_omega:
+            return None
+        match ty:
+            case Constructor(name, _):
+                return (Constructor, name)
+            case Arrow(_, _) | Product(_, _):
+                return (type(ty), None)
+        return None
+
+    def _may_be_subtype(
+        self,
+        head1: Optional[tuple[type, Optional[str]]],
+        head2: Optional[tuple[type, Optional[str]]],
+    ) -> bool:
+        """Necessary condition for a type with head1 to be a subtype of a type with head2."""
+
+        if head1 is None or head2 is None:
+            return True
+        if head1[0] is not head2[0]:
+            return False
+        if head1[0] is Constructor:
+            return head1[1] == head2[1] or head2[1] in self.environment.get(str(head1[1]), ())
+        return True
+
+    def minimize(self, tys: Iterable[Type]) -> set[Type]:
+        """Minimal types with respect to the subtype relation (one of equivalent types).
+
+        Types are compared only against the current minimal types and only if their heads (kind
+        and constructor name) are compatible, e.g. constructors of unrelated names are never
+        checked."""
+
+        result: list[tuple[Type, Optional[tuple[type, Optional[str]]]]] = []
+        for ty in dict.fromkeys(tys):
+            head = self._head(ty)
+            if any(
+                self._may_be_subtype(other_head, head) and self.check_subtype(other, ty)
+                for other, other_head in result
+            ):
+                continue
+            result = [
+                (other, other_head)
+                for other, other_head in result
+                if not (self._may_be_subtype(head, other_head) and self.check_subtype(ty, other))
+            ]
+            result.append((ty, head))
+        return {ty for ty, _ in result}
@@ -3,22 +3,112 @@ from __future__ import annotations
 import itertools
 from abc import ABC, abstractmethod
 from collections.abc import Sequence
-from dataclasses import dataclass, field
-from typing import Any
+from dataclasses import dataclass, field, fields
+from functools import cached_property
+from typing import Any, Optional
 
+# Types may be very deep (e.g. long chains of constructors). Therefore, equality, hashing, printing
+# and organizing types does not recurse. Instead, hash values, sizes and whether a type is omega
+# are computed from the (cached) values of its components on construction.
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, eq=False, repr=False)
 class Type(ABC):
     is_omega: bool = field(init=True, kw_only=True, compare=False)
     size: int = field(init=True, kw_only=True, compare=False)
-    organized: set[Type] = field(init=True, kw_only=True, compare=False)
+    hash_value: int = field(init=True, kw_only=True, compare=False, repr=False)
 
     def __str__(self) -> str:
         return self._str_prec(0)
 
+    def __repr__(self) -> str:
+        result: list[str] = []
+        parts: list[str | Type] = [self]
+        while parts:
+            part = parts.pop()
+            if isinstance(part, str):
+                result.append(part)
+                continue
+            items: list[str | Type] = [f"{part.__class__.__name__}("]
+            for i, f in enumerate(f for f in fields(part) if f.init):
+                value = getattr(part, f.name)
+                items.append(f"{', ' if i > 0 else ''}{f.name}=")
+                items.append(value if isinstance(value, Type) else repr(value))
+            items.append(")")
+            parts.extend(reversed(items))
+        return "".join(result)
+
     def __mul__(self, other: Type) -> Type:
         return Product(self, other)
 
+    def __hash__(self) -> int:
+        return self.hash_value
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Type):
+            return NotImplemented
+        if self.hash_value != other.hash_value:
+            return False
+        pairs: list[tuple[Type, Type]] = [(self, other)]
+        while pairs:
+            left, right = pairs.pop()
+            if left is right:
+                continue
+            if (
+                left.__class__ is not right.__class__
+                or left.hash_value != right.hash_value
+                or left._label() != right._label()
+            ):
+                return False
+            pairs.extend(zip(left._components(), right._components()))
+        return True
+
+    @cached_property
+    def organized(self) -> set[Type]:
+        # organize missing dependencies bottom-up using an explicit stack
+        stack: list[Type] = [self]
+        while stack:
+            ty = stack[-1]
+            missing = [
+                dependency
+                for dependency in ty._organized_dependencies()
+                if "organized" not in dependency.__dict__
+            ]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            if ty is not self and "organized" not in ty.__dict__:
+                ty.__dict__["organized"] = ty._organized()
+        return self._organized()
+
+    def constructor_names(self) -> set[str]:
+        """Names of all constructors occurring in the type."""
+
+        names: set[str] = set()
+        stack: list[Type] = [self]
+        while stack:
+            ty = stack.pop()
+            label = ty._label()
+            if label is not None:
+                names.add(label)
+            stack.extend(ty._components())
+        return names
+
+    @abstractmethod
+    def _components(self) -> tuple[Type, ...]:
+        pass
+
+    def _label(self) -> Optional[str]:
+        return None
+
+    @abstractmethod
+    def _organized_dependencies(self) -> Sequence[Type]:
+        """Types whose organized paths are used to organize this type."""
+        pass
+
     @abstractmethod
     def _organized(self) -> set[Type]:
         pass
@@ -32,12 +122,28 @@ class Type(ABC):
         pass
 
     @abstractmethod
-    def _str_prec(self, prec: int) -> str:
+    def _hash(self) -> int:
+        pass
+
+    @abstractmethod
+    def _str_parts(self, prec: int) -> list[str | tuple[Type, int]]:
+        """Strings and (component, precedence) pairs to be printed in sequence."""
         pass
 
+    def _str_prec(self, prec: int) -> str:
+        result: list[str] = []
+        parts: list[str | tuple[Type, int]] = [(self, prec)]
+        while parts:
+            part = parts.pop()
+            if isinstance(part, str):
+                result.append(part)
+            else:
+                parts.extend(reversed(part[0]._str_parts(part[1])))
+        return "".join(result)
+
     @staticmethod
-    def _parens(s: str) -> str:
-        return f"({s})"
+    def _parens(parts: list[str | tuple[Type, int]]) -> list[str | tuple[Type, int]]:
+        return ["(", *parts, ")"]
 
     @staticmethod
     def intersect(types: Sequence[Type]) -> Type:
@@ -54,97 +160,128 @@ class Type(ABC):
         state = self.__dict__.copy()
         del state["is_omega"]
         del state["size"]
-        del state["organized"]
+        del state["hash_value"]
+        state.pop("organized", None)
         return state
 
     def __setstate__(self, state: dict[str, Any]) -> None:
         self.__dict__.update(state)
         self.__dict__["is_omega"] = self._is_omega()
         self.__dict__["size"] = self._size()
-        self.__dict__["organized"] = self._organized()
+        self.__dict__["hash_value"] = self._hash()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False, repr=False)
 class Omega(Type):
     is_omega: bool = field(init=False, compare=False)
     size: bool = field(init=False, compare=False)
-    organized: set[Type] = field(init=False, compare=False)
+    hash_value: int = field(init=False, compare=False, repr=False)
 
     def __post_init__(self) -> None:
         super().__init__(
             is_omega=self._is_omega(),
             size=self._size(),
-            organized=self._organized(),
+            hash_value=self._hash(),
         )
 
+    def _components(self) -> tuple[Type, ...]:
+        return ()
+
     def _is_omega(self) -> bool:
         return True
 
     def _size(self) -> int:
         return 1
 
+    def _hash(self) -> int:
+        return hash("Omega")
+
+    def _organized_dependencies(self) -> Sequence[Type]:
+        return ()
+
     def _organized(self) -> set[Type]:
         return set()
 
-    def _str_prec(self, prec: int) -> str:
-        return "omega"
+    def _str_parts(self, prec: int) -> list[str | tuple[Type, int]]:
+        return ["omega"]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False, repr=False)
 class Constructor(Type):
     name: str = field(init=True)
     arg: Type = field(default=Omega(), init=True)
     is_omega: bool = field(init=False, compare=False)
     size: int = field(init=False, compare=False)
-    organized: set[Type] = field(init=False, compare=False)
+    hash_value: int = field(init=False, compare=False, repr=False)
 
     def __post_init__(self) -> None:
         super().__init__(
             is_omega=self._is_omega(),
             size=self._size(),
-            organized=self._organized(),
+            hash_value=self._hash(),
         )
 
+    def _components(self) -> tuple[Type, ...]:
+        return (self.arg,)
+
+    def _label(self) -> Optional[str]:
+        return self.name
+
     def _is_omega(self) -> bool:
         return False
 
     def _size(self) -> int:
         return 1 + self.arg.size
 
+    def _hash(self) -> int:
+        return hash(("Constructor", self.name, self.arg.hash_value))
+
+    def _organized_dependencies(self) -> Sequence[Type]:
+        return (self.arg,)
+
     def _organized(self) -> set[Type]:
         if len(self.arg.organized) <= 1:
             return {self}
         else:
             return {Constructor(self.name, ap) for ap in self.arg.organized}
 
-    def _str_prec(self, prec: int) -> str:
+    def _str_parts(self, prec: int) -> list[str | tuple[Type, int]]:
         if self.arg == Omega():
-            return str(self.name)
+            return [str(self.name)]
         else:
-            return f"{str(self.name)}({str(self.arg)})"
+            return [f"{str(self.name)}(", (self.arg, 0), ")"]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False, repr=False)
 class Product(Type):
     left: Type = field(init=True)
     right: Type = field(init=True)
     is_omega: bool = field(init=False, compare=False)
     size: int = field(init=False, compare=False)
-    organized: set[Type] = field(init=False, compare=False)
+    hash_value: int = field(init=False, compare=False, repr=False)
 
     def __post_init__(self) -> None:
         super().__init__(
             is_omega=self._is_omega(),
             size=self._size(),
-            organized=self._organized(),
+            hash_value=self._hash(),
         )
 
+    def _components(self) -> tuple[Type, ...]:
+        return (self.left, self.right)
+
     def _is_omega(self) -> bool:
         return False
 
     def _size(self) -> int:
         return 1 + self.left.size + self.right.size
 
+    def _hash(self) -> int:
+        return hash(("Product", self.left.hash_value, self.right.hash_value))
+
+    def _organized_dependencies(self) -> Sequence[Type]:
+        return (self.left, self.right)
+
     def _organized(self) -> set[Type]:
         if len(self.left.organized) + len(self.right.organized) <= 1:
             return {self}
@@ -156,43 +293,48 @@ class Product(Type):
                 )
             )
 
-    def _str_prec(self, prec: int) -> str:
+    def _str_parts(self, prec: int) -> list[str | tuple[Type, int]]:
         product_prec: int = 9
 
-        def product_str_prec(other: Type) -> str:
-            match other:
-                case Product(_, _):
-                    return other._str_prec(product_prec)
-                case _:
-                    return other._str_prec(product_prec + 1)
-
-        result: str = (
-            f"{product_str_prec(self.left)} * {self.right._str_prec(product_prec + 1)}"
-        )
+        left_prec = product_prec if isinstance(self.left, Product) else product_prec + 1
+        result: list[str | tuple[Type, int]] = [
+            (self.left, left_prec),
+            " * ",
+            (self.right, product_prec + 1),
+        ]
         return Type._parens(result) if prec > product_prec else result
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False, repr=False)
 class Arrow(Type):
     source: Type = field(init=True)
     target: Type = field(init=True)
     is_omega: bool = field(init=False, compare=False)
     size: int = field(init=False, compare=False)
-    organized: set[Type] = field(init=False, compare=False)
+    hash_value: int = field(init=False, compare=False, repr=False)
 
     def __post_init__(self) -> None:
         super().__init__(
             is_omega=self._is_omega(),
             size=self._size(),
-            organized=self._organized(),
+            hash_value=self._hash(),
         )
 
+    def _components(self) -> tuple[Type, ...]:
+        return (self.source, self.target)
+
     def _is_omega(self) -> bool:
         return self.target.is_omega
 
     def _size(self) -> int:
         return 1 + self.source.size + self.target.size
 
+    def _hash(self) -> int:
+        return hash(("Arrow", self.source.hash_value, self.target.hash_value))
+
+    def _organized_dependencies(self) -> Sequence[Type]:
+        return (self.target,)
+
     def _organized(self) -> set[Type]:
         if len(self.target.organized) == 0:
             return set()
@@ -201,58 +343,74 @@ class Arrow(Type):
         else:
             return {Arrow(self.source, tp) for tp in self.target.organized}
 
-    def _str_prec(self, prec: int) -> str:
+    def _str_parts(self, prec: int) -> list[str | tuple[Type, int]]:
         arrow_prec: int = 8
-        result: str
-        match self.target:
-            case Arrow(_, _):
-                result = (
-                    f"{self.source._str_prec(arrow_prec + 1)} -> "
-                    f"{self.target._str_prec(arrow_prec)}"
-                )
-            case _:
-                result = (
-                    f"{self.source._str_prec(arrow_prec + 1)} -> "
-                    f"{self.target._str_prec(arrow_prec + 1)}"
-                )
+
+        target_prec = arrow_prec if isinstance(self.target, Arrow) else arrow_prec + 1
+        result: list[str | tuple[Type, int]] = [
+            (self.source, arrow_prec + 1),
+            " -> ",
+            (self.target, target_prec),
+        ]
         return Type._parens(result) if prec > arrow_prec else result
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False, repr=False)
 class Intersection(Type):
     left: Type = field(init=True)
     right: Type = field(init=True)
     is_omega: bool = field(init=False, compare=False)
     size: int = field(init=False, compare=False)
-    organized: set[Type] = field(init=False, compare=False)
+    hash_value: int = field(init=False, compare=False, repr=False)
 
     def __post_init__(self) -> None:
         super().__init__(
             is_omega=self._is_omega(),
             size=self._size(),
-            organized=self._organized(),
+            hash_value=self._hash(),
         )
 
+    def _components(self) -> tuple[Type, ...]:
+        return (self.left, self.right)
+
     def _is_omega(self) -> bool:
         return self.left.is_omega and self.right.is_omega
 
     def _size(self) -> int:
         return 1 + self.left.size + self.right.size
 
+    def _hash(self) -> int:
+        return hash(("Intersection", self.left.hash_value, self.right.hash_value))
+
+    def _organized_dependencies(self) -> Sequence[Type]:
+        # nested intersections are flattened, so that their paths are not organized (and stored)
+        # for each nesting level
+        result: list[Type] = []
+        stack: list[Type] = [self.right, self.left]
+        while stack:
+            ty = stack.pop()
+            if isinstance(ty, Intersection):
+                stack.extend((ty.right, ty.left))
+            else:
+                result.append(ty)
+        return result
+
     def _organized(self) -> set[Type]:
-        return set.union(self.left.organized, self.right.organized)
+        return set().union(*(ty.organized for ty in self._organized_dependencies()))
 
-    def _str_prec(self, prec: int) -> str:
+    def _str_parts(self, prec: int) -> list[str | tuple[Type, int]]:
         intersection_prec: int = 10
 
-        def intersection_str_prec(other: Type) -> str:
+        def intersection_prec_of(other: Type) -> int:
             match other:
                 case Intersection(_, _):
-                    return other._str_prec(intersection_prec)
+                    return intersection_prec
                 case _:
-                    return other._str_prec(intersection_prec + 1)
+                    return intersection_prec + 1
 
-        result: str = (
-            f"{intersection_str_prec(self.left)} & {intersection_str_prec(self.right)}"
-        )
+        result: list[str | tuple[Type, int]] = [
+            (self.left, intersection_prec_of(self.left)),
+            " & ",
+            (self.right, intersection_prec_of(self.right)),
+        ]
         return Type._parens(result) if prec > intersection_prec else result
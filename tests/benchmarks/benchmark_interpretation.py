@@ -0,0 +1,54 @@
+import itertools
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+from cls import InterpretationCache, enumerate_terms, interpret_term
+from cls.enumeration import CallPlan, prepare_call_plans
+
+
+def leaf() -> int:
+    return 1
+
+
+def node(left: int, right: int, *rest: int) -> int:
+    return left + right + sum(rest)
+
+
+def wrap(x: int, offset: int = 0) -> int:
+    return x + offset
+
+
+grammar: dict[str, list[tuple[Callable[..., int], list[str]]]] = {
+    "X": [(leaf, []), (node, ["X", "Y"]), (wrap, ["Y"])],
+    "Y": [(leaf, []), (node, ["Y", "X", "X"])],
+}
+
+
+def interpret_all(terms: list[Any], **kwargs: Any) -> float:
+    start = timeit.default_timer()
+    for term in terms:
+        interpret_term(term, **kwargs)
+    return timeit.default_timer() - start
+
+
+def main(count: int = 20_000, output: bool = True) -> float:
+    terms = list(itertools.islice(enumerate_terms("X", grammar, max_count=None), count))
+    plans: dict[Any, CallPlan] = prepare_call_plans([leaf, node, wrap])
+
+    timings = {
+        "call plans per term": interpret_all(terms),
+        "call plans": interpret_all(terms, call_plans=plans),
+        "call plans and cache": interpret_all(
+            terms, call_plans=plans, cache=InterpretationCache()
+        ),
+    }
+    if output:
+        print(f"Interpreting {len(terms)} terms")
+        for name, time in timings.items():
+            print(f"Time ({name}): ", time)
+    return timings["call plans"]
+
+
+if __name__ == "__main__":
+    main()
@@ -80,16 +80,7 @@ def move(SIZE: int, drow_from: int, dcol_from: int, drow_to: int, dcol_to: int)
     )
 
 
-def main(SIZE: int = 10, output: bool = True) -> float:
-    if output:
-        for row in range(SIZE):
-            for col in range(SIZE):
-                if is_free(row, col):
-                    print("-", end="")
-                else:
-                    print("#", end="")
-            print("")
-
+def labyrinth_repository(SIZE: int) -> dict[Any, Type]:
     free_fields: dict[str, Type] = {
         f"Pos_at_({row}, {col})": free(row, col)
         for row in range(0, SIZE)
@@ -97,7 +88,7 @@ def main(SIZE: int = 10, output: bool = True) -> float:
         if is_free(row, col)
     }
 
-    repository: dict[Any, Type] = {
+    return {
         Start(): Intersection(pos(0, 0), seen(0, 0)),
         Move("up"): move(SIZE, 1, 0, 0, 0),
         Move("down"): move(SIZE, 0, 0, 1, 0),
@@ -105,6 +96,19 @@ def main(SIZE: int = 10, output: bool = True) -> float:
         Move("right"): move(SIZE, 0, 0, 0, 1),
     } | free_fields
 
+
+def main(SIZE: int = 10, output: bool = True) -> float:
+    if output:
+        for row in range(SIZE):
+            for col in range(SIZE):
+                if is_free(row, col):
+                    print("-", end="")
+                else:
+                    print("#", end="")
+            print("")
+
+    repository = labyrinth_repository(SIZE)
+
     start = timeit.default_timer()
     gamma = FiniteCombinatoryLogic(repository, Subtypes({}))
     if output:
@@ -0,0 +1,58 @@
+import itertools
+import timeit
+from collections.abc import Sequence
+
+from cls.sortedenum import sorted_product
+
+
+def bench_lists(first_length: int) -> list[Sequence[int]]:
+    l1 = list(range(first_length))
+    l2 = list(range(0, 4000, 10))
+    l3 = [1] * 20 + [2] * 30
+    l4 = [1] * 30
+    return [l1, l2, l3, l4]
+
+
+def pure_bench(repeat: int = 3) -> float:
+    """Best time of sorted_product on the benchmark lists."""
+
+    lists = bench_lists(20)
+    return min(
+        timeit.repeat(
+            lambda: list(sorted_product(*lists, key=lambda x: x, combine=sum)),
+            number=1,
+            repeat=repeat,
+        )
+    )
+
+
+def main(output: bool = True) -> float:
+    lists = bench_lists(10)
+
+    time1 = timeit.default_timer()
+    expected = sorted(map(sum, itertools.product(*lists)))
+    tdelta1 = timeit.default_timer() - time1
+
+    time2 = timeit.default_timer()
+    result = list(sorted_product(*lists, key=lambda x: x, combine=sum))
+    tdelta2 = timeit.default_timer() - time2
+
+    # many lists with few elements (as in rules with many arguments)
+    many_lists = [list(range(0, 12, 3)) for _ in range(8)]
+    time3 = timeit.default_timer()
+    many_result = list(sorted_product(*many_lists, key=lambda x: x, combine=sum))
+    tdelta3 = timeit.default_timer() - time3
+
+    if output:
+        print(f"sorted(product(*lists)): {tdelta1}")
+        print(f"sorted_product(*lists): {tdelta2}")
+        print(f"ratio: {tdelta2/tdelta1}")
+        print(f"sorted_product(*many_lists) ({len(many_result)}): {tdelta3}")
+        print(f"pure_bench: {pure_bench()}")
+    assert result == expected
+    assert many_result == sorted(many_result)
+    return tdelta2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""Benchmark suite with machine-readable results.
+
+Run all benchmarks (or those whose name contains a filter) and store the results as JSON:
+
+    python -m tests.benchmarks.benchmark_suite run -o results.json [-f inhabit]
+
+Compare results against a baseline, exits with status 1 if there are regressions:
+
+    python -m tests.benchmarks.benchmark_suite compare baseline.json results.json
+
+Each benchmark is run at several scales. Times are measured `repeat` times, peak memory is
+measured by `tracemalloc` in a separate run (tracing slows down execution).
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+from collections import defaultdict, deque
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from cls import (
+    Arrow,
+    Constructor,
+    FiniteCombinatoryLogic,
+    Intersection,
+    Subtypes,
+    Type,
+    enumerate_terms,
+    interpret_term,
+)
+from cls.fcl import TreeGrammar
+from cls.sortedenum import sorted_product
+from tests.benchmarks.benchmark_interpretation import grammar as interpretation_grammar
+from tests.benchmarks.benchmark_labyrinth import labyrinth_repository, pos
+from tests.benchmarks.benchmark_sorted_product import bench_lists
+
+# a benchmark prepares (untimed) a function to be timed for a given scale
+Setup = Callable[[int], Callable[[], object]]
+
+# differences of peak memory below this (in bytes) are not considered regressions
+MEMORY_TOLERANCE = 1 << 20
+
+
+def bench_repository(size: int) -> Callable[[], object]:
+    repository = labyrinth_repository(size)
+    return lambda: FiniteCombinatoryLogic(repository, Subtypes({}))
+
+
+def bench_inhabit(size: int) -> Callable[[], object]:
+    fcl = FiniteCombinatoryLogic(labyrinth_repository(size), Subtypes({}))
+    return lambda: fcl.inhabit(pos(size - 1, size - 1))
+
+
+def bench_inhabit_hierarchy(size: int) -> Callable[[], object]:
+    # chain A0 <= A1 <= ..., target is the intersection of the upper half of the chain
+    environment = {f"A{i}": {f"A{j}" for j in range(i + 1, size)} for i in range(size)}
+    repository: dict[str, Type] = {
+        f"F{i}": Type.intersect(
+            [Arrow(Constructor(f"B{k}"), Constructor(f"A{i}")) for k in range(10)]
+        )
+        for i in range(size)
+    }
+    repository.update({f"X{k}": Constructor(f"B{k}") for k in range(10)})
+    target = Type.intersect([Constructor(f"A{i}") for i in range(size // 2, size)])
+    subtypes = Subtypes(environment)
+    return lambda: FiniteCombinatoryLogic(repository, subtypes).inhabit(target)
+
+
+def bench_is_inhabited(size: int) -> Callable[[], object]:
+    fcl = FiniteCombinatoryLogic(labyrinth_repository(size), Subtypes({}))
+    return lambda: fcl.is_inhabited(pos(size - 1, size - 1))
+
+
+def bench_prune(length: int) -> Callable[[], object]:
+    # productive chain T0 <- T1 <- ... and unproductive chain U0 <- U1 <- ...
+    memo: TreeGrammar[str] = defaultdict(deque)
+    for i in range(length):
+        memo[Constructor(f"T{i}")].append(("c", [Constructor(f"T{i + 1}")]))
+        memo[Constructor(f"U{i}")].append(("c", [Constructor(f"U{i + 1}"), Constructor("T0")]))
+    memo[Constructor(f"T{length}")].append(("leaf", []))
+    return lambda: FiniteCombinatoryLogic._prune(memo)
+
+
+def bench_enumerate_terms(count: int) -> Callable[[], object]:
+    grammar: dict[str, list[tuple[str, list[str]]]] = {
+        "X": [("a", []), ("b", ["X", "Y"]), ("e", ["Y"])],
+        "Y": [("c", []), ("d", ["Y", "X"])],
+    }
+    return lambda: list(enumerate_terms("X", grammar, max_count=count))
+
+
+def bench_enumerate_labyrinth(size: int) -> Callable[[], object]:
+    target = pos(size - 1, size - 1)
+    grammar = FiniteCombinatoryLogic(labyrinth_repository(size), Subtypes({})).inhabit(target)
+    return lambda: list(enumerate_terms(target, grammar, max_count=1000))
+
+
+def bench_sorted_product(first_length: int) -> Callable[[], object]:
+    lists = bench_lists(first_length)
+    return lambda: list(sorted_product(*lists, key=lambda x: x, combine=sum))
+
+
+def bench_subtypes_closure(depth: int) -> Callable[[], object]:
+    # deep subtype hierarchy C0 <= C1 <= ...
+    environment = {f"C{i}": {f"C{i + 1}"} for i in range(depth)}
+    return lambda: Subtypes(environment)
+
+
+def bench_check_subtype_deep(depth: int) -> Callable[[], object]:
+    subtypes = Subtypes({f"C{i}": {f"C{i + 1}"} for i in range(depth)})
+    # deeply nested constructors C0(C0(...)) <= C_depth(C_depth(...))
+    subtype: Type = Constructor("C0")
+    supertype: Type = Constructor(f"C{depth}")
+    for _ in range(depth):
+        subtype = Constructor("C0", subtype)
+        supertype = Constructor(f"C{depth}", supertype)
+    return lambda: [subtypes.check_subtype(subtype, supertype) for _ in range(100)]
+
+
+def bench_check_subtype_nested(depth: int) -> Callable[[], object]:
+    subtypes = Subtypes({"A": {"B"}})
+    # nested arrows (...(A -> A) -> A ...) <= (...(B -> B) -> B ...), whose sources alternate
+    subtype: Type = Constructor("A")
+    supertype: Type = Constructor("B")
+    for _ in range(depth):
+        subtype, supertype = Arrow(supertype, Constructor("A")), Arrow(subtype, Constructor("B"))
+    return lambda: subtypes.check_subtype(subtype, supertype)
+
+
+def bench_check_subtype_wide(width: int) -> Callable[[], object]:
+    subtypes = Subtypes({})
+    # wide intersections, where the supertype is permuted
+    subtype = Type.intersect([Constructor(f"C{i}") for i in range(width)])
+    supertype = Type.intersect([Constructor(f"C{i}") for i in reversed(range(width))])
+    return lambda: subtypes.check_subtype(subtype, Intersection(supertype, supertype))
+
+
+def bench_subtype_matrix(width: int) -> Callable[[], object]:
+    # targets of multi-arrows (wide intersections) against many paths of a target
+    subtypes = Subtypes({f"A{i}": {f"B{i}"} for i in range(width)})
+    targets = [
+        Type.intersect([Constructor(f"A{(i + j) % width}") for j in range(width // 2)])
+        for i in range(20)
+    ]
+    paths = [Constructor(f"B{i}") for i in range(width)]
+    return lambda: subtypes.subtype_matrix(targets, paths)
+
+
+def bench_interpret_term(count: int) -> Callable[[], object]:
+    terms = list(itertools.islice(enumerate_terms("X", interpretation_grammar, None), count))
+    return lambda: [interpret_term(term) for term in terms]
+
+
+BENCHMARKS: dict[str, tuple[Setup, Sequence[int]]] = {
+    "repository": (bench_repository, (5, 10)),
+    "inhabit": (bench_inhabit, (4, 6, 8)),
+    "inhabit_hierarchy": (bench_inhabit_hierarchy, (20, 60)),
+    "is_inhabited": (bench_is_inhabited, (4, 6, 8)),
+    "prune": (bench_prune, (100, 500)),
+    "enumerate_terms": (bench_enumerate_terms, (1000, 10000, 50000)),
+    "enumerate_labyrinth": (bench_enumerate_labyrinth, (4, 5)),
+    "sorted_product": (bench_sorted_product, (5, 10)),
+    "subtypes_closure": (bench_subtypes_closure, (50, 200)),
+    "check_subtype_deep": (bench_check_subtype_deep, (100, 400)),
+    "check_subtype_nested": (bench_check_subtype_nested, (1000, 100000)),
+    "check_subtype_wide": (bench_check_subtype_wide, (100, 500)),
+    "subtype_matrix": (bench_subtype_matrix, (20, 60)),
+    "interpret_term": (bench_interpret_term, (1000, 20000)),
+}
+
+
+@dataclass(frozen=True)
+class Result:
+    benchmark: str
+    scale: int
+    # times (in seconds) of all repetitions
+    times: list[float]
+    # peak memory (in bytes) allocated during a single run
+    peak_memory: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.benchmark}[{self.scale}]"
+
+
+def measure(benchmark: str, scale: int, repeat: int) -> Result:
+    setup, _ = BENCHMARKS[benchmark]
+    times: list[float] = []
+    for _ in range(repeat):
+        # setup for each repetition, since benchmarks may modify their data
+        run = setup(scale)
+        start = timeit.default_timer()
+        run()
+        times.append(timeit.default_timer() - start)
+
+    run = setup(scale)
+    tracemalloc.start()
+    run()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Result(benchmark, scale, times, peak_memory)
+
+
+def run_benchmarks(names: Sequence[str], repeat: int, output: bool = True) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for name in names:
+        for scale in BENCHMARKS[name][1]:
+            result = measure(name, scale, repeat)
+            results[result.key] = asdict(result) | {
+                "min": min(result.times),
+                "median": statistics.median(result.times),
+            }
+            if output:
+                print(
+                    f"{result.key:30} min: {min(result.times):10.4f}s "
+                    f"peak memory: {result.peak_memory / 1024:12.1f}KiB",
+                    file=sys.stderr,
+                )
+    return {
+        "metadata": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float, memory_threshold: float
+) -> list[str]:
+    """Print a comparison of results and return the keys of regressed benchmarks.
+
+    A benchmark regressed, if its minimal time (or peak memory) increased by more than the given
+    (relative) threshold. Increases of peak memory below `MEMORY_TOLERANCE` are ignored."""
+
+    regressions: list[str] = []
+    for key, result in current["results"].items():
+        if key not in baseline["results"]:
+            print(f"{key:30} new")
+            continue
+        old = baseline["results"][key]
+        time_ratio = result["min"] / old["min"] if old["min"] > 0 else 1.0
+        memory_ratio = (
+            result["peak_memory"] / old["peak_memory"] if old["peak_memory"] > 0 else 1.0
+        )
+        regressed = time_ratio > 1 + threshold or (
+            memory_ratio > 1 + memory_threshold
+            and result["peak_memory"] - old["peak_memory"] > MEMORY_TOLERANCE
+        )
+        if regressed:
+            regressions.append(key)
+        print(
+            f"{key:30} time: {old['min']:10.4f}s -> {result['min']:10.4f}s ({time_ratio:6.2f}x)"
+            f"  memory: {memory_ratio:6.2f}x{'  REGRESSION' if regressed else ''}"
+        )
+    for key in sorted(baseline["results"].keys() - current["results"].keys()):
+        print(f"{key:30} missing")
+    return regressions
+
+
+def main(arguments: Sequence[str] = sys.argv[1:]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks")
+    run_parser.add_argument("-o", "--output", help="JSON file for results (default: stdout)")
+    run_parser.add_argument("-f", "--filter", default="", help="run benchmarks containing this")
+    run_parser.add_argument("-r", "--repeat", type=int, default=3, help="repetitions per scale")
+
+    compare_parser = commands.add_parser("compare", help="compare results against a baseline")
+    compare_parser.add_argument("baseline", help="JSON file of baseline results")
+    compare_parser.add_argument("current", help="JSON file of current results")
+    compare_parser.add_argument(
+        "-t", "--threshold", type=float, default=0.2, help="tolerated relative time increase"
+    )
+    compare_parser.add_argument(
+        "-m", "--memory-threshold", type=float, default=0.2, help="tolerated memory increase"
+    )
+
+    args = parser.parse_args(arguments)
+    if args.command == "run":
+        names = [name for name in BENCHMARKS if args.filter in name]
+        results = run_benchmarks(names, args.repeat)
+        if args.output is None:
+            print(json.dumps(results, indent=2))
+        else:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        return 0
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold, args.memory_threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
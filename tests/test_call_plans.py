@@ -0,0 +1,57 @@
+from collections.abc import Sequence
+import logging
+import unittest
+
+from cls import Arrow, Constructor, FiniteCombinatoryLogic, Subtypes, interpret_term
+from cls.enumeration import CallPlan, prepare_call_plans
+
+
+def F(x: str, *xs: str) -> Sequence[str]:
+    return (x, *xs)
+
+
+def G(x: str, y: str = "y") -> str:
+    return x + y
+
+
+class TestCallPlans(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def test_plans(self) -> None:
+        self.assertEqual(CallPlan(is_callable=False), CallPlan.of("X"))
+        self.assertEqual(
+            CallPlan(is_callable=True, simple_arity=1, pop_all=True), CallPlan.of(F)
+        )
+        self.assertEqual(
+            CallPlan(is_callable=True, simple_arity=1, default_arity=1), CallPlan.of(G)
+        )
+        self.assertEqual(CallPlan(is_callable=True, nullary=True), CallPlan.of(lambda: 1))
+        self.assertIsNotNone(CallPlan.of(max).error)
+
+    def test_reuse(self) -> None:
+        plans = prepare_call_plans([F, G, "a"])
+        self.assertEqual(3, len(plans))
+        term = (F, (("a", ()), (G, (("b", ()),)), (G, (("c", ()), ("d", ())))))
+        self.assertEqual(("a", "by", "cd"), interpret_term(term, call_plans=plans))
+        self.assertEqual(CallPlan.of(G), plans[G])
+        self.assertEqual(6, len(plans))
+        interpret_term(("e", ()), call_plans=plans)
+        self.assertEqual(CallPlan(is_callable=False), plans["e"])
+
+    def test_signature_error(self) -> None:
+        with self.assertRaises(RuntimeError):
+            interpret_term((max, ()))
+
+    def test_repository(self) -> None:
+        a = Constructor("a")
+        fcl = FiniteCombinatoryLogic({"a": a, G: Arrow(a, a)}, Subtypes({}))
+        self.assertEqual(CallPlan.of(G), fcl.call_plans[G])
+        self.assertEqual(CallPlan(is_callable=False), fcl.call_plans["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import itertools
+import logging
+import unittest
+from collections.abc import Callable
+
+from cls import (
+    Arrow,
+    CombinatorClass,
+    Constructor,
+    FiniteCombinatoryLogic,
+    InhabitationStatistics,
+    Intersection,
+    Subtypes,
+    Type,
+    enumerate_terms,
+    expand_grammar,
+    expand_term,
+    inhabit_and_interpret,
+)
+from cls.enumeration import SharedTree, Tree, TreeTable, tree_size
+
+
+def apply(name: str) -> Callable[[str, str], str]:
+    return lambda x, y: f"{name}({x}, {y})"
+
+
+class TestCombinatorClasses(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def setUp(self) -> None:
+        a: Type = Constructor("a")
+        b: Type = Constructor("b")
+        self.f = apply("f")
+        self.g = apply("g")
+        self.repository: dict[object, Type] = {
+            "x": a,
+            "y": Intersection(a, a),
+            "z": a,
+            "w": b,
+            self.f: Arrow(a, Arrow(b, b)),
+            self.g: Arrow(a, Arrow(b, b)),
+        }
+        self.fcl: FiniteCombinatoryLogic[object] = FiniteCombinatoryLogic(
+            self.repository, Subtypes({})
+        )
+        self.target = b
+
+    def test_classes(self) -> None:
+        representations = [c for c, _ in self.fcl.combinator_classes]
+        self.assertIn(CombinatorClass(("x", "z")), representations)
+        self.assertIn(CombinatorClass((self.f, self.g)), representations)
+        # types are equal, not just equivalent
+        self.assertIn("y", representations)
+        self.assertIn("w", representations)
+
+    def test_grammar(self) -> None:
+        statistics = InhabitationStatistics()
+        compact = self.fcl.inhabit_compact(self.target, statistics=statistics)
+        grammar = self.fcl.inhabit(self.target)
+        # subqueries are computed once per class
+        self.assertEqual(
+            {CombinatorClass(("x", "z")), "y", "w", CombinatorClass((self.f, self.g))},
+            set(statistics.subqueries),
+        )
+        self.assertEqual((2, 4), statistics.grammar_size_after)
+        self.assertEqual(dict(grammar), dict(expand_grammar(compact)))
+        self.assertEqual(6, sum(len(rules) for rules in grammar.values()))
+
+    def test_expand_term(self) -> None:
+        compact = self.fcl.inhabit_compact(self.target)
+        grammar = self.fcl.inhabit(self.target)
+        expanded = [
+            t for term in enumerate_terms(self.target, compact, 10) for t in expand_term(term)
+        ]
+        expected = list(enumerate_terms(self.target, grammar, max_count=len(expanded)))
+        self.assertEqual(len(expanded), len(set(expanded)))
+        largest = tree_size(expected[-1])
+        self.assertEqual(
+            {t for t in expected if tree_size(t) < largest},
+            {t for t in expanded if tree_size(t) < largest},
+        )
+        self.assertEqual(sorted(map(tree_size, expanded)), list(map(tree_size, expanded)))
+
+    def test_expand_without_classes(self) -> None:
+        term: Tree[str] = ("w", ())
+        for _ in range(5000):
+            term = ("f", (("x", ()), term))
+        table: TreeTable[str] = TreeTable()
+        (expanded,) = expand_term(term, table)
+        self.assertIsInstance(expanded, SharedTree)
+        self.assertIs(table.share(term), expanded)
+        # shared terms are returned as they are
+        self.assertIs(expanded, next(expand_term(expanded)))
+
+    def test_expand_lazily(self) -> None:
+        # 2^18 * 4^19 expansions
+        constants: CombinatorClass[str] = CombinatorClass(("a", "b", "c", "d"))
+        term: Tree[str | CombinatorClass[str]] = (constants, ())
+        for _ in range(18):
+            term = (CombinatorClass(("f", "g")), (term, (constants, ())))
+        table: TreeTable[str] = TreeTable()
+        expanded = list(itertools.islice(expand_term(term, table), 100))
+        self.assertEqual(100, len(set(expanded)))
+        self.assertTrue(all(tree_size(t) == tree_size(term) for t in expanded))
+        # expansions share subterms
+        self.assertLess(len(table), 100 * tree_size(term))
+
+    def test_interpret(self) -> None:
+        results = list(inhabit_and_interpret(self.repository, self.target, max_count=20))
+        self.assertEqual(20, len(set(results)))
+        self.assertEqual("w", results[0])
+        self.assertIn("g(z, w)", results)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import itertools
+import logging
+import unittest
+from collections.abc import Mapping
+
+from cls import enumerate_terms, enumerate_terms_by_cost
+from cls.enumeration import Tree, tree_size
+
+grammar: Mapping[str, list[tuple[str, list[str]]]] = {
+    "X": [("a", []), ("b", ["X", "Y"]), ("e", ["Y"])],
+    "Y": [("c", []), ("d", ["Y", "X"])],
+}
+
+
+def total_cost(term: Tree[str], cost: Mapping[str, int]) -> int:
+    return cost.get(term[0], 1) + sum(total_cost(arg, cost) for arg in term[1])
+
+
+class TestCost(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def test_unit_cost(self) -> None:
+        terms = list(enumerate_terms_by_cost("X", grammar, lambda c: 1, max_count=500))
+        expected = list(enumerate_terms("X", grammar, max_count=500))
+        self.assertEqual(list(map(tree_size, expected)), list(map(tree_size, terms)))
+
+    def test_cost(self) -> None:
+        cost = {"a": 5, "b": 1, "c": 1, "d": 3, "e": 2}
+        terms = list(enumerate_terms_by_cost("X", grammar, cost, max_count=50))
+        self.assertEqual(50, len(set(terms)))
+        costs = [total_cost(t, cost) for t in terms]
+        self.assertEqual(sorted(costs), costs)
+        self.assertEqual(("e", (("c", ()),)), terms[0])
+        # all terms up to the largest cost are found (each combinator costs at least 1)
+        largest = costs[-1]
+        expected = {
+            t
+            for t in itertools.takewhile(
+                lambda t: tree_size(t) < largest, enumerate_terms("X", grammar, max_count=None)
+            )
+            if total_cost(t, cost) < largest
+        }
+        self.assertEqual(expected, {t for t in terms if total_cost(t, cost) < largest})
+
+    def test_mapping_default(self) -> None:
+        terms = list(enumerate_terms_by_cost("X", grammar, {"a": 10}, max_count=5))
+        self.assertEqual(("e", (("c", ()),)), terms[0])
+        self.assertNotIn(("a", ()), terms)
+
+    def test_zero_cost(self) -> None:
+        cost = {"a": 0, "b": 1, "c": 1, "d": 1, "e": 0}
+        terms = list(enumerate_terms_by_cost("X", grammar, cost, max_count=100))
+        costs = [total_cost(t, cost) for t in terms]
+        self.assertEqual(sorted(costs), costs)
+        self.assertEqual([("a", ())], terms[:1])
+        self.assertIn(("e", (("c", ()),)), terms[:3])
+
+    def test_zero_cost_cycle(self) -> None:
+        cycle = {"X": [("a", []), ("f", ["X"]), ("g", ["X"])]}
+        terms = list(
+            itertools.islice(enumerate_terms_by_cost("X", cycle, {"f": 0}, max_count=None), 10)
+        )
+        self.assertEqual(("a", ()), terms[0])
+        self.assertTrue(all(t[0] in ("a", "f") for t in terms))
+
+    def test_negative_cost(self) -> None:
+        with self.assertRaises(ValueError):
+            list(enumerate_terms_by_cost("X", grammar, {"a": -1}))
+
+
+if __name__ == "__main__":
+    unittest.main()
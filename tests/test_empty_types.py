@@ -0,0 +1,67 @@
+import logging
+import unittest
+
+from cls import (
+    Arrow,
+    Constructor,
+    FiniteCombinatoryLogic,
+    InhabitationStatistics,
+    Subtypes,
+    Type,
+    enumerate_terms,
+)
+
+
+class TestEmptyTypes(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def setUp(self) -> None:
+        a: Type = Constructor("a")
+        b: Type = Constructor("b")
+        c: Type = Constructor("c")
+        d: Type = Constructor("d")
+        self.repository: dict[str, Type] = {
+            "X": b,
+            "F": Arrow(a, c),
+            "G": Arrow(b, c),
+            # d is a subtype of a, which is not inhabited
+            "H": Arrow(d, Arrow(b, c)),
+            "I": Arrow(a, d),
+        }
+        self.subtypes = Subtypes({"d": {"a"}})
+
+    def test_empty_types(self) -> None:
+        fcl = FiniteCombinatoryLogic(self.repository, self.subtypes)
+        fcl.inhabit(Constructor("a"))
+        self.assertEqual({Constructor("a")}, fcl.empty_types)
+
+        statistics = InhabitationStatistics()
+        grammar = fcl.inhabit(Constructor("c"), statistics=statistics)
+        # F and H are skipped, d is known to be empty as a subtype of a
+        self.assertEqual(2, statistics.empty_subqueries)
+        self.assertIn(Constructor("d"), fcl.empty_types)
+        self.assertEqual(2, statistics.targets)
+
+        # the language is the same as without known empty types
+        expected = FiniteCombinatoryLogic(self.repository, self.subtypes).inhabit(Constructor("c"))
+        self.assertEqual(
+            set(enumerate_terms(Constructor("c"), expected)),
+            set(enumerate_terms(Constructor("c"), grammar)),
+        )
+        self.assertEqual(dict(expected), dict(grammar))
+
+    def test_empty_target(self) -> None:
+        fcl = FiniteCombinatoryLogic(self.repository, self.subtypes)
+        self.assertEqual({}, dict(fcl.inhabit(Constructor("d"))))
+        self.assertEqual({Constructor("a"), Constructor("d")}, fcl.empty_types)
+        statistics = InhabitationStatistics()
+        self.assertEqual({}, dict(fcl.inhabit(Constructor("d"), statistics=statistics)))
+        self.assertEqual(0, statistics.targets)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import logging
+import unittest
+
+from cls import Arrow, Constructor, FiniteCombinatoryLogic, Intersection, Omega, Subtypes, Type
+from cls.fcl import FunctionTypes, MultiArrow
+
+
+class TestFunctionTypes(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    a: Type = Constructor("a")
+    b: Type = Constructor("b")
+    c: Type = Constructor("c")
+    d: Type = Constructor("d")
+
+    def test_arities(self) -> None:
+        ty = Intersection(Arrow(self.a, Arrow(self.b, self.c)), Arrow(self.b, self.d))
+        self.assertEqual(
+            [
+                [([], ty)],
+                [([self.b], self.d), ([self.a], Arrow(self.b, self.c))],
+                [([self.a, self.b], self.c)],
+            ],
+            list(FunctionTypes(ty)),
+        )
+
+    def test_lazy(self) -> None:
+        ty = Arrow(self.a, Arrow(self.b, self.c))
+        function_types = FunctionTypes(ty)
+        self.assertEqual(1, len(function_types.arities))
+        iterator = iter(function_types)
+        next(iterator)
+        next(iterator)
+        self.assertEqual(2, len(function_types.arities))
+        self.assertFalse(function_types.complete)
+        self.assertEqual(3, len(list(function_types)))
+        self.assertTrue(function_types.complete)
+        # cached
+        self.assertIs(function_types.arities[1], list(function_types)[1])
+
+    def test_merge(self) -> None:
+        ty = Type.intersect(
+            [
+                Arrow(self.a, self.b),
+                Arrow(self.a, Arrow(self.b, self.c)),
+                Arrow(self.a, self.b),
+                Arrow(self.b, Arrow(self.b, self.d)),
+                Arrow(self.a, Arrow(self.b, self.d)),
+                Arrow(self.a, Arrow(self.c, Omega())),
+            ]
+        )
+        arities = list(FunctionTypes(ty))
+        self.assertEqual(3, len(arities))
+        # multi-arrows with equal arguments are merged
+        self.assert_equivalent(
+            [
+                ([self.a], Type.intersect([self.b, Arrow(self.b, self.c), Arrow(self.b, self.d)])),
+                ([self.b], Arrow(self.b, self.d)),
+            ],
+            arities[1],
+        )
+        self.assert_equivalent(
+            [([self.a, self.b], Intersection(self.c, self.d)), ([self.b, self.b], self.d)],
+            arities[2],
+        )
+
+    def assert_equivalent(self, expected: list[MultiArrow], actual: list[MultiArrow]) -> None:
+        subtypes = Subtypes({})
+        self.assertEqual(len(expected), len(actual))
+        for (expected_args, expected_tgt), (args, tgt) in zip(
+            expected, sorted(actual, key=lambda m: str(m[0]))
+        ):
+            self.assertEqual(expected_args, args)
+            self.assertTrue(subtypes.check_subtype(expected_tgt, tgt))
+            self.assertTrue(subtypes.check_subtype(tgt, expected_tgt))
+
+    def test_shared(self) -> None:
+        ty = Arrow(self.a, self.b)
+        fcl = FiniteCombinatoryLogic({"x": ty, "y": ty, "z": self.a}, Subtypes({}))
+        self.assertIs(fcl.repository["x"], fcl.repository["y"])
+        grammar = fcl.inhabit(self.b)
+        self.assertEqual([("x", [self.a]), ("y", [self.a])], list(grammar[self.b]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import logging
+import unittest
+from collections.abc import Mapping
+
+from cls import Arrow, Constructor, Type, enumerate_terms, inhabit_and_interpret
+from cls.enumeration import TreeTable, count_terms, finite_terms, tree_size
+from cls.grammar import (
+    finite_non_terminals,
+    productive_non_terminals,
+    reachable_grammar,
+    strongly_connected_components,
+)
+
+# "F" is finite, "X" and "Y" are infinite and mutually dependent, "Z" depends on "X"
+grammar: Mapping[str, list[tuple[str, list[str]]]] = {
+    "Z": [("z", ["X", "F"])],
+    "X": [("a", []), ("b", ["X", "Y"])],
+    "Y": [("c", ["F"]), ("d", ["Y", "X"])],
+    "F": [("f", ["G", "G"]), ("e", [])],
+    "G": [("g", []), ("h", [])],
+    "U": [("u", ["U"]), ("v", ["G", "U"])],
+    "V": [("v", ["G", "U"]), ("w", ["F"])],
+}
+
+# the language of "B{i}" is finite and has more than 2^(2^i) terms
+binary: dict[str, list[tuple[str, list[str]]]] = {
+    f"B{i}": [("a", []), ("f", [f"B{i - 1}", f"B{i - 1}"]) if i > 0 else ("b", [])]
+    for i in range(6)
+}
+
+
+class TestGrammar(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def test_reachable(self) -> None:
+        self.assertEqual({"F", "G"}, set(reachable_grammar(grammar, "F")))
+        self.assertEqual({"X", "Y", "F", "G"}, set(reachable_grammar(grammar, "X")))
+        self.assertEqual({"G"}, set(reachable_grammar(grammar, "G", "W")))
+        self.assertEqual(grammar["F"], reachable_grammar(grammar, "F")["F"])
+
+    def test_components(self) -> None:
+        components = strongly_connected_components(grammar)
+        self.assertEqual(
+            [["G"], ["F"], ["X", "Y"], ["Z"], ["U"], ["V"]], [sorted(c) for c in components]
+        )
+
+    def test_long_chain(self) -> None:
+        chain = {i: [("s", [i + 1])] for i in range(10000)}
+        chain[10000] = [("z", [])]
+        components = strongly_connected_components(chain)
+        self.assertEqual([[i] for i in reversed(range(10001))], components)
+
+    def test_productive(self) -> None:
+        self.assertEqual({"F", "G", "X", "Y", "Z", "V"}, productive_non_terminals(grammar))
+
+    def test_finite(self) -> None:
+        # "U" is not productive, hence "V" is finite
+        self.assertEqual(["G", "F", "V"], finite_non_terminals(grammar))
+        self.assertEqual([f"B{i}" for i in range(6)], finite_non_terminals(binary))
+
+    def test_count(self) -> None:
+        self.assertEqual(5, count_terms("F", grammar))
+        self.assertEqual(5, count_terms("V", grammar))
+        self.assertEqual(None, count_terms("Z", grammar))
+        self.assertEqual(0, count_terms("U", grammar))
+        self.assertEqual(0, count_terms("W", grammar))
+        self.assertEqual(677, count_terms("B3", binary))
+        # counted without computing terms
+        self.assertEqual(458330**2 + 1, count_terms("B5", binary))
+
+    def test_count_ambiguous(self) -> None:
+        # "f(b)" is derivable by both rules of "f"
+        ambiguous: dict[str, list[tuple[str, list[str]]]] = {
+            "X": [("a", []), ("f", ["A"]), ("f", ["B"]), ("f", ["A"])],
+            "A": [("a", []), ("b", [])],
+            "B": [("b", []), ("c", [])],
+        }
+        self.assertEqual(4, count_terms("X", ambiguous))
+        self.assertEqual(4, len(list(enumerate_terms("X", ambiguous, max_count=None))))
+
+    def test_finite_terms(self) -> None:
+        table: TreeTable[str] = TreeTable()
+        terms = finite_terms(binary, lambda c: lambda args: table.make(c, args), limit=1000)
+        self.assertEqual({"B0", "B1", "B2", "B3"}, set(terms))
+        self.assertEqual([2, 5, 26, 677], [len(terms[f"B{i}"]) for i in range(4)])
+        self.assertEqual(len(terms["B3"]), len(set(terms["B3"])))
+
+    def test_finite_enumeration(self) -> None:
+        # terminates although other non-terminals have infinitely many terms
+        self.assertEqual(5, len(list(enumerate_terms("F", grammar, max_count=None))))
+        self.assertEqual(100, len(list(enumerate_terms("Z", grammar, max_count=100))))
+        terms = list(enumerate_terms("B3", binary, max_count=None))
+        self.assertEqual(677, len(set(terms)))
+        self.assertEqual(sorted(map(tree_size, terms)), list(map(tree_size, terms)))
+        # too large to be computed up front
+        terms = list(enumerate_terms("B4", binary, max_count=10000))
+        self.assertEqual(10000, len(set(terms)))
+        self.assertEqual(sorted(map(tree_size, terms)), list(map(tree_size, terms)))
+
+    def test_finite_query(self) -> None:
+        repository: dict[object, Type] = {
+            "a": Constructor("a"),
+            "b": Constructor("b"),
+            (lambda x: f"f({x})"): Arrow(Constructor("b"), Constructor("b")),
+        }
+        # enumeration of the finite query "a" terminates although "b" is infinite
+        results = inhabit_and_interpret(repository, [Constructor("a"), Constructor("b")])
+        self.assertEqual(["a", "b", "f(b)"], [r for r, _ in zip(results, range(3))])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import itertools
+import logging
+import threading
+import unittest
+from typing import Any
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from cls import InterpretationCache, enumerate_terms, interpret_term, interpret_terms
+
+
+def a() -> str:
+    return "a"
+
+
+def b(x: str, y: str) -> str:
+    return f"b({x}, {y})"
+
+
+grammar: Mapping[str, list[tuple[object, list[str]]]] = {
+    "X": [(a, []), (b, ["X", "X"])],
+}
+
+
+class TestInterpretTerms(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def setUp(self) -> None:
+        self.terms = list(enumerate_terms("X", grammar, max_count=200))
+        self.expected: dict[Any, Any] = {t: interpret_term(t) for t in self.terms}
+
+    def test_sequential(self) -> None:
+        cache = InterpretationCache(maxsize=None)
+        results = list(interpret_terms(self.terms, cache))
+        self.assertEqual(list(self.expected.items()), results)
+        # every distinct subterm is evaluated once
+        self.assertEqual(len(cache), cache.misses)
+
+    def test_threads(self) -> None:
+        with ThreadPoolExecutor(4) as executor:
+            results = list(interpret_terms(self.terms + self.terms[:10], executor=executor))
+        self.assertEqual(210, len(results))
+        for term, result in results:
+            self.assertEqual(self.expected[term], result)
+
+    def test_processes(self) -> None:
+        with ProcessPoolExecutor(2) as executor:
+            results = dict(interpret_terms(self.terms[:50], executor=executor))
+        self.assertEqual({t: self.expected[t] for t in self.terms[:50]}, results)
+
+    def test_lazy_input(self) -> None:
+        # infinitely many terms
+        terms = enumerate_terms("X", grammar, max_count=None)
+        with ThreadPoolExecutor(2) as executor:
+            results = list(
+                itertools.islice(
+                    interpret_terms(terms, executor=executor, chunk_size=10, max_pending=2), 25
+                )
+            )
+        self.assertEqual(25, len(results))
+        for term, result in results:
+            self.assertEqual(interpret_term(term), result)
+
+    def test_workers_interpret_terms(self) -> None:
+        threads: set[str] = set()
+
+        def d(x: str, y: str) -> str:
+            threads.add(threading.current_thread().name)
+            return b(x, y)
+
+        terms = list(enumerate_terms("X", {"X": [(a, []), (d, ["X", "X"])]}, max_count=50))
+        with ThreadPoolExecutor(2, thread_name_prefix="worker") as executor:
+            results = list(interpret_terms(terms, executor=executor, chunk_size=5))
+        self.assertEqual(50, len(results))
+        self.assertTrue(all(thread.startswith("worker") for thread in threads))
+
+    def test_impure(self) -> None:
+        count = [0]
+
+        def c() -> int:
+            count[0] += 1
+            return count[0]
+
+        terms = [(c, ()), (c, ()), (b, ((c, ()), (a, ())))]
+        cache = InterpretationCache(impure=[c])
+        with ThreadPoolExecutor(1) as executor:
+            results = list(interpret_terms(terms, cache, executor=executor))
+        self.assertEqual(3, len(results))
+        self.assertEqual(3, count[0])
+        self.assertNotIn(terms[2], cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
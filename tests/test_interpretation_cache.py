@@ -0,0 +1,87 @@
+import logging
+import unittest
+from collections.abc import Mapping
+
+from cls import InterpretationCache, enumerate_terms, interpret_term
+from cls.types import Arrow, Constructor
+from cls import inhabit_and_interpret
+
+
+class TestInterpretationCache(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def setUp(self) -> None:
+        self.calls: dict[str, int] = {"a": 0, "b": 0, "fresh": 0}
+
+        def a() -> str:
+            self.calls["a"] += 1
+            return "a"
+
+        def b(x: str, y: str) -> str:
+            self.calls["b"] += 1
+            return f"b({x}, {y})"
+
+        def fresh() -> str:
+            self.calls["fresh"] += 1
+            return f"fresh{self.calls['fresh']}"
+
+        self.a, self.b, self.fresh = a, b, fresh
+        self.grammar: Mapping[str, list[tuple[object, list[str]]]] = {
+            "X": [(a, []), (b, ["X", "X"]), (fresh, [])],
+        }
+
+    def test_uncached(self) -> None:
+        terms = list(enumerate_terms("X", self.grammar, max_count=50))
+        results = [interpret_term(t) for t in terms]
+        cache = InterpretationCache(impure=[self.fresh])
+        calls = dict(self.calls)
+        self.calls.update({"a": 0, "b": 0, "fresh": 0})
+        self.assertEqual(
+            [r.startswith("fresh") for r in results],
+            [r.startswith("fresh") for r in (interpret_term(t, cache) for t in terms)],
+        )
+        self.assertLess(self.calls["b"], calls["b"])
+        self.assertEqual(1, self.calls["a"])
+        self.assertEqual(calls["fresh"], self.calls["fresh"])
+
+    def test_impure(self) -> None:
+        cache = InterpretationCache(impure=[self.fresh])
+        term = (self.b, ((self.fresh, ()), (self.a, ())))
+        self.assertEqual("b(fresh1, a)", interpret_term(term, cache))
+        self.assertEqual("b(fresh2, a)", interpret_term(term, cache))
+        self.assertNotIn(term, cache)
+        self.assertIn((self.a, ()), cache)
+
+    def test_pure(self) -> None:
+        cache = InterpretationCache()
+        term = (self.b, ((self.fresh, ()), (self.a, ())))
+        self.assertEqual("b(fresh1, a)", interpret_term(term, cache))
+        self.assertEqual("b(fresh1, a)", interpret_term(term, cache))
+        self.assertEqual(1, cache.hits)
+        cache.mark_impure(self.fresh)
+        self.assertEqual(0, len(cache))
+        self.assertEqual("b(fresh2, a)", interpret_term(term, cache))
+
+    def test_lru(self) -> None:
+        cache = InterpretationCache(maxsize=2)
+        for t in enumerate_terms("X", self.grammar, max_count=20):
+            interpret_term(t, cache)
+            self.assertLessEqual(len(cache), 2)
+        self.assertIn(t, cache)
+
+    def test_inhabit_and_interpret(self) -> None:
+        cache = InterpretationCache()
+        A = Constructor("A")
+        repository = {self.a: A, self.b: Arrow(A, Arrow(A, A))}
+        results = list(inhabit_and_interpret(repository, A, max_count=100, cache=cache))
+        self.assertEqual(100, len(results))
+        self.assertEqual(1, self.calls["a"])
+        self.assertEqual(99, self.calls["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
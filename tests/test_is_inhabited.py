@@ -0,0 +1,97 @@
+import logging
+import unittest
+
+from cls import (
+    Arrow,
+    Constructor,
+    FiniteCombinatoryLogic,
+    InhabitationStatistics,
+    Intersection,
+    Subtypes,
+    Type,
+    enumerate_terms_of_size,
+)
+from cls.enumeration import tree_size
+from tests.benchmarks.benchmark_labyrinth import is_free, labyrinth_repository, pos
+
+
+class TestIsInhabited(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def setUp(self) -> None:
+        a: Type = Constructor("a")
+        b: Type = Constructor("b")
+        c: Type = Constructor("c")
+        self.repository: dict[str, Type] = {
+            "X": a,
+            "Y": a,
+            "F": Intersection(Arrow(a, b), Arrow(b, c)),
+            "G": Arrow(c, Arrow(c, c)),
+            # not inhabited
+            "H": Arrow(Constructor("d"), b),
+        }
+
+    def test_inhabited(self) -> None:
+        fcl = FiniteCombinatoryLogic(self.repository, Subtypes({}))
+        for target in ("a", "b", "c"):
+            self.assertTrue(fcl.is_inhabited(Constructor(target)))
+            term = fcl.inhabitant(Constructor(target))
+            grammar = FiniteCombinatoryLogic(self.repository, Subtypes({})).inhabit(
+                Constructor(target)
+            )
+            self.assertIsNotNone(term)
+            if term is not None:
+                self.assertIn(
+                    term,
+                    set(
+                        enumerate_terms_of_size(Constructor(target), grammar, tree_size(term), None)
+                    ),
+                )
+
+    def test_not_inhabited(self) -> None:
+        fcl = FiniteCombinatoryLogic(self.repository, Subtypes({}))
+        self.assertFalse(fcl.is_inhabited(Constructor("d")))
+        self.assertIsNone(fcl.inhabitant(Arrow(Constructor("d"), Constructor("e"))))
+        self.assertIn(Constructor("d"), fcl.empty_types)
+
+    def test_labyrinth(self) -> None:
+        size = 4
+        repository = labyrinth_repository(size)
+        for row in range(size):
+            for col in range(size):
+                if is_free(row, col):
+                    target = pos(row, col)
+                    grammar = FiniteCombinatoryLogic(repository, Subtypes({})).inhabit(target)
+                    statistics = InhabitationStatistics()
+                    term = FiniteCombinatoryLogic(repository, Subtypes({})).inhabitant(
+                        target, statistics=statistics
+                    )
+                    if target in grammar:
+                        self.assertIsNotNone(term)
+                        if term is not None:
+                            terms = enumerate_terms_of_size(target, grammar, tree_size(term), None)
+                            self.assertIn(term, set(terms))
+                    else:
+                        self.assertIsNone(term)
+
+    def test_deep(self) -> None:
+        # the only inhabitant of T0 is F0(F1(...(X)))
+        depth = 300
+        repository: dict[str, Type] = {
+            f"F{i}": Arrow(Constructor(f"T{i + 1}"), Constructor(f"T{i}")) for i in range(depth)
+        }
+        repository["X"] = Constructor(f"T{depth}")
+        fcl = FiniteCombinatoryLogic(repository, Subtypes({}))
+        term = fcl.inhabitant(Constructor("T0"))
+        self.assertIsNotNone(term)
+        if term is not None:
+            self.assertEqual("F0", term[0])
+            self.assertEqual(depth + 1, tree_size(term))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import itertools
+import logging
+import unittest
+from collections.abc import Mapping
+
+from cls import (
+    Arrow,
+    Constructor,
+    FiniteCombinatoryLogic,
+    Intersection,
+    Subtypes,
+    Type,
+    best_costs,
+    enumerate_k_best,
+    enumerate_terms,
+    enumerate_terms_by_cost,
+)
+from cls.enumeration import Tree, tree_size
+
+grammar: Mapping[str, list[tuple[str, list[str]]]] = {
+    "X": [("a", []), ("b", ["X", "Y"]), ("e", ["Y"])],
+    "Y": [("c", []), ("d", ["Y", "X"])],
+    "Z": [("f", ["Z"])],
+}
+
+
+def total_cost(term: Tree[str], cost: Mapping[str, int]) -> int:
+    return cost.get(term[0], 1) + sum(total_cost(arg, cost) for arg in term[1])
+
+
+class TestKBest(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def test_best_costs(self) -> None:
+        self.assertEqual({"X": 1, "Y": 1}, best_costs(grammar))
+        self.assertEqual({"X": 3, "Y": 1}, best_costs(grammar, {"a": 5, "e": 2}))
+
+    def test_size(self) -> None:
+        terms = list(enumerate_k_best("X", grammar, 500))
+        self.assertEqual(500, len(set(terms)))
+        expected = list(enumerate_terms("X", grammar, max_count=500))
+        self.assertEqual(list(map(tree_size, expected)), list(map(tree_size, terms)))
+        largest = tree_size(terms[-1])
+        self.assertEqual(
+            {t for t in expected if tree_size(t) < largest},
+            {t for t in terms if tree_size(t) < largest},
+        )
+
+    def test_cost(self) -> None:
+        cost = {"a": 5, "b": 1, "c": 1, "d": 3, "e": 2}
+        terms = list(enumerate_k_best("X", grammar, 50, cost))
+        expected = list(enumerate_terms_by_cost("X", grammar, cost, max_count=50))
+        self.assertEqual(("e", (("c", ()),)), terms[0])
+        self.assertEqual(
+            [total_cost(t, cost) for t in expected], [total_cost(t, cost) for t in terms]
+        )
+
+    def test_lazy(self) -> None:
+        terms = enumerate_k_best("X", grammar, None)
+        self.assertEqual(1000, len(set(itertools.islice(terms, 1000))))
+
+    def test_finite(self) -> None:
+        finite: dict[str, list[tuple[str, list[str]]]] = {
+            "X": [("a", []), ("b", ["Y", "Y"])],
+            "Y": [("c", []), ("d", [])],
+        }
+        self.assertEqual(5, len(list(enumerate_k_best("X", finite, 100))))
+
+    def test_duplicates(self) -> None:
+        duplicates: dict[str, list[tuple[str, list[str]]]] = {
+            "X": [("a", []), ("a", []), ("b", ["X"]), ("b", ["Y"])],
+            "Y": [("a", [])],
+        }
+        terms = list(enumerate_k_best("X", duplicates, 10))
+        self.assertEqual(10, len(set(terms)))
+
+    def test_ambiguous(self) -> None:
+        # every term has exponentially many derivations
+        a = Constructor("a")
+        b = Constructor("b")
+        repository = {
+            "X": Intersection(a, b),
+            "F": Type.intersect([Arrow(a, a), Arrow(b, a), Arrow(a, b), Arrow(b, b)]),
+        }
+        ambiguous = FiniteCombinatoryLogic(repository, Subtypes({})).inhabit(a)
+        terms = list(enumerate_k_best(a, ambiguous, 16))
+        self.assertEqual(list(enumerate_terms(a, ambiguous, 16)), terms)
+
+    def test_deep(self) -> None:
+        # terms are deeper than the recursion limit
+        chain: dict[int, list[tuple[str, list[int]]]] = {
+            i: [("s", [i + 1]), ("t", [i + 1])] for i in range(3000)
+        }
+        chain[3000] = [("z", []), ("y", [])]
+        terms = list(enumerate_k_best(0, chain, 20))
+        self.assertEqual(20, len(set(terms)))
+        self.assertEqual({3001}, set(map(tree_size, terms)))
+
+    def test_empty(self) -> None:
+        self.assertEqual([], list(enumerate_k_best("Z", grammar, 10)))
+        self.assertEqual([], list(enumerate_k_best("W", grammar, 10)))
+
+    def test_non_positive_cost(self) -> None:
+        with self.assertRaises(ValueError):
+            list(enumerate_k_best("X", grammar, 10, {"b": 0}))
+
+
+if __name__ == "__main__":
+    unittest.main()
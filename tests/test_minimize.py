@@ -0,0 +1,56 @@
+import logging
+import unittest
+
+from cls import Arrow, Constructor, FiniteCombinatoryLogic, Intersection, Omega, Subtypes, Type
+
+
+class TestMinimize(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def setUp(self) -> None:
+        self.size = 10
+        # chain A0 <= A1 <= ...
+        self.subtypes = Subtypes(
+            {f"A{i}": {f"A{j}" for j in range(i + 1, self.size)} for i in range(self.size)}
+        )
+
+    def test_minimize(self) -> None:
+        chain = [Constructor(f"A{i}") for i in range(self.size)]
+        self.assertEqual({chain[0]}, self.subtypes.minimize(chain))
+        self.assertEqual({chain[0]}, self.subtypes.minimize(reversed(chain)))
+        b = Constructor("B")
+        self.assertEqual({chain[2], b}, self.subtypes.minimize([chain[5], b, chain[2], Omega()]))
+        # intersections are compared with all types
+        both = Intersection(chain[3], b)
+        self.assertEqual({both}, self.subtypes.minimize([chain[4], b, both]))
+        self.assertEqual(
+            {Arrow(chain[4], chain[0])},
+            self.subtypes.minimize([Arrow(chain[0], chain[1]), Arrow(chain[4], chain[0])]),
+        )
+        self.assertEqual(set(), self.subtypes.minimize([]))
+
+    def test_minimal_paths(self) -> None:
+        repository: dict[str, Type] = {
+            f"F{i}": Intersection(
+                Arrow(Constructor("B"), Constructor(f"A{i}")),
+                Arrow(Constructor("C"), Constructor(f"A{i}")),
+            )
+            for i in range(self.size)
+        }
+        repository["X"] = Constructor("B")
+        target = Type.intersect([Constructor(f"A{i}") for i in range(self.size // 2, self.size)])
+        fcl = FiniteCombinatoryLogic(repository, self.subtypes)
+        grammar = fcl.inhabit(target)
+        self.assertEqual([Constructor(f"A{self.size // 2}")], fcl.target_paths[target])
+        self.assertEqual(
+            {f"F{i}" for i in range(self.size // 2 + 1)},
+            {c for c, _ in grammar[target]},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
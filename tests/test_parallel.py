@@ -0,0 +1,102 @@
+import logging
+import unittest
+from collections.abc import Mapping
+
+from cls import enumerate_terms, enumerate_terms_parallel
+from cls.enumeration import tree_size
+from cls.parallel import shard_rules
+
+
+def A() -> str:
+    return "a"
+
+
+def B(x: str, y: str) -> str:
+    return f"b({x}, {y})"
+
+
+def C() -> str:
+    return "c"
+
+
+def D(y: str, x: str) -> str:
+    return f"d({y}, {x})"
+
+
+grammar: Mapping[str, list[tuple[object, list[str]]]] = {
+    "X": [(A, []), (B, ["X", "Y"]), (B, ["Y", "X"]), ("e", [])],
+    "Y": [(C, []), (D, ["Y", "X"])],
+}
+
+
+class TestParallel(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def setUp(self) -> None:
+        self.expected = list(enumerate_terms("X", grammar, max_count=300))
+
+    def test_shard_rules(self) -> None:
+        def one(n: str, k: int) -> int:
+            return 1
+
+        self.assertEqual([[(A, [], ())], [("e", [], ())]], shard_rules(grammar["X"], 1, 2, one))
+        # a single combinator is split by the sizes of its arguments
+        shards = shard_rules(grammar["X"], 7, 8, one)
+        self.assertEqual(5, sum(1 for shard in shards if shard))
+        self.assertEqual(10, sum(map(len, shards)))
+        for shard in shards:
+            self.assertTrue(all(c == B and sizes == shard[0][2] for c, _, sizes in shard))
+        self.assertEqual([[]], shard_rules(grammar["X"], 7, 1, lambda n, k: 0))
+
+    def test_ordered(self) -> None:
+        terms = list(enumerate_terms_parallel("X", grammar, max_count=300, processes=5))
+        self.assertEqual(300, len(terms))
+        self.assertEqual(300, len(set(terms)))
+        self.assertEqual(
+            list(map(tree_size, self.expected)),
+            list(map(tree_size, terms)),
+        )
+        largest = tree_size(terms[-1])
+        self.assertEqual(
+            {t for t in self.expected if tree_size(t) < largest},
+            {t for t in terms if tree_size(t) < largest},
+        )
+
+    def test_unordered(self) -> None:
+        expected = set(enumerate_terms("X", grammar, max_count=500))
+        terms = list(enumerate_terms_parallel("X", grammar, max_count=500, ordered=False))
+        self.assertEqual(500, len(terms))
+        self.assertEqual(500, len(set(terms)))
+        self.assertLessEqual(max(map(tree_size, terms)), max(map(tree_size, expected)) + 2)
+
+    def test_finite(self) -> None:
+        finite: Mapping[str, list[tuple[object, list[str]]]] = {
+            "X": [(A, []), (B, ["Y", "Y"]), ("e", [])],
+            "Y": [(C, []), (D, ["Z", "Z"])],
+            "Z": [("f", []), ("g", [])],
+        }
+        expected = set(enumerate_terms("X", finite, max_count=None))
+        for ordered in (True, False):
+            terms = list(enumerate_terms_parallel("X", finite, max_count=None, ordered=ordered))
+            self.assertEqual(len(expected), len(terms))
+            self.assertEqual(expected, set(terms))
+
+    def test_interpret(self) -> None:
+        results = list(
+            enumerate_terms_parallel("X", grammar, max_count=20, processes=2, interpret=True)
+        )
+        self.assertEqual(20, len(results))
+        self.assertIn("a", results[:3])
+        self.assertIn("e", results[:3])
+        self.assertIn("b(a, c)", results)
+
+    def test_missing_start(self) -> None:
+        self.assertEqual([], list(enumerate_terms_parallel("Z", grammar)))
+
+
+if __name__ == "__main__":
+    unittest.main()
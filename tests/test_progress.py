@@ -0,0 +1,83 @@
+import logging
+import unittest
+from collections.abc import Mapping
+
+from cls import enumerate_terms, enumerate_terms_by_cost
+from cls.enumeration import EnumerationProgress, tree_size
+
+grammar: Mapping[str, list[tuple[str, list[str]]]] = {
+    "X": [("a", []), ("b", ["X", "Y"]), ("e", ["Y"])],
+    "Y": [("c", []), ("d", ["Y", "X"])],
+    "F": [("f", ["G", "G"]), ("x", ["X"])],
+    "G": [("g", []), ("h", [])],
+}
+
+
+class TestProgress(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def test_progress(self) -> None:
+        events: list[EnumerationProgress[str]] = []
+        terms = list(enumerate_terms("F", grammar, max_count=1000, progress=events.append))
+        for event in events:
+            self.logger.info(event)
+        self.assertEqual(list(range(len(events))), [e.generation for e in events])
+        # generations derive terms of increasing size
+        self.assertEqual(list(range(1, len(events) + 1)), [e.cost for e in events])
+        self.assertEqual(
+            [len([t for t in terms if tree_size(t) <= e.cost]) for e in events],
+            [e.enumerated for e in events],
+        )
+        # only reachable non-terminals are considered, "G" is finite
+        self.assertEqual({"F", "G", "X", "Y"}, set(events[-1].terms))
+        self.assertEqual(2, events[-1].terms["G"])
+        self.assertTrue(all(e.frozen == 1 for e in events))
+        # the language of "F" is infinite
+        self.assertTrue(all(e.total is None for e in events))
+        self.assertTrue(all(e.memory > 0 and e.time >= 0 for e in events))
+        self.assertEqual(sorted(e.nodes for e in events), [e.nodes for e in events])
+        self.assertGreaterEqual(events[-1].nodes, len(terms))
+        self.assertGreater(events[-1].pending, 0)
+        self.assertLessEqual(events[-1].time, events[-1].total_time)
+
+    def test_finite(self) -> None:
+        events: list[EnumerationProgress[str]] = []
+        terms = list(enumerate_terms("G", grammar, max_count=None, progress=events.append))
+        self.assertEqual(2, len(terms))
+        self.assertEqual(1, len(events))
+        self.assertEqual(2, events[0].enumerated)
+        self.assertEqual(2, events[0].total)
+        self.assertEqual(2, events[0].nodes)
+        # the generation is reported, even if not all of its terms are consumed
+        events.clear()
+        list(enumerate_terms("G", grammar, max_count=1, progress=events.append))
+        self.assertEqual(1, len(events))
+        self.assertEqual(1, events[0].frozen)
+
+    def test_total(self) -> None:
+        # the language of "H" is too large to be computed up front, but finite
+        large: dict[str, list[tuple[str, list[str]]]] = {
+            f"H{i}": [("a", []), ("b", []), ("f", [f"H{i - 1}", f"H{i - 1}"])] for i in range(1, 4)
+        }
+        large["H0"] = [("a", []), ("b", []), ("c", [])]
+        events: list[EnumerationProgress[str]] = []
+        terms = list(enumerate_terms("H3", large, max_count=None, progress=events.append))
+        self.assertEqual(len(terms), events[-1].total)
+        self.assertTrue(all(e.total is None for e in events[:-1]))
+
+    def test_cost(self) -> None:
+        events: list[EnumerationProgress[str]] = []
+        cost = {"a": 3, "b": 2}
+        list(enumerate_terms_by_cost("X", grammar, cost, max_count=100, progress=events.append))
+        costs = [e.cost for e in events]
+        self.assertEqual(sorted(set(costs)), costs)
+        # the first generation derives "c" of "Y"
+        self.assertEqual(1, costs[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
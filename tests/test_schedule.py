@@ -0,0 +1,61 @@
+import logging
+import unittest
+
+from cls import (
+    FiniteCombinatoryLogic,
+    InhabitationStatistics,
+    InhabitedFirst,
+    Subtypes,
+    Type,
+    fewest_paths_first,
+    smallest_type_first,
+)
+from tests.benchmarks.benchmark_labyrinth import labyrinth_repository, pos
+
+
+class TestSchedule(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def setUp(self) -> None:
+        self.size = 4
+        self.repository = labyrinth_repository(self.size)
+        self.target: Type = pos(self.size - 1, self.size - 1)
+
+    def test_inhabit(self) -> None:
+        expected = FiniteCombinatoryLogic(self.repository, Subtypes({})).inhabit(self.target)
+        for schedule in (smallest_type_first, fewest_paths_first, InhabitedFirst(), lambda _: 0):
+            fcl = FiniteCombinatoryLogic(self.repository, Subtypes({}))
+            grammar = fcl.inhabit(self.target, schedule=schedule)
+            self.assertEqual(
+                {
+                    target: {(c, tuple(args)) for c, args in rules}
+                    for target, rules in expected.items()
+                },
+                {
+                    target: {(c, tuple(args)) for c, args in rules}
+                    for target, rules in grammar.items()
+                },
+            )
+
+    def test_is_inhabited(self) -> None:
+        for schedule in (None, smallest_type_first, fewest_paths_first):
+            fcl = FiniteCombinatoryLogic(self.repository, Subtypes({}))
+            self.assertTrue(fcl.is_inhabited(self.target, schedule=schedule))
+            self.assertIsNotNone(fcl.inhabitant(self.target, schedule=schedule))
+
+    def test_inhabited_first(self) -> None:
+        schedule = InhabitedFirst()
+        schedule.record(FiniteCombinatoryLogic(self.repository, Subtypes({})).inhabit(self.target))
+        statistics = InhabitationStatistics()
+        fcl = FiniteCombinatoryLogic(self.repository, Subtypes({}))
+        self.assertTrue(fcl.is_inhabited(self.target, statistics=statistics, schedule=schedule))
+        # only inhabited targets are explored before the target is known to be ground
+        self.assertLessEqual(statistics.targets, len(schedule.inhabited))
+
+
+if __name__ == "__main__":
+    unittest.main()
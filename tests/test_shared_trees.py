@@ -0,0 +1,71 @@
+import logging
+import pickle
+import unittest
+from collections.abc import Mapping
+
+from cls import enumerate_terms
+from cls.enumeration import SharedTree, TreeTable, tree_size
+
+grammar: Mapping[str, list[tuple[str, list[str]]]] = {
+    "X": [("a", []), ("b", ["X", "Y"])],
+    "Y": [("c", []), ("d", ["Y", "X"])],
+}
+
+
+class TestSharedTrees(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def setUp(self) -> None:
+        self.table: TreeTable[str] = TreeTable()
+        self.terms = list(enumerate_terms("X", grammar, max_count=1000, table=self.table))
+
+    def test_plain_equality(self) -> None:
+        self.assertIn(("b", (("a", ()), ("c", ()))), self.terms[:3])
+        plain = ("b", (("a", ()), ("d", (("c", ()), ("a", ())))))
+        shared = self.table.share(plain)
+        self.assertEqual(plain, shared)
+        self.assertEqual(hash(plain), hash(shared))
+        self.assertEqual(tree_size(plain), shared.size)
+
+    def test_sharing(self) -> None:
+        self.assertEqual(1000, len(set(self.terms)))
+        self.assertTrue(all(isinstance(t, SharedTree) for t in self.terms))
+        subterms: dict[tuple[str, tuple[object, ...]], int] = {}
+        for term in self.terms:
+            for arg in term[1]:
+                self.assertEqual(id(arg), subterms.setdefault(arg, id(arg)))
+        self.assertLess(len(self.table), sum(map(tree_size, self.terms)))
+        self.assertIs(self.table.share(self.terms[10]), self.terms[10])
+
+    def test_shared_table(self) -> None:
+        more_terms = list(enumerate_terms("X", grammar, max_count=1000, table=self.table))
+        for t1, t2 in zip(self.terms, more_terms):
+            self.assertIs(t1, t2)
+
+    def test_tuple_interface(self) -> None:
+        term = self.terms[-1]
+        (c, args) = term
+        self.assertEqual((c, args), (term[0], term[1]))
+        self.assertEqual(2, len(term))
+        self.assertEqual([c, args], list(term))
+        self.assertEqual(repr((c, args)), repr(term))
+        self.assertEqual(tree_size(term), term.size)
+        # size and hash are not stored in a __dict__ per node
+        self.assertFalse(hasattr(term, "__dict__"))
+        self.assertNotEqual(term, (c, args, term.size))
+        self.assertNotEqual(term, self.terms[-2])
+
+    def test_pickle(self) -> None:
+        term = self.terms[-1]
+        copy = pickle.loads(pickle.dumps(term))
+        self.assertEqual(term, copy)
+        self.assertEqual(hash(term), hash(copy))
+        self.assertEqual(term.size, copy.size)
+
+
+if __name__ == "__main__":
+    unittest.main()
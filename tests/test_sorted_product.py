@@ -0,0 +1,87 @@
+import itertools
+import logging
+import unittest
+from random import randrange
+
+from cls.sortedenum import SortedProductStream, sorted_product
+
+
+class TestSortedProduct(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def test_example(self) -> None:
+        self.assertEqual(
+            [12, 13, 13, 13, 14, 14, 14, 14, 14, 15, 15, 15, 15, 15, 16, 16, 16, 17],
+            list(sorted_product([1, 2, 3], [4, 5, 6], [7, 8], key=lambda x: x, combine=sum)),
+        )
+
+    def test_random(self) -> None:
+        for _ in range(50):
+            lists = [
+                sorted(randrange(10) for _ in range(randrange(6))) for _ in range(randrange(1, 5))
+            ]
+            result = list(
+                sorted_product(*lists, key=lambda x: x, combine=lambda xs: tuple(xs))
+            )
+            sums = [sum(r) for r in result]
+            self.assertEqual(sums, sorted(sums))
+            self.assertEqual(sorted(itertools.product(*lists)), sorted(result))
+
+    def test_empty(self) -> None:
+        self.assertEqual([], list(sorted_product([1], [], key=lambda x: x, combine=sum)))
+        no_lists: list[list[int]] = []
+        self.assertEqual([0], list(sorted_product(*no_lists, key=lambda x: x, combine=sum)))
+
+    def test_stream(self) -> None:
+        for _ in range(50):
+            lists = [
+                sorted(randrange(1, 10) for _ in range(randrange(6)))
+                for _ in range(randrange(1, 5))
+            ]
+            stream = SortedProductStream(
+                *map(iter, lists), key=lambda x: x, combine=lambda xs: tuple(xs)
+            )
+            result = list(stream.take_until(100))
+            self.assertFalse(stream.pending)
+            sums = [sum(r) for r in result]
+            self.assertEqual(sums, sorted(sums))
+            self.assertEqual(sorted(itertools.product(*lists)), sorted(result))
+
+    def test_growing_stream(self) -> None:
+        # sources grow by elements larger than any bound requested so far
+        xs: list[int] = []
+        ys: list[int] = [1]
+        stream = SortedProductStream(xs, ys, key=lambda x: x, combine=lambda zs: tuple(zs))
+        self.assertIsNone(stream.next_key())
+        self.assertEqual([], list(stream.take_until(5)))
+        results: list[tuple[int, ...]] = []
+        for bound in range(2, 12):
+            xs.append(bound)
+            ys.append(bound)
+            results.extend(stream.take_until(bound + 1))
+            self.assertTrue(stream.pending or bound < 3)
+        self.assertEqual(
+            [r for r in itertools.product(xs, ys) if sum(r) <= 12],
+            sorted(results),
+        )
+        sums = [sum(r) for r in results]
+        self.assertEqual(sums, sorted(sums))
+
+    def test_growing_during_iteration(self) -> None:
+        xs: list[int] = [1]
+        stream = SortedProductStream(xs, xs, key=lambda x: x, combine=lambda zs: tuple(zs))
+        results: list[tuple[int, ...]] = []
+        for bound in range(2, 10):
+            for r in stream.take_until(bound):
+                results.append(r)
+                if xs[-1] < bound:
+                    xs.append(bound)
+        self.assertEqual([r for r in itertools.product(xs, xs) if sum(r) <= 9], sorted(results))
+
+
+if __name__ == "__main__":
+    unittest.main()
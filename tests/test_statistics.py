@@ -0,0 +1,78 @@
+import logging
+import unittest
+
+from cls import (
+    Arrow,
+    Constructor,
+    FiniteCombinatoryLogic,
+    InhabitationStatistics,
+    Intersection,
+    Subtypes,
+    Type,
+)
+from cls.fcl import grammar_size
+
+
+class TestStatistics(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def setUp(self) -> None:
+        a: Type = Constructor("a")
+        b: Type = Constructor("b")
+        c: Type = Constructor("c")
+        self.repository: dict[str, Type] = {
+            "X": a,
+            "F": Intersection(Arrow(a, b), Arrow(b, c)),
+            "G": Arrow(c, Arrow(c, c)),
+            # not inhabited
+            "H": Arrow(Constructor("d"), b),
+        }
+        self.target = c
+
+    def test_statistics(self) -> None:
+        statistics = InhabitationStatistics()
+        fcl = FiniteCombinatoryLogic(self.repository, Subtypes({}))
+        grammar = fcl.inhabit(self.target, statistics=statistics)
+        self.logger.info(statistics)
+
+        # the grammar is the same as without statistics
+        self.assertEqual(
+            dict(FiniteCombinatoryLogic(self.repository, Subtypes({})).inhabit(self.target)),
+            dict(grammar),
+        )
+        # targets: c, b, a, d
+        self.assertEqual(4, statistics.targets)
+        self.assertEqual({"X": 4, "F": 8, "G": 12, "H": 8}, statistics.subqueries)
+        self.assertEqual(sum(statistics.subqueries.values()), sum(statistics.cover_counts.values()))
+        self.assertEqual(
+            sum(size * count for size, count in statistics.cover_counts.items()),
+            sum(statistics.cover_sizes.values()),
+        )
+        # each cover consists of a single multi-arrow
+        self.assertEqual({1: 5}, statistics.cover_sizes)
+        self.assertGreater(statistics.subtype_checks, 0)
+        self.assertEqual(grammar_size(grammar), statistics.grammar_size_after)
+        self.assertEqual((3, 5), statistics.grammar_size_before)
+        self.assertEqual((3, 4), statistics.grammar_size_after)
+        self.assertGreaterEqual(statistics.time, statistics.prune_time)
+        self.assertIn("targets: 4", str(statistics))
+
+    def test_accumulate(self) -> None:
+        statistics = InhabitationStatistics()
+        fcl = FiniteCombinatoryLogic(self.repository, Subtypes({}))
+        fcl.inhabit(self.target, statistics=statistics)
+        self.assertEqual(0, statistics.empty_subqueries)
+        fcl.inhabit(self.target, statistics=statistics)
+        # d is known to be empty in the second call, hence H is skipped and d is not explored
+        self.assertEqual(7, statistics.targets)
+        self.assertEqual(1, statistics.empty_subqueries)
+        # grammar sizes describe the last call
+        self.assertEqual((3, 4), statistics.grammar_size_after)
+
+
+if __name__ == "__main__":
+    unittest.main()
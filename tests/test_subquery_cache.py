@@ -0,0 +1,64 @@
+import logging
+import unittest
+
+from cls import (
+    Arrow,
+    Constructor,
+    FiniteCombinatoryLogic,
+    InhabitationStatistics,
+    Intersection,
+    Subtypes,
+    Type,
+)
+from tests.benchmarks.benchmark_labyrinth import labyrinth_repository, pos
+
+
+class TestSubqueryCache(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def test_across_calls(self) -> None:
+        repository = labyrinth_repository(4)
+        target = pos(3, 3)
+        fcl = FiniteCombinatoryLogic(repository, Subtypes({}))
+        first = InhabitationStatistics()
+        grammar = fcl.inhabit(target, statistics=first)
+        self.assertGreater(first.subquery_cache_misses, 0)
+
+        second = InhabitationStatistics()
+        self.assertEqual(dict(grammar), dict(fcl.inhabit(target, statistics=second)))
+        self.assertEqual(0, second.subquery_cache_misses)
+        self.assertEqual(1.0, second.subquery_cache_hit_rate)
+        self.assertLess(second.subtype_checks, first.subtype_checks)
+        self.logger.info(second)
+
+    def test_equal_paths(self) -> None:
+        a: Type = Constructor("a")
+        b: Type = Constructor("b")
+        repository: dict[str, Type] = {
+            "F": Arrow(a, Intersection(a, b)),
+            "G": Arrow(b, Intersection(b, a)),
+            "X": Intersection(a, b),
+        }
+        fcl = FiniteCombinatoryLogic(repository, Subtypes({}))
+        statistics = InhabitationStatistics()
+        fcl.inhabit(Intersection(a, b), statistics=statistics)
+        # paths of a & b and b & a are equal
+        fcl.inhabit(Intersection(b, a), statistics=statistics)
+        self.assertEqual(len(fcl.subquery_cache), statistics.subquery_cache_misses)
+        self.assertGreater(statistics.subquery_cache_hits, 0)
+
+    def test_eviction(self) -> None:
+        repository = labyrinth_repository(4)
+        target = pos(3, 3)
+        expected = FiniteCombinatoryLogic(repository, Subtypes({})).inhabit(target)
+        fcl = FiniteCombinatoryLogic(repository, Subtypes({}), subquery_cache_size=10)
+        self.assertEqual(dict(expected), dict(fcl.inhabit(target)))
+        self.assertEqual(10, len(fcl.subquery_cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
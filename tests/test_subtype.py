@@ -1,8 +1,11 @@
 import logging
 import unittest
+from random import Random
 from cls import Constructor
 from cls.subtypes import Subtypes
-from cls.types import Intersection
+from cls.types import Arrow, Intersection, Product, Type
+
+DEPTH = 100_000
 
 
 class TestSubtype(unittest.TestCase):
@@ -23,6 +26,116 @@ class TestSubtype(unittest.TestCase):
         subtypes = Subtypes({})
         self.assertTrue(subtypes.check_subtype(a, Intersection(a, a)))
 
+    def test_arrow_variance(self) -> None:
+        a = Constructor("A")
+        b = Constructor("B")
+        subtypes = Subtypes({"A": {"B"}})
+        self.assertTrue(subtypes.check_subtype(Arrow(b, a), Arrow(a, b)))
+        self.assertFalse(subtypes.check_subtype(Arrow(a, a), Arrow(b, a)))
+        self.assertFalse(subtypes.check_subtype(Arrow(a, b), Arrow(a, a)))
+        both = Intersection(Arrow(a, a), Arrow(b, b))
+        self.assertTrue(subtypes.check_subtype(both, Arrow(a, Intersection(a, b))))
+        self.assertFalse(subtypes.check_subtype(both, Arrow(b, Intersection(a, b))))
+
+    def test_add_remove_subtype(self) -> None:
+        random = Random(0)
+        names = [f"N{i}" for i in range(12)]
+        environment: dict[str, set[str]] = {}
+        subtypes = Subtypes({})
+        for _ in range(200):
+            subtype, supertype = random.sample(names, 2)
+            if supertype in environment.get(subtype, set()):
+                environment[subtype].remove(supertype)
+                subtypes.remove_subtype(subtype, supertype)
+            else:
+                environment.setdefault(subtype, set()).add(supertype)
+                subtypes.add_subtype(subtype, supertype)
+            expected = Subtypes(environment).environment
+            self.assertEqual(
+                {name: supertypes for name, supertypes in expected.items()},
+                {name: subtypes.environment.get(name, {name}) for name in expected},
+            )
+            # names, which are not related to other names any more, are only reflexive
+            self.assertTrue(
+                all(
+                    supertypes == {name}
+                    for name, supertypes in subtypes.environment.items()
+                    if name not in expected
+                )
+            )
+        a = Constructor("N0")
+        b = Constructor("N1")
+        subtypes = Subtypes({})
+        self.assertFalse(subtypes.check_subtype(a, b))
+        subtypes.add_subtype("N0", "N1")
+        self.assertTrue(subtypes.check_subtype(a, b))
+        subtypes.remove_subtype("N0", "N1")
+        self.assertFalse(subtypes.check_subtype(a, b))
+        self.assertEqual(2, len(subtypes.changes))
+        with self.assertRaises(KeyError):
+            subtypes.remove_subtype("N0", "N1")
+
+    def test_check_subtype_many(self) -> None:
+        random = Random(0)
+        names = [f"N{i}" for i in range(6)]
+        subtypes = Subtypes({name: set(random.sample(names, 2)) for name in names})
+
+        def random_type(depth: int) -> Type:
+            choice = random.randrange(5 if depth > 0 else 1)
+            if choice == 0:
+                return Constructor(random.choice(names))
+            elif choice == 1:
+                return Constructor(random.choice(names), random_type(depth - 1))
+            elif choice == 2:
+                return Arrow(random_type(depth - 1), random_type(depth - 1))
+            elif choice == 3:
+                return Product(random_type(depth - 1), random_type(depth - 1))
+            return Type.intersect([random_type(depth - 1) for _ in range(random.randrange(1, 8))])
+
+        left = [random_type(3) for _ in range(30)]
+        right = [random_type(2) for _ in range(30)] + [Constructor(name) for name in names]
+        pairs = [(a, b) for a in left for b in right]
+        expected = [subtypes.check_subtype(a, b) for a, b in pairs]
+        self.assertEqual(expected, subtypes.check_subtype_many(pairs))
+        self.assertEqual(expected, subtypes.check_subtype_many(pairs + pairs)[: len(pairs)])
+        matrix = subtypes.subtype_matrix(left, right)
+        self.assertEqual(expected, [result for row in matrix for result in row])
+        self.assertEqual([[True]], subtypes.subtype_matrix([left[0]], [left[0]]))
+        self.assertEqual([], subtypes.check_subtype_many([]))
+
+    def test_deep_constructors(self) -> None:
+        subtypes = Subtypes({"A": {"B"}})
+        subtype: Type = Constructor("A")
+        supertype: Type = Constructor("B")
+        for _ in range(DEPTH):
+            subtype = Constructor("A", subtype)
+            supertype = Constructor("B", supertype)
+        self.assertTrue(subtypes.check_subtype(subtype, supertype))
+        self.assertFalse(subtypes.check_subtype(supertype, subtype))
+
+    def test_deep_products(self) -> None:
+        subtypes = Subtypes({"A": {"B"}})
+        subtype: Type = Constructor("A")
+        supertype: Type = Constructor("B")
+        for _ in range(DEPTH):
+            subtype = Product(subtype, Constructor("A"))
+            supertype = Product(supertype, Constructor("B"))
+        self.assertTrue(subtypes.check_subtype(subtype, supertype))
+        self.assertFalse(subtypes.check_subtype(supertype, subtype))
+
+    def test_deep_arrows(self) -> None:
+        # sources are nested, each level switches variance
+        subtypes = Subtypes({"A": {"B"}})
+        a = Constructor("A")
+        b = Constructor("B")
+        subtype: Type = a
+        supertype: Type = b
+        for _ in range(DEPTH):
+            subtype, supertype = Arrow(supertype, a), Arrow(subtype, b)
+        self.assertTrue(subtypes.check_subtype(subtype, supertype))
+        self.assertFalse(subtypes.check_subtype(supertype, subtype))
+        self.assertTrue(subtypes.check_subtype(subtype, subtype))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,69 @@
+import logging
+import unittest
+
+from cls import Arrow, Constructor, FiniteCombinatoryLogic, Intersection, Subtypes, Type
+
+
+class TestSubtypeUpdates(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def setUp(self) -> None:
+        self.repository: dict[str, Type] = {
+            "X": Constructor("a"),
+            "F": Arrow(Constructor("b"), Constructor("c")),
+            "Y": Constructor("d"),
+            "G": Arrow(Constructor("d"), Intersection(Constructor("e"), Constructor("f"))),
+        }
+
+    def inhabit(self, fcl: FiniteCombinatoryLogic[str], target: Type) -> dict[Type, set[str]]:
+        return {ty: {c for c, _ in rules} for ty, rules in fcl.inhabit(target).items()}
+
+    def expected(self, subtypes: Subtypes, target: Type) -> dict[Type, set[str]]:
+        fcl = FiniteCombinatoryLogic(self.repository, Subtypes(subtypes.direct))
+        return self.inhabit(fcl, target)
+
+    def test_updates(self) -> None:
+        subtypes = Subtypes({})
+        fcl = FiniteCombinatoryLogic(self.repository, subtypes)
+        c = Constructor("c")
+        e = Constructor("e")
+        self.assertEqual({}, self.inhabit(fcl, c))
+        self.assertIn(Constructor("b"), fcl.empty_types)
+        self.assertEqual({e: {"G"}, Constructor("d"): {"Y"}}, self.inhabit(fcl, e))
+
+        # a <= b makes c inhabited
+        subtypes.add_subtype("a", "b")
+        self.assertEqual(self.expected(subtypes, c), self.inhabit(fcl, c))
+        self.assertIn(c, fcl.inhabit(c))
+        self.assertEqual(self.expected(subtypes, e), self.inhabit(fcl, e))
+
+        cached = set(fcl.subquery_cache)
+        subtypes.remove_subtype("a", "b")
+        fcl._update_caches()
+        # only subqueries involving both a and b (the subquery of X for b) are affected by a <= b
+        b = Constructor("b")
+        self.assertEqual(len(cached) - 1, len(fcl.subquery_cache))
+        self.assertLessEqual(set(fcl.subquery_cache), cached)
+        self.assertTrue(all(key in fcl.subquery_cache for key in cached if b not in key[1]))
+        self.assertEqual({}, self.inhabit(fcl, c))
+
+    def test_paths(self) -> None:
+        subtypes = Subtypes({})
+        fcl = FiniteCombinatoryLogic(self.repository, subtypes)
+        target = Intersection(Constructor("e"), Constructor("f"))
+        fcl.inhabit(target)
+        self.assertEqual(2, len(fcl.target_paths[target]))
+        subtypes.add_subtype("e", "f")
+        self.assertEqual(self.expected(subtypes, target), self.inhabit(fcl, target))
+        self.assertEqual([Constructor("e")], fcl.target_paths[target])
+        subtypes.remove_subtype("e", "f")
+        fcl.inhabit(target)
+        self.assertEqual(2, len(fcl.target_paths[target]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import logging
+import unittest
+from collections.abc import Mapping
+
+from cls import enumerate_terms, enumerate_terms_of_size
+from cls.enumeration import compositions, tree_size
+
+grammar: Mapping[str, list[tuple[str, list[str]]]] = {
+    "X": [("a", []), ("b", ["X", "Y"]), ("e", ["Y"])],
+    "Y": [("c", []), ("d", ["Y", "X"]), ("d", ["X", "X"])],
+}
+
+
+class TestTermsOfSize(unittest.TestCase):
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(
+        format="%(module)s %(levelname)s: %(message)s",
+        # level=logging.INFO,
+    )
+
+    def test_compositions(self) -> None:
+        self.assertEqual([()], list(compositions(0, 0)))
+        self.assertEqual([], list(compositions(1, 0)))
+        self.assertEqual([], list(compositions(1, 2)))
+        self.assertEqual([(1, 2), (2, 1)], list(compositions(3, 2)))
+        self.assertEqual(10, len(list(compositions(6, 3))))
+
+    def test_size(self) -> None:
+        terms = list(enumerate_terms("X", grammar, max_count=2000))
+        largest = tree_size(terms[-1])
+        for size in range(1, largest):
+            expected = {t for t in terms if tree_size(t) == size}
+            result = list(enumerate_terms_of_size("X", grammar, size, max_count=None))
+            self.assertEqual(len(expected), len(result))
+            self.assertEqual(expected, set(result))
+
+    def test_max_count(self) -> None:
+        result = list(enumerate_terms_of_size("X", grammar, 12, max_count=10))
+        self.assertEqual(10, len(set(result)))
+        self.assertTrue(all(tree_size(t) == 12 for t in result))
+
+    def test_empty(self) -> None:
+        self.assertEqual([], list(enumerate_terms_of_size("X", grammar, 0)))
+        self.assertEqual([], list(enumerate_terms_of_size("Z", grammar, 3)))
+        unary = {"X": [("f", ["X"]), ("a", [])], "Y": [("g", ["Y"])]}
+        self.assertEqual(1, len(list(enumerate_terms_of_size("X", unary, 20))))
+        self.assertEqual([], list(enumerate_terms_of_size("Y", unary, 20)))
+
+
+if __name__ == "__main__":
+    unittest.main()
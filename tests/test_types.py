@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 from cls import Product, Constructor, Intersection, Arrow, Omega, Type
@@ -6,6 +7,8 @@ a = Constructor("a")
 b = Constructor("b")
 c = Constructor("c")
 
+DEPTH = 100_000
+
 complicated = Type.intersect(
     [
         Intersection(a, b),
@@ -35,6 +38,14 @@ class TestTypes(unittest.TestCase):
         self.assertEqual(a * b, Product(a, b))
         self.assertEqual(a * b * c, Product(Product(a, b), c))
 
+    def test_repr(self) -> None:
+        self.assertEqual(
+            repr(Arrow(a, Intersection(b, Product(c, Omega())))),
+            "Arrow(source=Constructor(name='a', arg=Omega()), "
+            "target=Intersection(left=Constructor(name='b', arg=Omega()), "
+            "right=Product(left=Constructor(name='c', arg=Omega()), right=Omega())))",
+        )
+
     def test_state(self) -> None:
         s1 = Intersection(a, Arrow(b, c))
         s2 = Intersection(c, Arrow(a, b))
@@ -42,6 +53,49 @@ class TestTypes(unittest.TestCase):
         s2.__setstate__(x)
         self.assertEqual(s1, s2)
 
+    def test_pickle(self) -> None:
+        copy = pickle.loads(pickle.dumps(complicated))
+        self.assertEqual(copy, complicated)
+        self.assertEqual(hash(copy), hash(complicated))
+        self.assertEqual(copy.size, complicated.size)
+        self.assertEqual(copy.organized, complicated.organized)
+        self.assertEqual(str(copy), str(complicated))
+
+    def test_deep_constructors(self) -> None:
+        left: Type = a
+        right: Type = a
+        for _ in range(DEPTH):
+            left = Constructor("C", left)
+            right = Constructor("C", right)
+        self.assertIsNot(left, right)
+        self.assertEqual(hash(left), hash(right))
+        self.assertEqual(left, right)
+        self.assertNotEqual(left, Constructor("C", right))
+        self.assertEqual(left.size, DEPTH + 2)
+        self.assertEqual(left.organized, {left})
+        self.assertEqual(str(left), "C(" * DEPTH + "a" + ")" * DEPTH)
+        self.assertEqual(
+            repr(left),
+            "Constructor(name='C', arg=" * DEPTH
+            + "Constructor(name='a', arg=Omega())"
+            + ")" * DEPTH,
+        )
+
+    def test_deep_arrows(self) -> None:
+        # (((a -> b) -> b) -> ...) -> b & c
+        ty: Type = a
+        for _ in range(DEPTH):
+            ty = Arrow(ty, b)
+        ty = Arrow(ty, Intersection(b, c))
+        self.assertEqual(ty.organized, {Arrow(ty.source, b), Arrow(ty.source, c)})
+        self.assertEqual(str(ty), "(" * DEPTH + "a" + " -> b)" * DEPTH + " -> b & c")
+
+    def test_deep_intersections(self) -> None:
+        paths = [Constructor(f"C{i}") for i in range(DEPTH)]
+        ty = Type.intersect(paths)
+        self.assertEqual(ty.organized, set(paths))
+        self.assertEqual(str(ty), " & ".join(map(str, paths)))
+
 
 if __name__ == "__main__":
     unittest.main()